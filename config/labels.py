@@ -464,41 +464,42 @@ Malignant = Label(
 )
 
 all_labels = [obj for name, obj in globals().items() if isinstance(obj, Label)]
+label_index = ontology.OntologyIndex(all_labels)
 
 
 # --- Theme L ontology query helpers (Task 36), scoped to the label registry -------------------
-# Thin wrappers over the generic functions in ``config.ontology`` so callers can query the label
-# hierarchy without re-passing ``all_labels`` every time. Examples:
+# Thin wrappers over ``label_index`` (a precomputed ``config.ontology.OntologyIndex``) so callers can
+# query the label hierarchy without re-passing ``all_labels`` every time. Examples:
 #   label_descendants("Neoplasm")  -> every tumour subtype below Neoplasm
 #   label_ancestors(ClearCellAdenocarcinoma)  -> [RenalAdenocarcinoma, Adenocarcinoma, Malignant, Neoplasm]
 def label_by_name(name: str) -> Optional[Label]:
     """Return the label with the given RadLex name, or ``None``."""
-    return ontology.get_by_name(name, all_labels)
+    return label_index.by_name.get(name)
 
 
 def label_ancestors(label: Label) -> list[Label]:
     """Return ``label``'s ancestors, nearest parent first."""
-    return ontology.ancestors(label, all_labels)
+    return label_index.ancestors(label)
 
 
 def label_descendants(label: Label) -> list[Label]:
     """Return every transitive descendant of ``label``."""
-    return ontology.descendants(label, all_labels)
+    return label_index.descendants(label)
 
 
 def label_descendants_of(name: str) -> list[Label]:
     """Return every transitive descendant of the label named ``name``."""
-    return ontology.descendants_of(name, all_labels)
+    return label_index.descendants_of(name)
 
 
 def label_children(label: Label) -> list[Label]:
     """Return ``label``'s direct children."""
-    return ontology.children(label, all_labels)
+    return label_index.children(label)
 
 
 def labels_grouped_by_level() -> dict[int, list[Label]]:
     """Group all labels by their depth in the RadLex hierarchy (0 == roots)."""
-    return ontology.group_by_level(all_labels)
+    return label_index.group_by_level()
 
 
 def validate_labels() -> list[str]:
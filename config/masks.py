@@ -175,22 +175,23 @@ Mass = Mask(
 # cross-dataset distribution report (Task 22) and the mask-quality check (Task 12); also fixes the
 # previously-missing ``config.masks.all_masks`` reference in ``utils/data_counter.py``.
 all_masks = [obj for name, obj in list(globals().items()) if isinstance(obj, Mask)]
+mask_index = ontology.OntologyIndex(all_masks)
 
 
 # --- Theme L ontology query helpers (Task 36), scoped to the mask registry --------------------
 def mask_by_name(name: str) -> Optional[Mask]:
     """Return the mask with the given RadLex name, or ``None``."""
-    return ontology.get_by_name(name, all_masks)
+    return mask_index.by_name.get(name)
 
 
 def mask_ancestors(mask: Mask) -> list[Mask]:
     """Return ``mask``'s ancestors, nearest parent first."""
-    return ontology.ancestors(mask, all_masks)
+    return mask_index.ancestors(mask)
 
 
 def mask_descendants(mask: Mask) -> list[Mask]:
     """Return every transitive descendant of ``mask``."""
-    return ontology.descendants(mask, all_masks)
+    return mask_index.descendants(mask)
 
 
 def organ_masks() -> list[Mask]:
@@ -15,13 +15,16 @@ dataclasses, **without changing any existing id, RadLex name, or emitted value**
 
 The query helpers are intentionally generic - they operate on any iterable of objects exposing
 ``radlex_name`` / ``radlex_id`` / ``radlex_parent_id`` - so the same code serves both the label
-and the mask registries.
+and the mask registries. Each helper rescans the entries it is given; :class:`OntologyIndex`
+precomputes the same answers (name/id maps, child adjacency and ancestor/descendant closures) once
+per registry, and the ``config.labels`` / ``config.masks`` wrappers query through it.
 """
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
-from typing import Iterable, Optional, Protocol, TypeVar
+from typing import Generic, Iterable, Optional, Protocol, TypeVar
 
 
 @dataclass
@@ -182,3 +185,84 @@ def validate(entries: Iterable[T]) -> list[str]:
             current = parent(current, entries)
 
     return problems
+
+
+class OntologyIndex(Generic[T]):
+    """Hierarchy lookups over one registry, precomputed once instead of rescanning per query.
+
+    Answers match the generic helpers above (same entries, same order, same cycle handling), but
+    name/id lookups and ancestor/descendant closures of registered entries are dictionary hits.
+    The registry is snapshotted at construction: rebuild the index if its entries change.
+    """
+
+    def __init__(self, entries: Iterable[T]):
+        """Build the maps, child adjacency lists and closure tables for ``entries``."""
+        self.entries = list(entries)
+        self.by_name = index_by_name(self.entries)
+        self.by_id = index_by_id(self.entries)
+        self._children: dict[str, list[T]] = {}
+        for entry in self.entries:
+            if entry.radlex_parent_id:
+                self._children.setdefault(entry.radlex_parent_id, []).append(entry)
+        self._ancestors = {id(entry): self._walk_ancestors(entry) for entry in self.entries}
+        self._descendants = {id(entry): self._walk_descendants(entry) for entry in self.entries}
+
+    def parent(self, entry: T) -> Optional[T]:
+        """Return ``entry``'s parent, as :func:`parent`."""
+        if not entry.radlex_parent_id:
+            return None
+        matches = self.by_id.get(entry.radlex_parent_id, [])
+        return matches[0] if matches else None
+
+    def children(self, entry: T) -> list[T]:
+        """Return ``entry``'s direct children, as :func:`children`."""
+        return list(self._children.get(entry.radlex_id, [])) if entry.radlex_id else []
+
+    def ancestors(self, entry: T) -> list[T]:
+        """Return ``entry``'s ancestors from nearest parent to root, as :func:`ancestors`."""
+        chain = self._ancestors.get(id(entry))
+        return list(chain) if chain is not None else self._walk_ancestors(entry)
+
+    def descendants(self, entry: T) -> list[T]:
+        """Return all transitive descendants of ``entry`` breadth-first, as :func:`descendants`."""
+        closure = self._descendants.get(id(entry))
+        return list(closure) if closure is not None else self._walk_descendants(entry)
+
+    def descendants_of(self, name: str) -> list[T]:
+        """Return all descendants of the entry named ``name`` (empty if unknown), as :func:`descendants_of`."""
+        root = self.by_name.get(name)
+        return self.descendants(root) if root is not None else []
+
+    def roots(self) -> list[T]:
+        """Return the top-level entries, as :func:`roots`."""
+        return [e for e in self.entries if self.parent(e) is None]
+
+    def group_by_level(self) -> dict[int, list[T]]:
+        """Group entries by their depth in the hierarchy, as :func:`group_by_level`."""
+        levels: dict[int, list[T]] = {}
+        for entry in self.entries:
+            levels.setdefault(len(self._ancestors[id(entry)]), []).append(entry)
+        return dict(sorted(levels.items()))
+
+    def _walk_ancestors(self, entry: T) -> list[T]:
+        chain: list[T] = []
+        seen = {id(entry)}
+        current = self.parent(entry)
+        while current is not None and id(current) not in seen:
+            chain.append(current)
+            seen.add(id(current))
+            current = self.parent(current)
+        return chain
+
+    def _walk_descendants(self, entry: T) -> list[T]:
+        out: list[T] = []
+        seen = {id(entry)}
+        frontier = deque(self.children(entry))
+        while frontier:
+            node = frontier.popleft()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            out.append(node)
+            frontier.extend(self.children(node))
+        return out
@@ -2,20 +2,29 @@
 
 from config.runner_config import datasets
 
-for dataset in datasets:
-    # Check whether source_path is defined
-    if not dataset.args["source_path"]:
-        print(f"{dataset.name} skipped, as no source path found.")
-    elif "labels_path" in dataset.args.keys() and dataset.args["labels_path"] == "":
-        print(
-            f"{dataset.name} skipped, as no labels path found. This dataset requires labels path to extract annotations."
-        )
-    elif "masks_path" in dataset.args.keys() and dataset.args["masks_path"] == "":
-        print(
-            f"{dataset.name} skipped, as no masks path found. This dataset requires masks path to extract annotations."
-        )
-    else:
-        print(dataset.name)
-        pipeline = dataset.pipeline
-        pipeline.transform(dataset.args["source_path"])
-        print(f"{dataset.name} done.")
+
+def main() -> None:
+    """Run the pipeline of every dataset configured in ``config/runner_config.py``."""
+    for dataset in datasets:
+        # Check whether source_path is defined
+        if not dataset.args["source_path"]:
+            print(f"{dataset.name} skipped, as no source path found.")
+        elif "labels_path" in dataset.args.keys() and dataset.args["labels_path"] == "":
+            print(
+                f"{dataset.name} skipped, as no labels path found. This dataset requires labels path to extract annotations."
+            )
+        elif "masks_path" in dataset.args.keys() and dataset.args["masks_path"] == "":
+            print(
+                f"{dataset.name} skipped, as no masks path found. This dataset requires masks path to extract annotations."
+            )
+        else:
+            print(dataset.name)
+            pipeline = dataset.pipeline
+            pipeline.transform(dataset.args["source_path"])
+            print(f"{dataset.name} done.")
+
+
+# Guarded so the spawn-started worker processes of parallel steps (ExportConfig.num_workers > 1),
+# which re-import the main module, do not re-run every pipeline.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Persistent content-addressed cache of converted outputs, shared across runs and datasets.
+
+``SkipProcessed`` can only tell that an output path exists. Once a window or preprocessing
+setting changes, ``DeleteOldPreprocessedData`` wipes the outputs and every source is decoded
+again, although most (source, settings) pairs were already converted by an earlier run.
+``ConversionCache`` stores each converted output under a key derived from:
+
+* the SHA-256 digest of the source file's bytes (so renamed or copied sources still hit),
+* the name of the converting step and the version of its conversion code,
+* the step's settings that influence the output (e.g. the DICOM window).
+
+Entries are plain files under ``{cache_dir}/{key[:2]}/{key}``, written atomically. A hit is
+copied to the output path rather than hardlinked, because later steps rewrite outputs in place
+(which would change the cached file through a shared inode). The modification time of an entry
+records its last use; ``evict`` removes the least recently used entries until the cache fits in
+``max_bytes``.
+
+The object only holds its directory and size limit, so conversion workers can receive it in
+their tasks: workers compute keys and read hits, the main process stores misses, touches hits
+and evicts, following the concurrency contract of ``utils.parallel``.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+
+class ConversionCache:
+    """Converted outputs stored by (source digest, step, settings), with LRU size eviction."""
+
+    #: Bytes read at a time while hashing a source file.
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None):
+        """Initialize the cache (the directory is created on the first store).
+
+        Args:
+            cache_dir (str): Directory holding the cache entries.
+            max_bytes (Optional[int]): Size limit enforced by ``evict``; None for no limit.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, source_path: str, step_name: str, settings: dict[str, Any]) -> str:
+        """Return the cache key of converting ``source_path`` with ``step_name`` and ``settings``.
+
+        Args:
+            source_path (str): Path to the source file (its content is hashed).
+            step_name (str): Name and code version of the converting step, e.g. ``"ConvertDcm2Png/1"``.
+            settings (dict[str, Any]): JSON-serializable settings that influence the output.
+        Returns:
+            str: Hex digest identifying the converted output.
+        """
+        digest = hashlib.sha256()
+        with open(source_path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        identity = json.dumps([digest.hexdigest(), step_name, settings], sort_keys=True)
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        """Return the path of the entry for ``key``."""
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached output for ``key``, or None on a miss (does not mark it as used)."""
+        try:
+            with open(self.path(key), "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output under ``key``, atomically replacing any existing entry."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def touch(self, key: str) -> None:
+        """Mark the entry for ``key`` as just used, for the LRU eviction."""
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> int:
+        """Delete the least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if self.max_bytes is None or not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        total = 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
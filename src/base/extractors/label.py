@@ -6,9 +6,17 @@ Label extractors are used to extract labels from the labels file.
 Each label extractor at initialization should receive a dictionary of mapping source labels to target labels dict (as seen in labels in dataset config).
 Label extractors should implement the _extract method to extract the label from the image path or mask_path.
 There is no default implementation of the _extract method, so it must be implemented in the derived class.
+
+Extractors backed by a labels table should not filter the table for every image (a full scan per
+image is quadratic in the dataset size). Instead they build a hash index once at construction with
+_build_index and look the image or study key up in it. extract_many labels a batch of images in one
+call; AddLabels uses it, so extractors that can label several images at once may override it.
 """
 
 from abc import ABC, abstractmethod
+from typing import Hashable, Iterable, Sequence, Union
+
+import pandas as pd
 
 
 class BaseLabelExtractor(ABC):
@@ -30,6 +38,36 @@ class BaseLabelExtractor(ABC):
         """
         return self._extract(img_path, mask_path)
 
+    def extract_many(self, paths: Iterable[tuple[str, str]]) -> list[tuple[list, list]]:
+        """
+        Extract labels for a batch of images.
+
+        Args:
+            paths (Iterable[tuple[str, str]]): ``(img_path, mask_path)`` pairs.
+
+        Returns:
+            list[tuple[list, list]]: The ``(labels, source_labels)`` of each pair, in order.
+        """
+        return [self._extract(img_path, mask_path) for img_path, mask_path in paths]
+
+    @staticmethod
+    def _build_index(frame: pd.DataFrame, key: Union[str, Sequence[str]]) -> dict[Hashable, list[dict]]:
+        """
+        Group the rows of a labels table by key, for constant-time lookups per image.
+
+        Args:
+            frame (pd.DataFrame): The labels table.
+            key (Union[str, Sequence[str]]): Key column, or several columns for a tuple key.
+
+        Returns:
+            dict[Hashable, list[dict]]: The rows (as column -> value dicts, in table order) of each key.
+        """
+        index: dict[Hashable, list[dict]] = {}
+        for row in frame.to_dict("records"):
+            row_key = row[key] if isinstance(key, str) else tuple(row[column] for column in key)
+            index.setdefault(row_key, []).append(row)
+        return index
+
     @abstractmethod
     def _extract(self, img_path: str, mask_path: str) -> tuple[list, list]:
         """
@@ -0,0 +1,142 @@
+"""
+Cached index of a dataset's output tree, replacing repeated recursive globs.
+
+Most steps start or end by globbing the output tree (``**/Images/*.png``, ``**/Masks/*.png``,
+...). On network storage each recursive glob lists every directory of the tree again, which adds
+up to a dozen full walks of a multi-million-entry dataset per run. ``FileIndex`` lists each
+directory once with ``os.scandir`` and serves the same queries from memory, filtered by folder
+name, modality and extension.
+
+Steps create, rename and delete output files through many code paths (OpenCV, nibabel, shutil,
+external converters), so the index does not rely on being told about changes. Before answering a
+query it ``stat``s every indexed directory - one metadata call per directory instead of a full
+listing - and re-lists only the directories whose modification time changed, i.e. those in which
+a file was created, renamed or deleted. Rewriting a file in place (as the preprocessing steps
+do) keeps the listing valid. A directory modified within ``RACY_WINDOW_NS`` of its last listing
+is re-listed on the next query as well, so changes within one timestamp tick of a listing are
+never missed on filesystems with coarse timestamps.
+
+Like ``glob``, the index skips hidden (dot) files and folders and follows symlinked folders;
+unlike ``glob`` it returns paths in sorted order.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class _DirListing:
+    """Cached content of one directory."""
+
+    mtime_ns: int  # directory modification time when it was listed
+    listed_at_ns: int  # wall-clock time of the listing
+    files: list[str] = field(default_factory=list)  # non-hidden file names
+    dirs: list[str] = field(default_factory=list)  # non-hidden sub-directory names
+
+
+class FileIndex:
+    """Folder/modality/extension queries over a directory tree, re-listing only changed directories."""
+
+    #: Directories modified this close to their listing are re-listed on the next query.
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, root: str):
+        """Initialize the index (nothing is listed until the first query).
+
+        Args:
+            root (str): Root of the indexed tree, usually the dataset output root.
+        """
+        self.root = root
+        self._listings: dict[str, _DirListing] = {}
+
+    def files(
+        self,
+        folder: Optional[str] = None,
+        extension: Optional[str] = None,
+        modality: Optional[str] = None,
+        nested: bool = False,
+    ) -> list[str]:
+        """Return the paths of the indexed files matching every given filter.
+
+        ``files(folder="Images", extension="png")`` is the sorted equivalent of
+        ``glob.glob(os.path.join(root, "**/Images/*.png"), recursive=True)``.
+
+        Args:
+            folder (Optional[str]): Name of the folder holding the files, e.g. ``"Masks"``.
+            extension (Optional[str]): File extension without the leading dot, e.g. ``"nii.gz"``.
+            modality (Optional[str]): Only return files under ``root/<modality>``.
+            nested (bool): Also match files in sub-folders of ``folder`` (``**/Masks/**/*.png``).
+
+        Returns:
+            list[str]: Sorted absolute paths of the matching files.
+        """
+        self.refresh()
+        suffix = f".{extension}" if extension else ""
+        top = os.path.join(self.root, modality) if modality else None
+        paths: list[str] = []
+        for directory, listing in self._listings.items():
+            if top is not None and directory != top and not directory.startswith(top + os.sep):
+                continue
+            if folder is not None and not self._in_folder(directory, folder, nested):
+                continue
+            paths.extend(os.path.join(directory, name) for name in listing.files if name.endswith(suffix))
+        return sorted(paths)
+
+    def refresh(self) -> None:
+        """Bring the index up to date with the tree, re-listing only directories that changed."""
+        self._visit(self.root)
+
+    def _in_folder(self, directory: str, folder: str, nested: bool) -> bool:
+        """Return whether ``directory`` is (or, with ``nested``, lies under) a folder named ``folder``."""
+        parts = os.path.relpath(directory, self.root).split(os.sep)
+        if parts == [os.curdir]:
+            return False
+        return folder in parts if nested else parts[-1] == folder
+
+    def _visit(self, directory: str) -> None:
+        """Validate ``directory`` against its modification time, re-list it if needed, and recurse."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._forget(directory)
+            return
+        listing = self._listings.get(directory)
+        if (
+            listing is None
+            or listing.mtime_ns != mtime_ns
+            or listing.mtime_ns >= listing.listed_at_ns - self.RACY_WINDOW_NS
+        ):
+            listing = self._list(directory, mtime_ns)
+        for name in listing.dirs:
+            self._visit(os.path.join(directory, name))
+
+    def _list(self, directory: str, mtime_ns: int) -> _DirListing:
+        """List ``directory`` with ``os.scandir`` and replace its cached listing."""
+        listing = _DirListing(mtime_ns=mtime_ns, listed_at_ns=time.time_ns())
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    (listing.dirs if is_dir else listing.files).append(entry.name)
+        except OSError:
+            self._forget(directory)
+            return listing
+        previous = self._listings.get(directory)
+        if previous is not None:
+            for name in set(previous.dirs) - set(listing.dirs):
+                self._forget(os.path.join(directory, name))
+        self._listings[directory] = listing
+        return listing
+
+    def _forget(self, directory: str) -> None:
+        """Drop the cached listings of ``directory`` and everything below it."""
+        prefix = directory + os.sep
+        for key in [key for key in self._listings if key == directory or key.startswith(prefix)]:
+            del self._listings[key]
@@ -0,0 +1,113 @@
+"""
+Header-only image dimension probe, cached by path and modification time.
+
+Several steps decode whole images only to learn their size or to check that they exist:
+``CreateBlankMasks`` needs the height and width of every unannotated image, ``ValidateData``
+checks that every output file is readable and ``CheckMaskQuality`` compares image and mask
+dimensions. ``ImageProbe`` answers these from the file headers instead:
+
+* PNG - the IHDR chunk at the start of the file gives the height and width, provided the file
+  also ends with the IEND chunk (a truncated write is decoded instead, as before).
+* NIfTI (``.nii`` / ``.nii.gz``) - the header shape, read by nibabel without loading the data.
+* DICOM (``.dcm``) - the Rows and Columns attributes, read without the pixel data.
+
+Any other format (or a PNG whose header cannot be parsed) falls back to decoding with OpenCV,
+so the probe is never less capable than ``cv2.imread``. Results are cached per path together
+with the file's ``st_mtime_ns`` and size, so a file rewritten by a later step is probed again.
+"""
+
+import os
+import struct
+from typing import Optional
+
+import cv2
+import nibabel as nib  # type: ignore[import-untyped]
+from pydicom import dcmread
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Length (0), type and CRC of the IEND chunk that terminates every complete PNG file.
+PNG_IEND = b"\x00\x00\x00\x00IEND\xaeB`\x82"
+
+
+class ImageProbe:
+    """Image and volume dimensions read from the file headers, cached by path and mtime."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._cache: dict[str, tuple[int, int, Optional[tuple]]] = {}
+
+    def shape(self, path: str) -> Optional[tuple]:
+        """Return the dimensions of an image or volume without decoding its pixels.
+
+        Args:
+            path (str): Path to a PNG, NIfTI or DICOM file (other formats are decoded).
+        Returns:
+            Optional[tuple]: ``(height, width)`` for 2D images, the header shape for NIfTI
+                volumes, or None when the file is missing or unreadable.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self._cache.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        shape = self._probe(path)
+        self._cache[path] = (stat.st_mtime_ns, stat.st_size, shape)
+        return shape
+
+    def is_readable(self, path: str) -> bool:
+        """Check that a file is an image or volume whose dimensions can be read.
+
+        Args:
+            path (str): Path to the file.
+        Returns:
+            bool: True when the file exists and its header parses.
+        """
+        return self.shape(path) is not None
+
+    def _probe(self, path: str) -> Optional[tuple]:
+        """Read the dimensions of ``path`` from its header (uncached)."""
+        lower = path.lower()
+        if lower.endswith(".png"):
+            shape = _png_shape(path)
+            if shape is not None:
+                return shape
+        elif lower.endswith((".nii", ".nii.gz")):
+            return _nifti_shape(path)
+        elif lower.endswith(".dcm"):
+            return _dicom_shape(path)
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        return None if image is None else tuple(image.shape[:2])
+
+
+def _png_shape(path: str) -> Optional[tuple]:
+    """``(height, width)`` from the IHDR chunk of a complete PNG file, or None."""
+    try:
+        with open(path, "rb") as handle:
+            header = handle.read(24)
+            handle.seek(-len(PNG_IEND), os.SEEK_END)
+            trailer = handle.read()
+    except OSError:
+        return None
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR" or trailer != PNG_IEND:
+        return None
+    width, height = struct.unpack(">II", header[16:24])
+    return (height, width)
+
+
+def _nifti_shape(path: str) -> Optional[tuple]:
+    """Header shape of a NIfTI volume, or None when it cannot be loaded."""
+    try:
+        return tuple(int(d) for d in nib.load(path).shape)  # type: ignore[attr-defined]
+    except Exception:
+        return None
+
+
+def _dicom_shape(path: str) -> Optional[tuple]:
+    """``(Rows, Columns)`` of a DICOM file, or None when they cannot be read."""
+    try:
+        ds = dcmread(path, stop_before_pixels=True, specific_tags=["Rows", "Columns"])
+        return (int(ds.Rows), int(ds.Columns))
+    except Exception:
+        return None
@@ -21,9 +21,14 @@ from base.extractors import (
     BaseModalityIdExtractor,
     BaseStudyIdExtractor,
 )
+from base.file_index import FileIndex
+from base.image_probe import ImageProbe
+from base.profiling import StepProfiler
+from base.record_store import RecordStore
 from base.selectors.img_selector import BaseImageSelector
 from base.selectors.mask_selector import BaseMaskSelector
 from base.step import BaseStep
+from base.streaming import StreamingPipeline
 from config.dataset_config import DatasetArgs
 from src.constants import (
     DEFAULT_OUTPUT_MODE,
@@ -196,8 +201,38 @@ class ExportConfig:
     # Task 29 - parallel execution
     num_workers: int = 1  # >1 enables multiprocessing in steps that support it (deterministic regardless of count)
 
+    # Streaming execution: run consecutive per-file steps as one generator chain (base/streaming.py)
+    streaming: bool = False
+
+    # Series-level DICOM conversion: ConvertDcm2Png applies rescale and window to stacks of slices
+    # of a series folder as one float32 operation (PNGs may differ by one gray level from per-file)
+    dicom_series_batches: bool = False
+
+    # Shared JSONL record store (base/record_store.py)
+    defer_jsonl_writes: bool = False  # keep the JSONL records in memory across steps and write them once at the end
+    jsonl_checkpoint: bool = False  # with defer_jsonl_writes, also write an atomic snapshot after each JSONL change
+
+    # Blank masks: point the mask_path of every unannotated image at one shared mask per resolution
+    # ({dataset}/BlankMasks/{height}x{width}.png) instead of writing a copy per image
+    shared_blank_masks: bool = False
+
+    # Content-addressed conversion cache (base/conversion_cache.py), shared across runs: converters copy
+    # outputs of already converted (source content, settings) pairs from it instead of decoding again
+    conversion_cache_dir: Optional[str] = None  # cache directory; None disables the cache
+    conversion_cache_max_gb: Optional[float] = None  # evict least recently used entries beyond this size
+
+    # Per-step profiling (base/profiling.py): JSON + Markdown report in the dataset's reports folder
+    profile_steps: bool = False  # record wall / CPU time, peak RSS, files and bytes in / out of every step
+    profile_cprofile: bool = False  # with profile_steps, also dump a cProfile of every step to reports/profiles
+
     # Task 30 - HuggingFace export
     hf_export_path: Optional[str] = None  # local directory to write the Arrow dataset + card to
+    hf_shard_size: int = 1000  # records per resumable export shard (bounds the memory of ExportHuggingFace)
+
+    # WebDataset export (steps/export_webdataset.py): split-aware tar shards + index.json
+    wds_export_path: Optional[str] = None  # directory for the shards; None -> {dataset_root}/webdataset
+    wds_shard_max_mb: float = 1024  # upper bound on the size of a shard
+    wds_shard_max_samples: int = 10000  # upper bound on the number of samples in a shard
 
 
 @dataclass
@@ -305,6 +340,16 @@ class PipelineContext:
     metadata: MetadataConfig = field(default_factory=MetadataConfig)
     format_conversion: FormatConfig = field(default_factory=FormatConfig)
     export: ExportConfig = field(default_factory=ExportConfig)
+    # Dataset JSONL records shared by all steps of a run; created on first use by ``BaseStep.records``.
+    records: Optional[RecordStore] = None
+    # Index of the dataset output tree shared by all steps of a run; created on first use by ``BaseStep.file_index``.
+    file_index: Optional[FileIndex] = None
+    # Header-only image dimension probe shared by all steps of a run; created on first use by ``BaseStep.image_probe``.
+    image_probe: Optional[ImageProbe] = None
+    # Step profiler shared by all steps of a run; created on first use by ``BaseStep.profiler``.
+    profiler: Optional[StepProfiler] = None
+    # Label values present in each segmentation slice, keyed by the slice's UMIE id; filled by ``ConvertNii2Png``.
+    mask_slice_values: dict = field(default_factory=dict)
 
 
 @dataclass  # type: ignore[misc]
@@ -377,7 +422,7 @@ class BasePipeline:
         return registry[step_name]
 
     @property
-    def pipeline(self) -> Pipeline:
+    def pipeline(self) -> Pipeline | StreamingPipeline:
         """Create a pipeline, swapping 2D conversion steps for 3D ones in VOLUMES_3D mode.
 
         Each step receives the structured PipelineContext (no flat-dict / asdict). When
@@ -385,6 +430,10 @@ class BasePipeline:
         ``convert_nii2nii``/``convert_dcm2nii`` per ``STEP_3D_ALTERNATIVES``. When
         ``schema_version == "2.0"``, a final ``convert_jsonl_to_v2`` step is appended so the emitted
         JSONL is upgraded to the hierarchical v2 schema (no-op / not appended in the v1 default).
+        With ``export.defer_jsonl_writes`` a final ``flush_records`` step writes the in-memory
+        JSONL records once, after every other step.
+        With ``export.streaming`` the same steps are returned as a ``StreamingPipeline``, which
+        fuses consecutive per-file steps into one generator chain.
         """
         use_3d = self.ctx.paths.output_mode == OutputMode.VOLUMES_3D
         steps = []
@@ -400,6 +449,10 @@ class BasePipeline:
             steps.append(("store_volumes_alongside", self._resolve_step("StoreVolumesAlongside")(self.ctx)))
         if self.ctx.paths.schema_version == SCHEMA_VERSION_V2:
             steps.append(("convert_jsonl_to_v2", self._resolve_step("ConvertJsonlToV2")(self.ctx)))
+        if self.ctx.export.defer_jsonl_writes:
+            steps.append(("flush_records", self._resolve_step("FlushRecords")(self.ctx)))
+        if self.ctx.export.streaming:
+            return StreamingPipeline(steps=steps)
         return Pipeline(steps=steps)
 
     @staticmethod
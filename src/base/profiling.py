@@ -0,0 +1,222 @@
+"""
+Per-step profiling of pipeline runs (opt-in with ``ExportConfig.profile_steps``).
+
+``BaseStep`` routes every step's ``transform`` through ``StepProfiler.measure``, and the streaming
+engine measures each fused run of streaming steps as one entry. For every step the profiler records
+wall time, CPU time (including worker processes that finished during the step), the peak resident
+set size of the main process, the number of files in and out, and the bytes the main process read
+and wrote. After each step it rewrites ``pipeline_profile.json`` and ``pipeline_profile.md`` in the
+dataset's reports folder, so a run that crashes or is killed still leaves the report of the steps it
+finished.
+
+With ``ExportConfig.profile_cprofile`` each step additionally runs under ``cProfile`` and its
+statistics are dumped to ``reports/profiles/<n>_<Step>.prof`` (open with ``pstats`` or snakeviz).
+
+The peak RSS and I/O counters come from ``/proc/self`` and are only available on Linux; elsewhere
+the peak RSS falls back to the process-lifetime peak and the byte counts are reported as null.
+"""
+
+import cProfile
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+PROFILE_JSON_NAME = "pipeline_profile.json"
+PROFILE_MD_NAME = "pipeline_profile.md"
+
+
+@dataclass
+class StepProfile:
+    """Measurements of one step (or fused streaming run) of a pipeline run."""
+
+    step: str  # step class name; fused streaming runs join the names with " -> "
+    wall_s: float  # elapsed wall-clock time
+    cpu_s: float  # user + system CPU time of the main process and of reaped worker processes
+    peak_rss_bytes: Optional[int]  # peak resident set size of the main process during the step
+    files_in: Optional[int]  # length of the step input, when it is a list
+    files_out: Optional[int]  # length of the step output, when it is a list
+    bytes_read: Optional[int]  # bytes read by the main process (Linux only)
+    bytes_written: Optional[int]  # bytes written by the main process (Linux only)
+    cprofile_path: Optional[str] = None  # cProfile dump of the step, with profile_cprofile
+
+
+class StepProfiler:
+    """Measure pipeline steps and keep the JSON / Markdown profile report of the run up to date."""
+
+    def __init__(self, reports_dir: str, dataset_name: str, cprofile: bool = False):
+        """Initialize the profiler.
+
+        Args:
+            reports_dir (str): Folder the reports are written to (created when the first report is written).
+            dataset_name (str): Name of the profiled dataset, shown in the reports.
+            cprofile (bool): Also run every step under ``cProfile`` and dump its statistics.
+        """
+        self.reports_dir = reports_dir
+        self.dataset_name = dataset_name
+        self.cprofile = cprofile
+        self.steps: list[StepProfile] = []
+        self._active = False
+
+    @contextmanager
+    def measure(self, step: str, X: Any) -> Iterator[dict]:
+        """Measure the body of the ``with`` block as one step and update the reports afterwards.
+
+        Nested measurements (a step calling another step's ``transform``) are counted as part of
+        the outer step.
+
+        Args:
+            step (str): Name of the step.
+            X (Any): Input of the step.
+
+        Yields:
+            dict: Put the step output under ``"output"`` to have its files counted.
+        """
+        result: dict = {}
+        if self._active:
+            yield result
+            return
+        self._active = True
+        files_in = _count(X)
+        profiler = cProfile.Profile() if self.cprofile else None
+        _reset_peak_rss()
+        io_before = _io_counters()
+        cpu_before = _cpu_time()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield result
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - start
+            cpu = _cpu_time() - cpu_before
+            io_after = _io_counters()
+            self._active = False
+            record = StepProfile(
+                step=step,
+                wall_s=round(wall, 6),
+                cpu_s=round(cpu, 6),
+                peak_rss_bytes=_peak_rss(),
+                files_in=files_in,
+                files_out=_count(result.get("output")),
+                bytes_read=io_after[0] - io_before[0] if io_after and io_before else None,
+                bytes_written=io_after[1] - io_before[1] if io_after and io_before else None,
+            )
+            if profiler is not None:
+                record.cprofile_path = self._dump_cprofile(profiler, step)
+            self.steps.append(record)
+            self.write_reports()
+
+    def write_reports(self) -> None:
+        """Write the JSON and Markdown reports of the steps measured so far."""
+        os.makedirs(self.reports_dir, exist_ok=True)
+        total_wall = sum(record.wall_s for record in self.steps)
+        with open(os.path.join(self.reports_dir, PROFILE_JSON_NAME), "w") as handle:
+            json.dump(
+                {
+                    "dataset": self.dataset_name,
+                    "total_wall_s": round(total_wall, 6),
+                    "steps": [asdict(record) for record in self.steps],
+                },
+                handle,
+                indent=2,
+            )
+        with open(os.path.join(self.reports_dir, PROFILE_MD_NAME), "w") as handle:
+            handle.write(self._markdown(total_wall))
+
+    def _markdown(self, total_wall: float) -> str:
+        """Render the measured steps as a Markdown table, slowest step highlighted."""
+        lines = [
+            f"# Pipeline profile: {self.dataset_name}",
+            "",
+            "| # | Step | Wall (s) | Share | CPU (s) | Peak RSS (MiB) | Files in | Files out | Read (MiB) | Written (MiB) |",
+            "|---|------|---------:|------:|--------:|---------------:|---------:|----------:|-----------:|--------------:|",
+        ]
+        for index, record in enumerate(self.steps, start=1):
+            share = record.wall_s / total_wall if total_wall else 0.0
+            lines.append(
+                f"| {index} | {record.step} | {record.wall_s:.3f} | {share:.1%} | {record.cpu_s:.3f} | "
+                f"{_mib(record.peak_rss_bytes)} | {_or_dash(record.files_in)} | {_or_dash(record.files_out)} | "
+                f"{_mib(record.bytes_read)} | {_mib(record.bytes_written)} |"
+            )
+        if self.steps:
+            slowest = max(self.steps, key=lambda record: record.wall_s)
+            lines += [
+                "",
+                f"Total wall time: {total_wall:.3f} s. Slowest step: **{slowest.step}** ({slowest.wall_s:.3f} s).",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def _dump_cprofile(self, profiler: cProfile.Profile, step: str) -> str:
+        """Dump a step's cProfile statistics and return the path of the dump."""
+        profiles_dir = os.path.join(self.reports_dir, "profiles")
+        os.makedirs(profiles_dir, exist_ok=True)
+        name = "".join(char if char.isalnum() else "_" for char in step)
+        path = os.path.join(profiles_dir, f"{len(self.steps) + 1:02d}_{name}.prof")
+        profiler.dump_stats(path)
+        return path
+
+
+def _count(items: Any) -> Optional[int]:
+    """Return the number of files of a step input / output, or None when it is not a list."""
+    return len(items) if isinstance(items, (list, tuple)) else None
+
+
+def _cpu_time() -> float:
+    """Return the user + system CPU time of this process and of its reaped children."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _reset_peak_rss() -> None:
+    """Reset the peak RSS of this process (Linux), so it can be read per step."""
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> Optional[int]:
+    """Return the peak RSS of this process in bytes since the last reset (Linux) or since it started."""
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+
+
+def _io_counters() -> Optional[tuple[int, int]]:
+    """Return the (read, written) byte counters of this process (Linux), or None."""
+    try:
+        with open("/proc/self/io") as handle:
+            counters = dict(line.split(":") for line in handle if ":" in line)
+        return int(counters["rchar"]), int(counters["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _mib(value: Optional[int]) -> str:
+    """Format a byte count in MiB for the Markdown report."""
+    return "-" if value is None else f"{value / (1 << 20):.1f}"
+
+
+def _or_dash(value: Optional[int]) -> str:
+    """Format an optional count for the Markdown report."""
+    return "-" if value is None else str(value)
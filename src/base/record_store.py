@@ -0,0 +1,118 @@
+"""
+Dataset JSONL record store shared by the steps of one pipeline run.
+
+Every step that enriches the dataset JSONL (UMIE ids, labels, blank masks, provenance, splits,
+DICOM metadata, spacing, ...) used to parse the whole file, edit its records and serialize it
+again. ``RecordStore`` puts those reads and writes behind one object that lives on
+``PipelineContext`` and is reached through ``BaseStep.records``:
+
+    records = self.records.read()      # ordered list of record dicts
+    ...                                # edit / filter / rebuild the records
+    self.records.write(records)        # hand the new state back
+
+By default (write-through) ``read`` parses the file and ``write`` serializes it, exactly as
+before, so a step used on its own behaves identically. With ``ExportConfig.defer_jsonl_writes``
+the records stay in memory between steps: the file is parsed at most once, steps edit the
+shared records, and ``flush`` writes the JSONL once at the end of the pipeline (the automatically
+appended ``flush_records`` step). ``ExportConfig.jsonl_checkpoint`` additionally writes a
+snapshot after every step that changed the records, so a crash loses at most the current step.
+
+Writes go through ``jsonlines`` (byte-identical to the previous output) into a temporary file
+that is atomically renamed over the JSONL, so a reader never sees a half-written file.
+"""
+
+import os
+from typing import Optional
+
+import jsonlines
+
+
+class RecordStore:
+    """Ordered dataset JSONL records with ``umie_path`` lookup, optionally kept in memory across steps."""
+
+    def __init__(self, json_path: str, deferred: bool = False, checkpoint: bool = False):
+        """Initialize the store.
+
+        Args:
+            json_path (str): Path to the dataset JSONL file.
+            deferred (bool): Keep the records in memory and only write them on ``flush``.
+            checkpoint (bool): In deferred mode, also write a snapshot on every ``write``.
+        """
+        self.json_path = json_path
+        self.deferred = deferred
+        self.checkpoint = checkpoint
+        self._records: Optional[list[dict]] = None  # in-memory state (deferred mode only)
+        self._index: Optional[dict[str, dict]] = None  # umie_path -> record, built on demand
+        self._dirty = False
+
+    def exists(self) -> bool:
+        """Return True when there is a JSONL to read (in memory or on disk)."""
+        return self._records is not None or os.path.exists(self.json_path)
+
+    def read(self) -> list[dict]:
+        """Return the records in file order.
+
+        In deferred mode the returned dicts are the shared in-memory records: edit them and pass
+        the list back to ``write``.
+
+        Returns:
+            list[dict]: The dataset records.
+        """
+        if self._records is not None:
+            return self._records
+        with jsonlines.open(self.json_path, mode="r") as reader:
+            records = list(reader)
+        if self.deferred:
+            self._records = records
+        return records
+
+    def write(self, records: list[dict]) -> None:
+        """Replace the records with ``records``.
+
+        Args:
+            records (list[dict]): The new dataset records, in output order.
+        """
+        self._index = None
+        if not self.deferred:
+            self._dump(records)
+            return
+        self._records = records
+        self._dirty = True
+        if self.checkpoint:
+            self.flush()
+
+    def get(self, umie_path: str) -> Optional[dict]:
+        """Return the (first) record with the given ``umie_path``, or None.
+
+        The lookup index is built from one ``read`` and reused until the next ``write`` or
+        ``reset``, so repeated lookups do not re-parse the JSONL.
+
+        Args:
+            umie_path (str): UMIE path of the image.
+
+        Returns:
+            Optional[dict]: The matching record.
+        """
+        if self._index is None:
+            self._index = {}
+            for record in self.read():
+                self._index.setdefault(record.get("umie_path", ""), record)
+        return self._index.get(umie_path)
+
+    def flush(self) -> None:
+        """Write the in-memory records to the JSONL if they changed since the last flush."""
+        if self._records is not None and self._dirty:
+            self._dump(self._records)
+            self._dirty = False
+
+    def reset(self) -> None:
+        """Forget the in-memory records (e.g. after the dataset folder was deleted)."""
+        self._records, self._index, self._dirty = None, None, False
+
+    def _dump(self, records: list[dict]) -> None:
+        """Atomically serialize ``records`` to the JSONL (temporary file + rename)."""
+        tmp_path = f"{self.json_path}.tmp"
+        with jsonlines.open(tmp_path, mode="w") as writer:
+            for record in records:
+                writer.write(record)
+        os.replace(tmp_path, self.json_path)
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import functools
 import os
 from pathlib import PureWindowsPath
-from typing import TYPE_CHECKING, Callable, Optional
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Iterator, Optional
 
 import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from base.conversion_cache import ConversionCache
 from base.creators.xml_mask import BaseXmlMaskCreator
+from base.file_index import FileIndex
+from base.image_probe import ImageProbe
+from base.profiling import StepProfiler
+from base.record_store import RecordStore
 from base.selectors.img_selector import BaseImageSelector
 from base.selectors.mask_selector import BaseMaskSelector
 from constants import REPORTS_FOLDER_NAME, OutputMode
@@ -35,8 +41,25 @@ class BaseStep(TransformerMixin, BaseEstimator):
     UMIE steps do stateless work in ``transform`` and are run via ``pipeline.transform(...)`` without a
     preceding ``fit``; ``__sklearn_is_fitted__`` therefore reports ``True`` so scikit-learn 1.6+'s
     ``check_is_fitted`` in ``Pipeline.transform`` passes.
+
+    Per-file steps can additionally opt in to the streaming engine (``base.streaming``) by setting
+    ``supports_streaming`` and implementing ``transform_stream``.
+
+    Every subclass's ``transform`` is wrapped so that, with ``ExportConfig.profile_steps``, the call
+    is measured by the run's ``StepProfiler`` (``base.profiling``).
     """
 
+    #: Whether the step can run per file inside ``base.streaming.StreamingPipeline``.
+    supports_streaming: ClassVar[bool] = False
+    #: Whether the items yielded by ``transform_stream`` are scratch files the next streaming step consumes.
+    stream_outputs_are_temporary: ClassVar[bool] = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Wrap the ``transform`` a subclass defines with the per-step profiling hook."""
+        super().__init_subclass__(**kwargs)
+        if "transform" in cls.__dict__:
+            cls.transform = _profiled(cls.__dict__["transform"])  # type: ignore[method-assign]
+
     def __sklearn_is_fitted__(self) -> bool:
         """Report the step as fitted (its ``transform`` is stateless and needs no prior ``fit``)."""
         return True
@@ -250,6 +273,52 @@ class BaseStep(TransformerMixin, BaseEstimator):
         """Absolute path to this dataset's output root (``{target}/{uid}_{name}``)."""
         return os.path.join(self.target_path, f"{self.dataset_uid}_{self.dataset_name}")
 
+    @property
+    def records(self) -> RecordStore:
+        """The dataset JSONL records shared by every step of the run (see ``base.record_store``)."""
+        if self.ctx.records is None:
+            self.ctx.records = RecordStore(
+                self.json_path,
+                deferred=self.ctx.export.defer_jsonl_writes,
+                checkpoint=self.ctx.export.jsonl_checkpoint,
+            )
+        return self.ctx.records
+
+    @property
+    def file_index(self) -> FileIndex:
+        """Cached index of the dataset output tree shared by every step of the run (see ``base.file_index``)."""
+        if self.ctx.file_index is None or self.ctx.file_index.root != self.dataset_root:
+            self.ctx.file_index = FileIndex(self.dataset_root)
+        return self.ctx.file_index
+
+    @property
+    def conversion_cache(self) -> Optional[ConversionCache]:
+        """The persistent conversion cache configured in ``ExportConfig`` (see ``base.conversion_cache``), if any."""
+        cache_dir = self.ctx.export.conversion_cache_dir
+        if cache_dir is None:
+            return None
+        max_gb = self.ctx.export.conversion_cache_max_gb
+        return ConversionCache(cache_dir, None if max_gb is None else int(max_gb * 2**30))
+
+    @property
+    def image_probe(self) -> ImageProbe:
+        """Header-only image dimension probe shared by every step of the run (see ``base.image_probe``)."""
+        if self.ctx.image_probe is None:
+            self.ctx.image_probe = ImageProbe()
+        return self.ctx.image_probe
+
+    @property
+    def profiler(self) -> StepProfiler:
+        """Step profiler of the run, writing its reports to the dataset's reports folder (see ``base.profiling``)."""
+        reports_dir = os.path.join(self.dataset_root, REPORTS_FOLDER_NAME)
+        if self.ctx.profiler is None or self.ctx.profiler.reports_dir != reports_dir:
+            self.ctx.profiler = StepProfiler(
+                reports_dir,
+                f"{self.dataset_uid}_{self.dataset_name}",
+                cprofile=self.ctx.export.profile_cprofile,
+            )
+        return self.ctx.profiler
+
     def reports_dir(self) -> str:
         """Return (creating if needed) the per-dataset folder for optional analysis reports.
 
@@ -272,6 +341,24 @@ class BaseStep(TransformerMixin, BaseEstimator):
         """
         raise NotImplementedError("This method should be implemented in the derived class.")
 
+    def start_stream(self) -> None:
+        """Prepare per-run state before the first item reaches ``transform_stream`` (no-op by default)."""
+        return None
+
+    def transform_stream(self, X: Iterator[str]) -> Iterator[str]:
+        """Lazily process path items one by one (streaming counterpart of ``transform``).
+
+        Args:
+            X (Iterator[str]): Paths yielded by the previous step of the streaming run.
+        Returns:
+            Iterator[str]: Paths for the next step.
+        """
+        raise NotImplementedError("Steps with supports_streaming must implement transform_stream.")
+
+    def finish_stream(self) -> None:
+        """Flush state accumulated over the stream once it is drained (no-op by default)."""
+        return None
+
     def get_umie_id(self, img_path: str) -> str:
         """Create a unique identifier for the image.
 
@@ -413,3 +500,17 @@ class BaseStep(TransformerMixin, BaseEstimator):
             str: Path to the image without the target path.
         """
         return PureWindowsPath(os.path.relpath(path, self.target_path)).as_posix()
+
+
+def _profiled(transform: Callable) -> Callable:
+    """Wrap a step's ``transform`` so it is measured when ``ExportConfig.profile_steps`` is set."""
+
+    @functools.wraps(transform)
+    def wrapper(self: BaseStep, X: Any, *args: Any, **kwargs: Any) -> Any:
+        if not self.ctx.export.profile_steps:
+            return transform(self, X, *args, **kwargs)
+        with self.profiler.measure(type(self).__name__, X) as result:
+            result["output"] = transform(self, X, *args, **kwargs)
+        return result["output"]
+
+    return wrapper
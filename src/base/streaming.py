@@ -0,0 +1,130 @@
+"""
+Streaming execution engine for per-file steps.
+
+The default engine is scikit-learn's ``Pipeline``: every step's ``transform`` receives the full
+path list, processes every file, and returns the list for the next step (usually by re-globbing
+the output tree). ``StreamingPipeline`` is an opt-in alternative (``ExportConfig.streaming``)
+with the same ``steps`` / ``transform(X)`` surface.
+
+Consecutive steps that declare ``supports_streaming`` are fused into one generator chain: each
+source file flows through the whole run (e.g. conversion -> UMIE id -> recolor -> labels) before
+the next one is read, so the first outputs appear as soon as the first file is converted.
+Every other step is a barrier and runs stage-at-a-time on the materialized list, exactly as
+under sklearn, so any pipeline can opt in without reordering its steps.
+
+Streaming step contract (see ``BaseStep.transform_stream``):
+    * ``start_stream()`` runs before the first item, in step order.
+    * ``transform_stream(items)`` lazily consumes path items and yields the paths the next
+      step should receive. A step consuming another step's outputs must be done with an item
+      before it requests the next one (only the converters, which read source files, prefetch).
+    * ``finish_stream()`` runs after the run is drained, in step order, and flushes state
+      accumulated over the stream (e.g. the JSONL records). Barrier steps only ever see the
+      state left by ``finish_stream``, so the final output matches the stage-at-a-time engine.
+
+A step with ``stream_outputs_are_temporary`` (the source-tree converters) yields scratch files.
+When such a step is followed by another step of the same run, each scratch file is deleted as
+soon as the downstream chain has finished with it, so converted PNGs never pile up in the
+source tree.
+"""
+
+import os
+from typing import Iterable, Iterator
+
+from tqdm import tqdm
+
+from base.step import BaseStep
+
+
+class StreamingPipeline:
+    """Run a pipeline's steps, fusing consecutive streaming steps into one generator chain."""
+
+    def __init__(self, steps: list[tuple[str, BaseStep]]):
+        """Initialize the pipeline.
+
+        Args:
+            steps (list[tuple[str, BaseStep]]): Ordered ``(name, step)`` pairs, as for sklearn's ``Pipeline``.
+        """
+        self.steps = steps
+
+    def runs(self) -> list[list[tuple[str, BaseStep]]]:
+        """Split the steps into runs: maximal groups of streaming steps, or a single barrier step.
+
+        Returns:
+            list[list[tuple[str, BaseStep]]]: The runs in execution order.
+        """
+        runs: list[list[tuple[str, BaseStep]]] = []
+        for name, step in self.steps:
+            if step.supports_streaming and runs and runs[-1][-1][1].supports_streaming:
+                runs[-1].append((name, step))
+            else:
+                runs.append([(name, step)])
+        return runs
+
+    def transform(self, X: list) -> list:
+        """Run every step, streaming items through the fused runs.
+
+        Args:
+            X (list): Input of the first step (the source path for the repo's pipelines).
+
+        Returns:
+            list: Output of the last step.
+        """
+        for run in self.runs():
+            if len(run) == 1 and not run[0][1].supports_streaming:
+                X = run[0][1].transform(X)
+            else:
+                X = self._stream(run, X)
+        return X
+
+    def _stream(self, run: list[tuple[str, BaseStep]], X: Iterable) -> list:
+        """Drain one fused run of streaming steps and return the items yielded by its last step.
+
+        Args:
+            run (list[tuple[str, BaseStep]]): Consecutive streaming steps.
+            X (Iterable): Items entering the first step of the run.
+
+        Returns:
+            list: Items yielded by the last step of the run.
+        """
+        first_step = run[0][1]
+        if first_step.ctx.export.profile_steps:
+            with first_step.profiler.measure(" -> ".join(type(step).__name__ for _, step in run), X) as result:
+                result["output"] = self._drain(run, X)
+            return result["output"]
+        return self._drain(run, X)
+
+    def _drain(self, run: list[tuple[str, BaseStep]], X: Iterable) -> list:
+        """Chain the streaming steps of a run and drain it (see ``_stream``)."""
+        names = " -> ".join(name for name, _ in run)
+        print(f"Streaming {names}...")
+        for _, step in run:
+            step.start_stream()
+
+        items: Iterator = iter(X)
+        for index, (_, step) in enumerate(run):
+            items = step.transform_stream(items)
+            if step.stream_outputs_are_temporary and index < len(run) - 1:
+                items = _delete_when_consumed(items)
+        outputs = list(tqdm(items, desc=names))
+
+        for _, step in run:
+            step.finish_stream()
+        return outputs
+
+
+def _delete_when_consumed(items: Iterator[str]) -> Iterator[str]:
+    """Yield scratch files and delete each one once the downstream chain asks for the next item.
+
+    Downstream streaming steps do not read ahead, so by the time the next item is requested the
+    previous one has been fully processed (and typically moved into the target tree already).
+
+    Args:
+        items (Iterator[str]): Paths of scratch files.
+
+    Yields:
+        str: The same paths.
+    """
+    for item in items:
+        yield item
+        if os.path.exists(item):
+            os.remove(item)
@@ -54,14 +54,15 @@ class LabelExtractor(BaseLabelExtractor):
         """Initialize the extractor."""
         super().__init__(labels)
         self.source_labels = pd.read_csv(labels_path)[["Image Index", "Finding Labels"]]
+        self.index = self._build_index(self.source_labels, "Image Index")
 
     def _extract(self, img_path: os.PathLike, *args: Any) -> tuple[list, list]:
         """Extract label from img path."""
         img_name = os.path.basename(img_path)
-        img_row = self.source_labels.loc[self.source_labels["Image Index"] == img_name]
-        if img_row.empty:
+        img_rows = self.index.get(img_name)
+        if not img_rows:
             return [], []
-        labels = [label for label in img_row["Finding Labels"].values[0].split("|")]
+        labels = [label for label in img_rows[0]["Finding Labels"].split("|")]
         radlex_labels: list = []
         for label in labels:
             radlex_labels.extend(self.labels[label])
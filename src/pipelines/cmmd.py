@@ -87,6 +87,7 @@ class LabelExtractor(BaseLabelExtractor):
         self.source_labels.rename(
             columns={"ID1": "id", "LeftRight": "LR", "abnormality": "label1", "classification": "label2"}, inplace=True
         )
+        self.index = self._build_index(self.source_labels, ["id", "LR"])
 
     def _extract(self, img_path: os.PathLike, *args: Any) -> tuple[list, list]:
         """Extract label from img path."""
@@ -102,21 +103,17 @@ class LabelExtractor(BaseLabelExtractor):
         # breast have different abnormality or classification values
         # ​​assigned. Hence, the 'L' and 'R' values in LeftRight column
         # must be taken into account additionally.
-        pre_label_Right = self.source_labels[
-            (self.source_labels["id"] == img_path_label) & (self.source_labels["LR"] == "R")
-        ].values
-        pre_label_Left = self.source_labels[
-            (self.source_labels["id"] == img_path_label) & (self.source_labels["LR"] == "L")
-        ].values
-
-        if pre_label_Right.shape[0] == 0:
-            label1 = pre_label_Left[0][2]
-            label2 = pre_label_Left[0][3]
+        pre_label_Right = self.index.get((img_path_label, "R"), [])
+        pre_label_Left = self.index.get((img_path_label, "L"), [])
+
+        if len(pre_label_Right) == 0:
+            label1 = pre_label_Left[0]["label1"]
+            label2 = pre_label_Left[0]["label2"]
             radlex_label = self.labels[label1] + self.labels[label2]
 
-        elif pre_label_Left.shape[0] == 0:
-            label1 = pre_label_Right[0][2]
-            label2 = pre_label_Right[0][3]
+        elif len(pre_label_Left) == 0:
+            label1 = pre_label_Right[0]["label1"]
+            label2 = pre_label_Right[0]["label2"]
             radlex_label = self.labels[label1] + self.labels[label2]
 
         else:
@@ -125,13 +122,13 @@ class LabelExtractor(BaseLabelExtractor):
             # '1-2.dcm' correspond to the left breast. The other two
             # correspond to the right breast.
             if img_numb == 1 or img_numb == 2:
-                label1 = pre_label_Left[0][2]
-                label2 = pre_label_Left[0][3]
+                label1 = pre_label_Left[0]["label1"]
+                label2 = pre_label_Left[0]["label2"]
                 radlex_label = self.labels[label1] + self.labels[label2]
 
             else:
-                label1 = pre_label_Right[0][2]
-                label2 = pre_label_Right[0][3]
+                label1 = pre_label_Right[0]["label1"]
+                label2 = pre_label_Right[0]["label2"]
                 radlex_label = self.labels[label1] + self.labels[label2]
 
         return radlex_label, [label1, label2]
@@ -60,21 +60,22 @@ class LabelExtractor(BaseLabelExtractor):
         super().__init__(labels)
         self.source_labels = pd.read_csv(labels_path)
         self.source_labels.rename(columns={"Unnamed: 0": "id"}, inplace=True)
+        self.index = self._build_index(self.source_labels, "id")
 
     def _extract(self, img_path: os.PathLike, *args: Any) -> tuple[list[dict[str, int]], list[str]]:
         """Extract label from img path."""
         img_name = os.path.split(img_path)[-1]
         study_id = img_name.split("_")[2]
-        img_row = self.source_labels.loc[self.source_labels["id"] == int(study_id)]
-        source_label = img_row["Label"].values[0]
+        img_row = self.index.get(int(study_id), [])[0]
+        source_label = img_row["Label"]
 
         radlex_labels = []
         # NOTE: the upstream CoronaHack metadata CSV spells this label "Pnemonia" (sic).
         # Matched verbatim against the source data on purpose - do not "correct" the spelling.
         if source_label == "Pnemonia":
-            if img_row["Label_1_Virus_category"].values[0] == "bacteria":
+            if img_row["Label_1_Virus_category"] == "bacteria":
                 source_label = "PneumoniaBacteria"
-            elif img_row["Label_1_Virus_category"].values[0] == "Virus":
+            elif img_row["Label_1_Virus_category"] == "Virus":
                 source_label = "PneumoniaVirus"
 
         if source_label in self.labels.keys():
@@ -4,7 +4,7 @@ import json
 import os
 import re
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Optional
 
 import cv2
 import numpy as np
@@ -52,40 +52,66 @@ class StudyIdExtractor(BaseStudyIdExtractor):
 class LabelExtractor(BaseLabelExtractor):
     """Extractor for labels specific to the KITS23 dataset."""
 
-    def __init__(self, labels: dict, labels_path: str, kidney_findings_colors: list):
-        """Initialize label extractor."""
+    def __init__(
+        self,
+        labels: dict,
+        labels_path: str,
+        kidney_findings_colors: list,
+        slice_values: Optional[dict] = None,
+        kidney_findings_source_colors: Optional[list] = None,
+    ):
+        """Initialize label extractor.
+
+        Args:
+            labels (dict): Mapping of source labels to target labels.
+            labels_path (str): Path to ``kits23.json``.
+            kidney_findings_colors (list): Mask colors of the kidney tumor and cyst.
+            slice_values (Optional[dict]): Label values of each segmentation slice keyed by UMIE id
+                (``PipelineContext.mask_slice_values``); masks of slices missing from it are read from disk.
+            kidney_findings_source_colors (Optional[list]): Segmentation values of the kidney tumor and cyst.
+        """
         super().__init__(labels)
         with open(labels_path) as f:
             self.labels_list = json.load(f)
+        # Cases keyed by case id, so each image is matched to its case in constant time.
+        self.cases = {case["case_id"]: case for case in self.labels_list}
         self.kidney_findings_colors = kidney_findings_colors
+        self.slice_values = slice_values if slice_values is not None else {}
+        self.kidney_findings_source_colors = kidney_findings_source_colors or []
 
     def _extract(self, img_path: str, *args: Any) -> tuple[list, list]:
         """Extract label from img path."""
         img_id = os.path.basename(img_path)
-        root_path = os.path.dirname(os.path.dirname(img_path))
-        mask_path = os.path.join(root_path, MASK_FOLDER_NAME, img_id)
-        mask = cv2.imread(mask_path)
 
         # Check if the mask contains the kidney tumor or cyst
-        if np.any(np.isin(self.kidney_findings_colors, np.unique(mask))):
+        if self._has_kidney_finding(img_path):
             # Study id is between the second and third underscore in the target image id
             study_id_regex = re.match(r"^(?:[^_]*_){2}([^_]+)", img_id)
             study_id = (
                 study_id_regex.group(1) if study_id_regex is not None else None
             )  # Study id is between the second and third underscore
-            labels = []
-            for case in self.labels_list:
-                # Find the case with the matching study id
-                if case["case_id"] == f"case_{study_id}":
-                    # Remove underscores from the label
-                    source_label = case["tumor_histologic_subtype"]
-                    # We do not include vague labels
-                    if source_label in self.labels.keys():
-                        labels = self.labels[source_label]
-                    break
+            # Find the case with the matching study id
+            source_label = self.cases[f"case_{study_id}"]["tumor_histologic_subtype"]
+            # We do not include vague labels
+            labels = self.labels.get(source_label, [])
             return labels, [source_label]
         return [], []
 
+    def _has_kidney_finding(self, img_path: str) -> bool:
+        """Check whether the image's mask contains the kidney tumor or cyst.
+
+        Uses the slice values recorded while the segmentation volume was sliced, and falls back to
+        reading the mask for slices that were not converted in this run.
+        """
+        img_id = os.path.basename(img_path)
+        values = self.slice_values.get(img_id)
+        if values is not None:
+            return any(color in values for color in self.kidney_findings_source_colors)
+        root_path = os.path.dirname(os.path.dirname(img_path))
+        mask_path = os.path.join(root_path, MASK_FOLDER_NAME, img_id)
+        mask = cv2.imread(mask_path)
+        return bool(np.any(np.isin(self.kidney_findings_colors, np.unique(mask))))
+
 
 class ImageSelector(BaseImageSelector):
     """Selector for images specific to the KITS23 dataset."""
@@ -147,6 +173,16 @@ class KITS23Pipeline(BasePipeline):
             self.ctx.dataset.masks["Neoplasm"].target_color,
             self.ctx.dataset.masks["RenalCyst"].target_color,
         ]
-        label_extractor = LabelExtractor(self.ctx.dataset.labels, self.ctx.paths.labels_path, kidney_findings_colors)
+        kidney_findings_source_colors = [
+            self.ctx.dataset.masks["Neoplasm"].source_color,
+            self.ctx.dataset.masks["RenalCyst"].source_color,
+        ]
+        label_extractor = LabelExtractor(
+            self.ctx.dataset.labels,
+            self.ctx.paths.labels_path,
+            kidney_findings_colors,
+            slice_values=self.ctx.mask_slice_values,
+            kidney_findings_source_colors=kidney_findings_source_colors,
+        )
         # Populate the structured config (consumed once steps read from ctx in Task 4)...
         self.ctx.identity.label_extractor = label_extractor
@@ -5,9 +5,7 @@ import os
 from dataclasses import dataclass, field
 from typing import Any
 
-import bs4 as bs
-import cv2
-import numpy as np
+from lxml import etree
 
 from base.creators.xml_mask import BaseXmlMaskCreator
 from base.extractors import BaseImgIdExtractor, BaseStudyIdExtractor
@@ -69,81 +67,91 @@ class MaskSelector(BaseMaskSelector):
 
 
 class XmlMaskCreator(BaseXmlMaskCreator):
-    """Creator of masks based on xml files specific to the LIDC-IDRI dataset."""
+    """Creator of masks based on xml files specific to the LIDC-IDRI dataset.
 
-    def get_mask_path(self, roi: bs.BeautifulSoup, caller: CreateMasksFromXml) -> str | None:
+    The XML is streamed with lxml's ``iterparse``: each lesion or nodule element is reduced to
+    ``(mask_path, points, color)`` tuples and then cleared, so only one such element is in memory
+    at a time. Every polygon is submitted to ``CreateMasksFromXml.draw_polygon``, which writes each
+    mask once per XML file.
+    """
+
+    def get_mask_path(self, roi: etree._Element, caller: CreateMasksFromXml) -> str | None:
         """Get mask path from mapped dicom 'image_sop_uid' parameter."""
         if caller.file_to_dicom_attr_mapping is None:
             raise FileNotFoundError(
                 "file_to_dcm_attribute_mapping.json file not found. Dcm attribute mapping step was performed incorrectly."
             )
 
-        image_sop_uids = roi.find_all("imageSOP_UID")
+        image_sop_uids = list(roi.iter("{*}imageSOP_UID"))
         if len(image_sop_uids) > 1:
             print("More than one image_sop_uid for one item.")
-        image_sop_uid = image_sop_uids[0].get_text()
+        image_sop_uid = _text(image_sop_uids[0])
         try:
             corresponding_mask_path = caller.get_umie_mask_path(caller.file_to_dicom_attr_mapping[image_sop_uid])
             return corresponding_mask_path
         except KeyError:
             return None
 
-    def draw_on_mask(self, path: str, color: tuple, points: list) -> None:
-        """Draw polygon from points on mask from path in selected color."""
-        current_mask = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-        cv2.fillPoly(current_mask, [np.array(points)], (color))
-        cv2.imwrite(path, current_mask)
+    @staticmethod
+    def get_points(roi: etree._Element, point_tag: str) -> list:
+        """Get the ``[x, y]`` polygon vertices stored in the ``point_tag`` elements of an ROI."""
+        return [
+            [int(_text(point.find(".//{*}xCoord"))), int(_text(point.find(".//{*}yCoord")))]
+            for point in roi.iter("{*}" + point_tag)
+        ]
 
     def _create(self, mask_path: str, caller: CreateMasksFromXml) -> None:
         """Create masks from xml file."""
-        file = open(mask_path, "r")
-        contents = file.read()
-
-        # Draw lesions from xml file
-        tree = bs.BeautifulSoup(contents, "xml")
-        lesions = tree.find_all("nonNodule")
-
-        for lesion in lesions:
-            rois = lesion.find_all("roi")
-            for roi in rois:
-                corresponding_mask_path = self.get_mask_path(roi, caller)  # type: ignore[arg-type]
-                if corresponding_mask_path is None:
-                    continue
-
-                points = list()
-                for locus in roi.find_all("locus"):
-                    points.append([int(locus.find("xCoord").get_text()), int(locus.find("yCoord").get_text())])  # type: ignore[union-attr]
-
-                if os.path.exists(corresponding_mask_path):
-                    color = caller.masks["Lesion"]["target_color"]
-                    self.draw_on_mask(corresponding_mask_path, color, points)
-
-        # Draw nodules from xml file
-        nodules = tree.find_all("unblindedReadNodule")
-        for nodule in nodules:
-            rois = nodule.find_all("roi")
-            for roi in rois:
-                corresponding_mask_path = self.get_mask_path(roi, caller)  # type: ignore[arg-type]
-                if corresponding_mask_path is None:
-                    continue
-
-                if os.path.exists(corresponding_mask_path):
-                    points = list()
-                    for edge_map in roi.find_all("edgeMap"):
-                        points.append(
-                            [int(edge_map.find("xCoord").get_text()), int(edge_map.find("yCoord").get_text())]  # type: ignore[union-attr]
-                        )
-
-                    inclusion_string = roi.find("inclusion").get_text()  # type: ignore[union-attr]
-                    if inclusion_string == "TRUE":
-                        color = caller.masks["Nodule"]["target_color"]
-                    elif inclusion_string == "FALSE":
-                        color = 0
-                    else:
-                        print(f"Unsupported inclusion value {inclusion_string}")
-                        color = 0
-
-                    self.draw_on_mask(corresponding_mask_path, color, points)
+        # Lesions are drawn before nodules, as their polygons are collected in one pass over the file.
+        lesions: list[tuple[str, list, int]] = []
+        nodules: list[tuple[str, list, int]] = []
+        for _, element in etree.iterparse(mask_path, events=("end",), tag=("{*}nonNodule", "{*}unblindedReadNodule")):
+            if etree.QName(element).localname == "nonNodule":
+                lesions.extend(self._lesion_polygons(element, caller))
+            else:
+                nodules.extend(self._nodule_polygons(element, caller))
+            # Drop the handled element and its already handled siblings from the partial tree.
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+        for corresponding_mask_path, points, color in lesions + nodules:
+            caller.draw_polygon(corresponding_mask_path, points, color)
+
+    def _lesion_polygons(self, element: etree._Element, caller: CreateMasksFromXml) -> list[tuple[str, list, int]]:
+        """Return ``(mask_path, points, color)`` of every drawable ROI of a ``nonNodule`` element."""
+        polygons = []
+        for roi in element.iter("{*}roi"):
+            corresponding_mask_path = self.get_mask_path(roi, caller)
+            if corresponding_mask_path is not None and os.path.exists(corresponding_mask_path):
+                color = caller.masks["Lesion"]["target_color"]
+                polygons.append((corresponding_mask_path, self.get_points(roi, "locus"), color))
+        return polygons
+
+    def _nodule_polygons(self, element: etree._Element, caller: CreateMasksFromXml) -> list[tuple[str, list, int]]:
+        """Return ``(mask_path, points, color)`` of every drawable ROI of an ``unblindedReadNodule`` element."""
+        polygons = []
+        for roi in element.iter("{*}roi"):
+            corresponding_mask_path = self.get_mask_path(roi, caller)
+            if corresponding_mask_path is None or not os.path.exists(corresponding_mask_path):
+                continue
+            inclusion_string = _text(roi.find(".//{*}inclusion"))
+            if inclusion_string == "TRUE":
+                color = caller.masks["Nodule"]["target_color"]
+            elif inclusion_string == "FALSE":
+                color = 0
+            else:
+                print(f"Unsupported inclusion value {inclusion_string}")
+                color = 0
+            polygons.append((corresponding_mask_path, self.get_points(roi, "edgeMap"), color))
+        return polygons
+
+
+def _text(element: etree._Element | None) -> str:
+    """Return the text content of an XML element (like BeautifulSoup's ``get_text``)."""
+    if element is None:
+        raise AttributeError("XML element not found.")
+    return "".join(element.itertext())
 
 
 @dataclass
@@ -40,11 +40,14 @@ from .delete_temp_png import DeleteTempPng
 from .detect_corrupt_images import DetectCorruptImages
 from .detect_duplicates import DetectDuplicates
 from .export_huggingface import ExportHuggingFace
+from .export_webdataset import ExportWebDataset
 from .extract_dicom_metadata import ExtractDicomMetadata
+from .flush_records import FlushRecords
 from .get_file_paths import GetFilePaths
 from .masks_to_binary_colors import MasksToBinaryColors
 from .merge_masks import MergeMasks
 from .normalize_spacing import NormalizeSpacing
+from .postprocess_images import PostprocessImages
 from .recolor_masks import RecolorMasks
 from .resize_images import ResizeImages
 from .skip_processed import SkipProcessed
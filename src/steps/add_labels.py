@@ -1,11 +1,9 @@
 """Add labels to the images and masks based on the labels.json file. The step requires the pipeline to specify the function for mapping the images with annotations."""
 
-import glob
 import json
 import os
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 
-import jsonlines
 from tqdm import tqdm
 
 from src.base.extractors.img_id import BaseImgIdExtractor
@@ -15,6 +13,8 @@ from src.base.step import BaseStep
 class AddLabels(BaseStep):
     """Add labels to the images and masks based on the function for mapping the images with annotations specified by the pipeline."""
 
+    supports_streaming = True
+
     def transform(
         self,
         X: list,  # img_paths
@@ -29,30 +29,54 @@ class AddLabels(BaseStep):
         print("Adding labels...")
         if len(X) == 0:
             raise ValueError("No list of files provided.")
-        if os.path.exists(os.path.join(self.target_path, "source_paths.json")):
-            source_paths_dict = json.load(open(os.path.join(self.target_path, "source_paths.json")))
-        else:
-            source_paths_dict = None
+        source_paths_dict = self._load_source_paths()
 
         self.json_updates: dict = {}
-        for img_path in tqdm(X):
-            self.add_labels(img_path, source_paths_dict)
+        if hasattr(self.label_extractor, "extract_many"):
+            self.add_labels_batch(X, source_paths_dict)
+        else:
+            for img_path in tqdm(X):
+                self.add_labels(img_path, source_paths_dict)
+
+        self._apply_json_updates()
+
+        return self.file_index.files(folder=self.image_folder_name, extension="png")
+
+    def start_stream(self) -> None:
+        """Load the source-path mapping and start collecting the label updates."""
+        self._source_paths_dict = self._load_source_paths()
+        self.json_updates = {}
+
+    def transform_stream(self, X: Iterator[str]) -> Iterator[str]:
+        """Extract the labels of each image as it arrives; the JSONL is updated by ``finish_stream``.
+
+        Args:
+            X (Iterator[str]): UMIE paths of the images.
+        Returns:
+            Iterator[str]: The same paths.
+        """
+        for img_path in X:
+            self.add_labels(img_path, self._source_paths_dict)
+            yield img_path
 
-        updated_lines = []
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                if obj["umie_path"] in self.json_updates.keys():
-                    obj["labels"] = self.json_updates[obj["umie_path"]]["labels"]
-                    obj["source_labels"] = self.json_updates[obj["umie_path"]]["source_labels"]
-                updated_lines.append(obj)
+    def finish_stream(self) -> None:
+        """Write the collected labels into the dataset JSONL."""
+        self._apply_json_updates()
 
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for obj in updated_lines:
-                writer.write(obj)
+    def _load_source_paths(self) -> Optional[dict]:
+        """Load the ``source_paths.json`` mapping written by ``StoreSourcePaths``, if present."""
+        if os.path.exists(os.path.join(self.target_path, "source_paths.json")):
+            return json.load(open(os.path.join(self.target_path, "source_paths.json")))
+        return None
 
-        root_path = os.path.join(self.target_path, f"{self.dataset_uid}_{self.dataset_name}")
-        new_paths = glob.glob(os.path.join(root_path, f"**/{self.image_folder_name}/*.png"), recursive=True)
-        return new_paths
+    def _apply_json_updates(self) -> None:
+        """Rewrite the dataset JSONL with the collected ``labels`` / ``source_labels`` updates."""
+        updated_lines = self.records.read()
+        for obj in updated_lines:
+            if obj["umie_path"] in self.json_updates.keys():
+                obj["labels"] = self.json_updates[obj["umie_path"]]["labels"]
+                obj["source_labels"] = self.json_updates[obj["umie_path"]]["source_labels"]
+        self.records.write(updated_lines)
 
     def add_labels(self, img_path: str, source_path_dict: Optional[dict] = None) -> None:
         """Add labels to the image and mask based on the label_extractor function specified by the pipeline.
@@ -61,15 +85,46 @@ class AddLabels(BaseStep):
             img_path (str): Path to the image.
             labels_list (list): List of labels.
         """
+        extractor_paths = self._extractor_paths(img_path, source_path_dict)
+        if extractor_paths is None:
+            return
+        labels, source_labels = self.label_extractor(*extractor_paths)  # type: ignore[misc]  # label_extractor is set per-pipeline at runtime
+        self._record_labels(img_path, labels, source_labels)
+
+    def add_labels_batch(self, img_paths: list, source_path_dict: Optional[dict] = None) -> None:
+        """Add labels to many images with one ``extract_many`` call of the label extractor.
+
+        Args:
+            img_paths (list): Paths to the images.
+            source_path_dict (Optional[dict]): Mapping of UMIE paths to source paths, if stored.
+        """
+        labelled, extractor_paths = [], []
+        for img_path in img_paths:
+            paths = self._extractor_paths(img_path, source_path_dict)
+            if paths is not None:
+                labelled.append(img_path)
+                extractor_paths.append(paths)
+        results = self.label_extractor.extract_many(tqdm(extractor_paths))  # type: ignore[union-attr]  # BaseLabelExtractor, checked by the caller
+        for img_path, (labels, source_labels) in zip(labelled, results):
+            self._record_labels(img_path, labels, source_labels)
+
+    def _extractor_paths(self, img_path: str, source_path_dict: Optional[dict]) -> Optional[tuple[str, str]]:
+        """Return the ``(img_path, mask_path)`` to pass to the label extractor, or None to skip the image.
+
+        Args:
+            img_path (str): Path to the image.
+            source_path_dict (Optional[dict]): Mapping of UMIE paths to source paths, if stored.
+        """
         mask_path = self.get_umie_mask_path_from_img_path(img_path)
-        if source_path_dict:
-            if img_path in source_path_dict.keys():
-                labels, source_labels = self.label_extractor(source_path_dict[img_path], mask_path)  # type: ignore[misc]  # label_extractor is set per-pipeline at runtime
-            else:
-                print(f"Image path {img_path} not in source_paths.json")
-                labels, source_labels = [], []
-        else:
-            labels, source_labels = self.label_extractor(img_path, mask_path)  # type: ignore[misc]  # label_extractor is set per-pipeline at runtime
+        if not source_path_dict:
+            return img_path, mask_path
+        if img_path in source_path_dict:
+            return source_path_dict[img_path], mask_path
+        print(f"Image path {img_path} not in source_paths.json")
+        return None
+
+    def _record_labels(self, img_path: str, labels: list, source_labels: list) -> None:
+        """Queue the JSONL update of an image that got labels."""
         if labels:
             key = self.get_path_without_target_path(img_path)
             self.json_updates[key] = {"labels": labels, "source_labels": source_labels}
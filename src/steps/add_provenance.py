@@ -11,10 +11,6 @@ The step is a no-op when ``metadata_config.add_provenance`` is ``False``.
 
 from __future__ import annotations
 
-import os
-
-import jsonlines
-
 from base.step import BaseStep
 from config.provenance import get_provenance
 
@@ -39,23 +35,18 @@ class AddProvenance(BaseStep):
         """
         if not self.metadata_config.add_provenance:
             return X
-        if not os.path.exists(self.json_path):
+        if not self.records.exists():
             return X
 
         print("Adding provenance (license / source attribution)...")
         provenance = get_provenance(self.dataset_name)
 
-        records: list[dict] = []
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                records.append(obj)
-
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for obj in records:
-                obj["license"] = provenance.license
-                obj["source_dataset"] = provenance.source_dataset
-                obj["source_citation"] = provenance.source_citation
-                writer.write(obj)
+        records = self.records.read()
+        for obj in records:
+            obj["license"] = provenance.license
+            obj["source_dataset"] = provenance.source_dataset
+            obj["source_citation"] = provenance.source_citation
+        self.records.write(records)
 
         print(f"Provenance added to {len(records)} record(s): license={provenance.license!r}.")
         return X
@@ -1,12 +1,10 @@
 """Change img ids to match the format of the rest of the dataset."""
 
-import glob
 import json
 import os
 import shutil
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 
-import jsonlines
 import nibabel as nib
 import numpy as np
 from tqdm import tqdm
@@ -19,6 +17,8 @@ from constants import OutputMode
 class AddUmieIds(BaseStep):
     """Change img ids to match the format of the rest of the dataset."""
 
+    supports_streaming = True
+
     def transform(
         self,
         X: list,
@@ -39,15 +39,44 @@ class AddUmieIds(BaseStep):
         for img_path in tqdm(X):
             self.add_umie_ids(img_path)
 
-        # Update JSON file
-        with jsonlines.open(self.json_path, "w") as writer:
-            for obj in self.new_json:
-                writer.write(obj)
+        self._write_json()
 
-        root_path = os.path.join(self.target_path, f"{self.dataset_uid}_{self.dataset_name}")
         extension = "nii.gz" if self.output_mode == OutputMode.VOLUMES_3D else "png"
-        new_paths = glob.glob(os.path.join(root_path, f"**/{self.image_folder_name}/*.{extension}"), recursive=True)
-        return new_paths
+        return self.file_index.files(folder=self.image_folder_name, extension=extension)
+
+    def start_stream(self) -> None:
+        """Start collecting the JSONL records of the streamed images."""
+        self.new_json = []
+        self._stream_sort_keys: list = []
+
+    def transform_stream(self, X: Iterator[str]) -> Iterator[str]:
+        """Move each image to its UMIE path as it arrives and yield that path.
+
+        The records are buffered and written by ``finish_stream`` in the same umie_id order as
+        ``transform`` writes them.
+
+        Args:
+            X (Iterator[str]): Paths to the images.
+        Returns:
+            Iterator[str]: UMIE paths of the images that got a record.
+        """
+        for img_path in X:
+            sort_key = self.get_umie_id(img_path)
+            records_before = len(self.new_json)
+            self.add_umie_ids(img_path)
+            if len(self.new_json) > records_before:
+                self._stream_sort_keys.append(sort_key)
+                yield self.get_umie_img_path(img_path)
+
+    def finish_stream(self) -> None:
+        """Write the buffered records, sorted by umie_id like the stage-at-a-time ``transform``."""
+        order = sorted(range(len(self.new_json)), key=lambda index: self._stream_sort_keys[index])
+        self.new_json = [self.new_json[index] for index in order]
+        self._write_json()
+
+    def _write_json(self) -> None:
+        """Write the collected records to the dataset JSONL, replacing its content."""
+        self.records.write(list(self.new_json))
 
     def _update_json(self, umie_path: str, mask_path: str) -> None:
         modality_name, study_id, img_id = self.decode_umie_img_path(umie_path)
@@ -1,8 +1,5 @@
 """Optional, opt-in CLAHE contrast enhancement applied to image PNGs only (Theme E, Task 15)."""
 
-import glob
-import os
-
 import cv2  # type: ignore[import-untyped]
 import numpy as np
 
@@ -33,7 +30,7 @@ class ApplyClahe(BaseStep):
             clipLimit=self.preprocessing.clahe_clip_limit,
             tileGridSize=tuple(self.preprocessing.clahe_tile_grid_size),
         )
-        image_paths = glob.glob(os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.png"), recursive=True)
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="png")
         print("Applying CLAHE to images...")
         for image_path in image_paths:
             self._apply_clahe(image_path, clahe)
@@ -51,14 +48,25 @@ class ApplyClahe(BaseStep):
         image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
         if image is None:
             return
+        cv2.imwrite(image_path, self._equalize(image, clahe))
+
+    @staticmethod
+    def _equalize(image: np.ndarray, clahe: "cv2.CLAHE") -> np.ndarray:
+        """Apply CLAHE to an image array, per channel, returning uint8 data.
+
+        Args:
+            image (np.ndarray): Image array (8- or 16-bit, single- or multi-channel).
+            clahe (cv2.CLAHE): The configured CLAHE operator.
+
+        Returns:
+            np.ndarray: The equalized uint8 image.
+        """
         # CLAHE operates on 8-bit (or 16-bit) single-channel data; downcast 16-bit to 8-bit so the
         # output is a standard uint8 PNG, then equalize each channel independently.
         if image.dtype != np.uint8:
             normalized = np.empty_like(image, dtype=np.float64)
             image = cv2.normalize(image, normalized, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
         if image.ndim == 2:
-            result = clahe.apply(image)
-        else:
-            channels = [clahe.apply(image[:, :, c]) for c in range(image.shape[2])]
-            result = cv2.merge(channels)
-        cv2.imwrite(image_path, result)
+            return clahe.apply(image)
+        channels = [clahe.apply(image[:, :, c]) for c in range(image.shape[2])]
+        return cv2.merge(channels)
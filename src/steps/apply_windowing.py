@@ -1,7 +1,5 @@
 """Optional, opt-in CT intensity windowing applied to image PNGs only (Theme E, Task 14)."""
 
-import glob
-import os
 from typing import Optional
 
 import cv2  # type: ignore[import-untyped]
@@ -44,7 +42,7 @@ class ApplyWindowing(BaseStep):
             return X
 
         center, width = window
-        image_paths = glob.glob(os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.png"), recursive=True)
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="png")
         print("Applying CT windowing to images...")
         for image_path in image_paths:
             self._apply_windowing(image_path, center, width)
@@ -79,10 +77,23 @@ class ApplyWindowing(BaseStep):
         image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
         if image is None:
             return
+        cv2.imwrite(image_path, self._window(image, center, width))
+
+    @staticmethod
+    def _window(image: np.ndarray, center: float, width: float) -> np.ndarray:
+        """Clip an image array to the window and rescale linearly to 0-255 uint8.
+
+        Args:
+            image (np.ndarray): Image array in source intensity units.
+            center (float): Window center in source intensity units.
+            width (float): Window width in source intensity units.
+
+        Returns:
+            np.ndarray: The windowed uint8 image.
+        """
         lower = center - width / 2
         upper = center + width / 2
         clipped = np.clip(image.astype(np.float64), lower, upper)
         # Linear map [lower, upper] -> [0, 255]; width>0 by construction for the presets.
         scale = 255.0 / width if width != 0 else 0.0
-        rescaled = ((clipped - lower) * scale).round().astype(np.uint8)
-        cv2.imwrite(image_path, rescaled)
+        return ((clipped - lower) * scale).round().astype(np.uint8)
@@ -1,6 +1,5 @@
 """Optional, opt-in auto-cropping of uniform black borders, keeping masks aligned (Theme E, Task 19)."""
 
-import glob
 import os
 from typing import Optional
 
@@ -31,7 +30,7 @@ class AutocropBorders(BaseStep):
             return X
 
         tolerance = self.preprocessing.autocrop_tolerance
-        image_paths = glob.glob(os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.png"), recursive=True)
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="png")
         print("Auto-cropping image borders...")
         for image_path in image_paths:
             image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
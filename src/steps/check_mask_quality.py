@@ -1,6 +1,5 @@
 """Check output mask quality: dimensions, colour vocabulary and emptiness."""
 
-import glob
 import json
 import os
 from typing import Optional
@@ -49,10 +48,9 @@ class CheckMaskQuality(BaseStep):
         return X
 
     def _output_mask_paths(self) -> list:
-        """Glob the dataset's output masks (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
+        """List the dataset's output masks (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
         extension = "nii.gz" if self.output_mode == OutputMode.VOLUMES_3D else "png"
-        pattern = os.path.join(self.dataset_root, f"**/{self.mask_folder_name}/*.{extension}")
-        return sorted(glob.glob(pattern, recursive=True))
+        return self.file_index.files(folder=self.mask_folder_name, extension=extension)
 
     def _allowed_colors(self) -> set:
         """Build the allowed colour set: 0 plus configured target colours valid in config/masks.
@@ -85,20 +83,20 @@ class CheckMaskQuality(BaseStep):
                 return None
         return cv2.imread(path, cv2.IMREAD_GRAYSCALE)
 
-    def _paired_image_array(self, mask_path: str) -> Optional[np.ndarray]:
-        """Read the image paired with a mask (same basename under the image folder).
+    def _paired_image_shape(self, mask_path: str) -> Optional[tuple]:
+        """Read the dimensions of the image paired with a mask (same basename under the image folder).
+
+        Only the image header is read (see ``base.image_probe``); the pixels are never decoded.
 
         Args:
             mask_path (str): Path to the output mask.
         Returns:
-            Optional[np.ndarray]: The paired image array, or None when missing/unreadable.
+            Optional[tuple]: The paired image shape, or None when missing/unreadable.
         """
         sep = os.sep + self.mask_folder_name + os.sep
         replacement = os.sep + self.image_folder_name + os.sep
         image_path = mask_path.replace(sep, replacement)
-        if not os.path.exists(image_path):
-            return None
-        return self._read_array(image_path)
+        return self.image_probe.shape(image_path)
 
     def _inspect(self, mask_path: str, allowed_colors: set, report: dict) -> None:
         """Classify a single output mask and record any failures in the report.
@@ -114,10 +112,10 @@ class CheckMaskQuality(BaseStep):
             report["out_of_vocab_color"].append({"mask": umie_path, "reason": "unreadable"})
             return
 
-        image = self._paired_image_array(mask_path)
-        if image is not None and image.shape[:2] != mask.shape[:2]:
+        image_shape = self._paired_image_shape(mask_path)
+        if image_shape is not None and tuple(image_shape[:2]) != mask.shape[:2]:
             report["dim_mismatch"].append(
-                {"mask": umie_path, "mask_shape": list(mask.shape[:2]), "image_shape": list(image.shape[:2])}
+                {"mask": umie_path, "mask_shape": list(mask.shape[:2]), "image_shape": list(image_shape[:2])}
             )
 
         unique_values = {int(value) for value in np.unique(mask)}
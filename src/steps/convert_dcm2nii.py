@@ -3,6 +3,7 @@
 import glob
 import os
 from collections import defaultdict
+from typing import Optional
 
 import nibabel as nib
 import numpy as np
@@ -13,6 +14,19 @@ from tqdm import tqdm
 
 from base.step import BaseStep
 from constants import OutputMode
+from utils.parallel import iter_in_parallel
+
+from .convert_dcm2png import decode_pixel_array
+
+#: Header tags the grouping pass reads: series membership, slice order and affine geometry.
+SERIES_HEADER_TAGS = [
+    "SeriesInstanceUID",
+    "InstanceNumber",
+    "ImageOrientationPatient",
+    "ImagePositionPatient",
+    "PixelSpacing",
+    "SliceThickness",
+]
 
 
 class ConvertDcm2Nii(BaseStep):
@@ -24,6 +38,11 @@ class ConvertDcm2Nii(BaseStep):
     ``ImagePositionPatient``, ``PixelSpacing`` and the inter-slice spacing). One ``.nii.gz``
     is written per series.
 
+    The conversion runs in two phases over ``export.num_workers`` processes: a header-only pass
+    reads the grouping and geometry tags of every file, then one worker per series decodes its
+    slices straight into a preallocated volume of the stored pixel dtype and writes the NIfTI
+    (see :func:`reconstruct_series`). The main process only groups, orders and builds affines.
+
     Backend decision: geometry is built directly with ``pydicom`` (already a project
     dependency) rather than adding ``dicom2nifti`` / ``dcm2niix``. This keeps the step
     dependency-free and unit-testable, and the affine follows the DICOM PS3.3 C.7.6.2
@@ -59,28 +78,43 @@ class ConvertDcm2Nii(BaseStep):
             raise ValueError("No DICOM files provided.")
 
         series = self._group_by_series(dcm_paths)
-        out_paths = []
-        for series_uid, files in tqdm(series.items()):
-            out_path = self._convert_series(series_uid, files)
-            if out_path is not None:
-                out_paths.append(out_path)
-        return out_paths
+        tasks = (self._series_task(series_uid, members) for series_uid, members in series.items())
+        results = iter_in_parallel(_reconstruct_series_task, tasks, num_workers=self.export_config.num_workers)
+        return list(tqdm(results, total=len(series)))
 
     def _group_by_series(self, dcm_paths: list) -> dict:
-        """Group DICOM file paths by their ``SeriesInstanceUID``.
+        """Group DICOM files by their ``SeriesInstanceUID``, reading the headers in parallel.
 
         Args:
             dcm_paths (list): DICOM file paths.
 
         Returns:
-            dict: Mapping of SeriesInstanceUID to the list of its file paths.
+            dict: Mapping of SeriesInstanceUID to the list of its ``(path, header)`` pairs.
         """
+        headers = iter_in_parallel(read_series_header, dcm_paths, num_workers=self.export_config.num_workers)
         series: dict = defaultdict(list)
-        for path in dcm_paths:
-            ds = dcmread(path, stop_before_pixels=True)
-            series[str(ds.SeriesInstanceUID)].append(path)
+        for path, header in zip(dcm_paths, headers):
+            series[str(header.SeriesInstanceUID)].append((path, header))
         return series
 
+    def _series_task(self, series_uid: str, members: list) -> tuple:
+        """Order a series' slices and build its affine, as a task for :func:`reconstruct_series`.
+
+        Args:
+            series_uid (str): The SeriesInstanceUID.
+            members (list): ``(path, header)`` pairs of the series, in input order.
+
+        Returns:
+            tuple: ``(ordered paths, affine, output path, window center, window width)``.
+        """
+        out_path = os.path.join(os.path.dirname(members[0][0]), f"{series_uid}.nii.gz")
+        iop = np.array(members[0][1].ImageOrientationPatient, dtype=float)
+        normal = np.cross(iop[0:3], iop[3:6])
+        members = sorted(members, key=lambda member: self._slice_sort_key(member[1], normal))
+        affine = self._build_affine([header for _, header in members])
+        paths = [path for path, _ in members]
+        return paths, affine, out_path, self.window_center, self.window_width
+
     def _slice_sort_key(self, ds: pydicom.dataset.FileDataset, normal: np.ndarray) -> float:
         """Return the position of a slice along the slice normal (fallback: InstanceNumber)."""
         ipp = getattr(ds, "ImagePositionPatient", None)
@@ -115,50 +149,157 @@ class ConvertDcm2Nii(BaseStep):
         affine[:3, 3] = ipp_first
         return affine
 
-    def _convert_series(self, series_uid: str, files: list) -> str:
-        """Reconstruct and save a single series as ``.nii.gz``.
 
-        Args:
-            series_uid (str): The SeriesInstanceUID.
-            files (list): DICOM file paths belonging to the series.
+# The per-file and per-series work is kept at module level so it can be pickled into
+# spawn-started worker processes.
 
-        Returns:
-            str: Path to the written ``.nii.gz`` volume.
-        """
-        datasets = [dcmread(path) for path in files]
-        iop = np.array(datasets[0].ImageOrientationPatient, dtype=float)
-        normal = np.cross(iop[0:3], iop[3:6])
-        datasets.sort(key=lambda ds: self._slice_sort_key(ds, normal))
 
-        # Stack slices into a (columns, rows, slices) volume so it matches the affine below.
-        volume = np.stack([ddh.apply_modality_lut(ds.pixel_array, ds).T for ds in datasets], axis=-1)
-        if self.window_center is not None and self.window_width is not None:
-            volume = self._apply_window(volume)
+def read_series_header(path: str) -> pydicom.dataset.Dataset:
+    """Read the grouping and geometry tags of a DICOM file (``SERIES_HEADER_TAGS``) without its pixels.
 
-        affine = self._build_affine(datasets)
-        out_path = os.path.join(os.path.dirname(files[0]), f"{series_uid}.nii.gz")
-        nib.save(nib.Nifti1Image(volume, affine=affine), out_path)  # type: ignore[no-untyped-call]  # nibabel stub gap
-        return out_path
+    Args:
+        path (str): Path to the DICOM file.
 
-    def _apply_window(self, pixel_data: np.ndarray) -> np.ndarray:
-        """Clip a volume to the configured window and rescale it to the 0-255 range.
+    Returns:
+        pydicom.dataset.Dataset: Header with only the series and geometry tags.
+    """
+    return dcmread(path, stop_before_pixels=True, specific_tags=SERIES_HEADER_TAGS)
 
-        Args:
-            pixel_data (np.ndarray): Raw volume intensities.
 
-        Returns:
-            np.ndarray: Windowed volume as ``uint8``.
-        """
-        pixel_data = np.clip(
-            pixel_data,
-            self.window_center - self.window_width / 2,
-            self.window_center + self.window_width / 2,
-        )
-        min_val = np.min(pixel_data)
-        min_val = -1000 if min_val < -1000 else min_val
-        pixel_data = pixel_data - min_val
-        ratio = np.max(pixel_data) / 255
-        if ratio == 0:
-            ratio = 1
-        pixel_data = np.divide(pixel_data, ratio)
-        return pixel_data.astype(np.uint8)
+def reconstruct_series(
+    paths: list,
+    affine: np.ndarray,
+    out_path: str,
+    window_center: Optional[int] = None,
+    window_width: Optional[int] = None,
+) -> str:
+    """Decode the ordered slices of a series into one volume and save it as NIfTI.
+
+    Slices are decoded one at a time into a preallocated ``(columns, rows, slices)`` volume of the
+    stored pixel dtype; only the current slice's data set is held with its pixel data. When every
+    slice has the same integral ``RescaleSlope`` / ``RescaleIntercept`` the volume is saved in that
+    dtype with the rescale in the NIfTI ``scl_slope`` / ``scl_inter`` fields, so ``get_fdata``
+    returns the same Hounsfield values as a rescaled float64 volume at a fraction of the size.
+    Otherwise the modality LUT is applied slice by slice into a float64 volume, or, with a window,
+    into the ``uint8`` windowed volume.
+
+    Args:
+        paths (list): DICOM files of the series, ordered along the slice normal.
+        affine (np.ndarray): Voxel-to-patient affine of the series.
+        out_path (str): Path of the ``.nii.gz`` to write.
+        window_center (Optional[int]): Window center, or None for no windowing.
+        window_width (Optional[int]): Window width, or None for no windowing.
+
+    Returns:
+        str: ``out_path``.
+    """
+    volume: Optional[np.ndarray] = None
+    headers = []
+    for index, path in enumerate(paths):
+        ds = dcmread(path)
+        pixels = decode_pixel_array(ds)
+        del ds.PixelData  # keep the header for the modality LUT, drop the encoded pixels
+        headers.append(ds)
+        if volume is None:
+            volume = np.empty(pixels.shape[::-1] + (len(paths),), dtype=pixels.dtype)
+        elif pixels.shape[::-1] != volume.shape[:-1]:
+            raise ValueError(f"Slice {path} has shape {pixels.shape}, expected {volume.shape[1::-1]}.")
+        elif np.result_type(volume.dtype, pixels.dtype) != volume.dtype:
+            volume = volume.astype(np.result_type(volume.dtype, pixels.dtype))
+        volume[:, :, index] = pixels.T
+    assert volume is not None
+
+    # nibabel stub gap: its constructors and setters are untyped
+    scaling = _shared_integral_rescale(volume.dtype, headers)
+    if window_center is not None and window_width is not None:
+        data = _window_volume(volume, headers, window_center, window_width)
+        image = nib.Nifti1Image(data, affine=affine)  # type: ignore[no-untyped-call]
+    elif scaling is not None or not any(_has_modality_lut(ds) for ds in headers):
+        image = nib.Nifti1Image(volume, affine=affine)  # type: ignore[no-untyped-call]
+        if scaling is not None:
+            image.header.set_slope_inter(*scaling)  # type: ignore[no-untyped-call]
+    else:
+        image = nib.Nifti1Image(_rescale_volume(volume, headers), affine=affine)  # type: ignore[no-untyped-call]
+    nib.save(image, out_path)  # type: ignore[no-untyped-call]
+    return out_path
+
+
+def _reconstruct_series_task(task: tuple) -> str:
+    """Unpack a ``(paths, affine, out_path, window_center, window_width)`` task for :func:`iter_in_parallel`."""
+    return reconstruct_series(*task)
+
+
+def _has_modality_lut(ds: pydicom.dataset.Dataset) -> bool:
+    """Whether ``apply_modality_lut`` changes the stored values of a slice."""
+    return bool(ds.get("ModalityLUTSequence")) or ("RescaleSlope" in ds and "RescaleIntercept" in ds)
+
+
+def _shared_integral_rescale(dtype: np.dtype, headers: list) -> Optional[tuple]:
+    """Return the ``(slope, intercept)`` shared by all slices when NIfTI scaling reproduces it exactly.
+
+    That is the case for integer pixel data with one integral, non-zero slope and integral
+    intercept whose rescaled range stays within the integers float32 represents exactly.
+    """
+    if dtype.kind not in "iu" or any(ds.get("ModalityLUTSequence") for ds in headers):
+        return None
+    scalings = {(ds.get("RescaleSlope"), ds.get("RescaleIntercept")) for ds in headers}
+    if len(scalings) != 1:
+        return None
+    slope, intercept = scalings.pop()
+    if slope is None or intercept is None:
+        return None
+    slope, intercept = float(slope), float(intercept)
+    if slope == 0 or not slope.is_integer() or not intercept.is_integer():
+        return None
+    info = np.iinfo(dtype)
+    if max(abs(info.min * slope + intercept), abs(info.max * slope + intercept)) > 2**24:
+        return None
+    return slope, intercept
+
+
+def _rescale_volume(volume: np.ndarray, headers: list) -> np.ndarray:
+    """Apply each slice's modality LUT to a ``(columns, rows, slices)`` volume, one slice at a time."""
+    rescaled: Optional[np.ndarray] = None
+    for index, ds in enumerate(headers):
+        values = ddh.apply_modality_lut(volume[:, :, index].T, ds)
+        if rescaled is None:
+            rescaled = np.empty(volume.shape, dtype=values.dtype)
+        elif np.result_type(rescaled.dtype, values.dtype) != rescaled.dtype:
+            rescaled = rescaled.astype(np.result_type(rescaled.dtype, values.dtype))
+        rescaled[:, :, index] = values.T
+    assert rescaled is not None
+    return rescaled
+
+
+def _window_volume(volume: np.ndarray, headers: list, window_center: int, window_width: int) -> np.ndarray:
+    """Clip a volume to the window and rescale it to the 0-255 range, one slice at a time.
+
+    Gives the same ``uint8`` values as clipping the whole rescaled float64 volume, taking its
+    minimum (floored at -1000) and maximum, and dividing by ``maximum / 255``: the volume-wide
+    minimum and maximum are gathered in a first pass over the slices, then each slice is windowed.
+
+    Args:
+        volume (np.ndarray): Stored pixel values, ``(columns, rows, slices)``.
+        headers (list): Data sets of the slices (for the modality LUT).
+        window_center (int): Window center.
+        window_width (int): Window width.
+
+    Returns:
+        np.ndarray: The windowed ``uint8`` volume.
+    """
+    low, high = window_center - window_width / 2, window_center + window_width / 2
+
+    def clipped(index: int) -> np.ndarray:
+        return np.clip(ddh.apply_modality_lut(volume[:, :, index].T, headers[index]).T, low, high)
+
+    slices = range(volume.shape[-1])
+    extremes = [(np.min(values), np.max(values)) for values in map(clipped, slices)]
+    min_val = min(minimum for minimum, _ in extremes)
+    min_val = -1000 if min_val < -1000 else min_val
+    ratio = (max(maximum for _, maximum in extremes) - min_val) / 255
+    if ratio == 0:
+        ratio = 1
+    windowed = np.empty(volume.shape, dtype=np.uint8)
+    for index in slices:
+        windowed[:, :, index] = np.divide(clipped(index) - min_val, ratio).astype(np.uint8)
+    return windowed
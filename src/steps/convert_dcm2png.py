@@ -3,19 +3,52 @@
 import glob
 import os
 import warnings
+from collections import deque
+from itertools import groupby
+from typing import Callable, Iterator, NamedTuple, Optional
 
 import cv2
 import numpy as np
 import pydicom
 import pydicom.pixel_data_handlers.util as ddh
 from pydicom import dcmread
+from pydicom.uid import ExplicitVRLittleEndian
 from tqdm import tqdm
 
 from base.step import BaseStep
+from utils.parallel import iter_in_parallel
+
+#: Step name and conversion-code version in conversion cache keys; bump it when the output changes.
+CACHE_NAME = "ConvertDcm2Png/1"
+
+#: Slices stacked per vectorized pass with ``export.dicom_series_batches`` (bounds the float32 stack's memory).
+SERIES_BATCH_SLICES = 64
+
+
+class DcmConversionResult(NamedTuple):
+    """Compact per-file result returned by a conversion worker to the main process."""
+
+    png: Optional[bytes]  # encoded PNG, or None when the conversion failed
+    error: Optional[str]  # message to report before the source file is deleted
+    cache_key: Optional[str] = None  # key of the PNG in the conversion cache, when the cache is enabled
+    cached: bool = False  # the PNG was read from the conversion cache instead of converted
 
 
 class ConvertDcm2Png(BaseStep):
-    """Converts dicom files to png images with appropriate color encoding."""
+    """Converts dicom files to png images with appropriate color encoding.
+
+    With ``export.num_workers > 1`` the per-file work (decode, modality LUT, windowing and PNG
+    encode) runs in a process pool via :func:`utils.parallel.iter_in_parallel`. Workers only
+    return :class:`DcmConversionResult` tuples; writing the PNGs, reporting errors and deleting
+    unconvertible sources stay in the main process, so the output is identical for any worker
+    count. Pixel data is decoded in memory by :func:`decode_pixel_array` (big endian files
+    included), with per-transfer-syntax decoders pluggable through :func:`register_pixel_decoder`.
+    With ``export.conversion_cache_dir`` PNGs already converted from the same source content and
+    settings are copied from the persistent conversion cache instead.
+    """
+
+    supports_streaming = True
+    stream_outputs_are_temporary = True
 
     def transform(self, X: list) -> list:
         """Convert dicom files to png images with appropriate color encoding.
@@ -28,10 +61,49 @@ class ConvertDcm2Png(BaseStep):
         print("Converting dicom to png...")
         if len(X) == 0:
             raise ValueError("No list of files provided.")
-        for img_path in tqdm(X):
-            if img_path.endswith(".dcm"):
-                self.convert_dcm2png(img_path)
+        self._convert_all([img_path for img_path in X if img_path.endswith(".dcm")])
+        self._convert_masks()
+        self._evict_cache()
+
+        root_path = self.source_path
+        new_paths = glob.glob(os.path.join(root_path, "**/*.png"), recursive=True)
+        return new_paths
+
+    def start_stream(self) -> None:
+        """Convert the dicom masks up front, so per-file steps downstream find them on disk."""
+        self._convert_masks()
+
+    def transform_stream(self, X: Iterator[str]) -> Iterator[str]:
+        """Convert dicom files one by one and yield the path of each PNG written.
+
+        Only PNGs converted from the incoming dicom files are forwarded; with ``num_workers > 1``
+        conversion still runs in the process pool, a bounded number of files ahead.
 
+        Args:
+            X (Iterator[str]): Paths to the images.
+        Returns:
+            Iterator[str]: Paths to the converted PNGs.
+        """
+        dcm_paths: deque = deque()
+        cache = self.conversion_cache
+
+        def tasks() -> Iterator[tuple]:
+            for img_path in X:
+                if img_path.endswith(".dcm"):
+                    dcm_paths.append(img_path)
+                    yield (img_path, self.window_center, self.window_width, cache)
+
+        for result in iter_in_parallel(_convert_dcm_task, tasks(), num_workers=self.export_config.num_workers):
+            png_path = self._store_result(dcm_paths.popleft(), result)
+            if png_path is not None:
+                yield png_path
+
+    def finish_stream(self) -> None:
+        """Evict least recently used conversion cache entries once the stream is drained."""
+        self._evict_cache()
+
+    def _convert_masks(self) -> None:
+        """Convert the dicom masks found under ``masks_path``, if the dataset has one."""
         if self.masks_path:
             # Further steps related to converting masks to .png will be
             # performed if the masks_path argument is provided in
@@ -47,14 +119,34 @@ class ConvertDcm2Png(BaseStep):
                         if self.mask_selector(path):
                             mask_paths.append(path)
             if mask_paths:
-                for mask_path in mask_paths:
-                    self.convert_dcm2png(mask_path)
+                self._convert_all(mask_paths)
             else:
                 print("Masks not found.")
 
-        root_path = self.source_path
-        new_paths = glob.glob(os.path.join(root_path, "**/*.png"), recursive=True)
-        return new_paths
+    def _convert_all(self, dcm_paths: list) -> None:
+        """Convert a list of dicom files, fanning the per-file work out over ``num_workers``.
+
+        With ``export.dicom_series_batches`` each task is a batch of up to ``SERIES_BATCH_SLICES``
+        consecutive files of one folder (see :func:`convert_dcm_series`) instead of a single file.
+
+        Args:
+            dcm_paths (list): Paths to the dicom files.
+        """
+        num_workers = self.export_config.num_workers
+        cache = self.conversion_cache
+        if self.export_config.dicom_series_batches:
+            batches = _series_batches(dcm_paths)
+            tasks = ((batch, self.window_center, self.window_width, cache) for batch in batches)
+            with tqdm(total=len(dcm_paths)) as progress:
+                for batch, batch_results in zip(batches, iter_in_parallel(_convert_series_task, tasks, num_workers)):
+                    for img_path, result in zip(batch, batch_results):
+                        self._store_result(img_path, result)
+                    progress.update(len(batch))
+            return
+        tasks = ((img_path, self.window_center, self.window_width, cache) for img_path in dcm_paths)
+        results = iter_in_parallel(_convert_dcm_task, tasks, num_workers=num_workers)
+        for img_path, result in tqdm(zip(dcm_paths, results), total=len(dcm_paths)):
+            self._store_result(img_path, result)
 
     def convert_dcm2png(self, img_path: str) -> None:
         """Convert dicom files to png images with appropriate color encoding.
@@ -62,19 +154,52 @@ class ConvertDcm2Png(BaseStep):
         Args:
             img_path (str): Path to the image.
         """
-        # iterate over found images
-        ds = dcmread(img_path)
-        ds = self._convert2little_endian(ds, img_path)
-        try:
-            output = ddh.apply_modality_lut(ds.pixel_array, ds)
-            # if window parameters are provided use it to remove redundant data
-            output = self._apply_window(output, ds)
-            new_path = img_path.replace(".dcm", ".png")
-            cv2.imwrite(new_path, output)
+        self._store_result(img_path, convert_dcm(img_path, self.window_center, self.window_width))
 
-        except Exception as e:
-            print(f"Error {e} occurred while converting {img_path} {ds.is_little_endian}")
-            os.remove(img_path)
+    def _store_result(self, img_path: str, result: DcmConversionResult) -> Optional[str]:
+        """Write a worker's encoded PNG next to its source, or report the error and drop the source.
+
+        Args:
+            img_path (str): Path to the source dicom file.
+            result (DcmConversionResult): The worker's result for ``img_path``.
+        Returns:
+            Optional[str]: Path to the written PNG, or None when the source was dropped.
+        """
+        if result.png is not None:
+            png_path = img_path.replace(".dcm", ".png")
+            try:
+                with open(png_path, "wb") as handle:
+                    handle.write(result.png)
+                if result.cache_key is not None:
+                    self._update_cache(result)
+                return png_path
+            except OSError as e:
+                result = DcmConversionResult(None, f"Error {e} occurred while converting {img_path}")
+        print(result.error)
+        os.remove(img_path)
+        return None
+
+    def _update_cache(self, result: DcmConversionResult) -> None:
+        """Store a converted PNG in the conversion cache, or mark a cache hit as recently used.
+
+        Args:
+            result (DcmConversionResult): A successful result carrying its cache key.
+        """
+        cache = self.conversion_cache
+        if cache is None or result.cache_key is None or result.png is None:
+            return
+        if result.cached:
+            cache.touch(result.cache_key)
+        else:
+            cache.put(result.cache_key, result.png)
+
+    def _evict_cache(self) -> None:
+        """Shrink the conversion cache to its size limit, if the cache is enabled."""
+        cache = self.conversion_cache
+        if cache is not None:
+            removed = cache.evict()
+            if removed:
+                print(f"Evicted {removed} least recently used conversion cache entries.")
 
     def _convert2little_endian(self, ds: pydicom.dataset.FileDataset, img_path: str) -> pydicom.dataset.FileDataset:
         """Convert dicom image to little endian.
@@ -85,15 +210,7 @@ class ConvertDcm2Png(BaseStep):
         Returns:
             ds (pydicom.dataset.FileDataset): Dicom file.
         """
-        # if image is not little endian implicit convert using gdcmconv
-        if ds.is_little_endian is False:
-            # convert image to little endian
-            os.system(f"gdcmconv -w -X -I -i {img_path} -o {img_path}.converted;")  # noqa: E702,E231
-            # Read converted image
-            ds = dcmread(f"{img_path}.converted")
-            # set property to remove *.converted file at the end
-            os.system(f"rm {img_path}.converted")
-        return ds
+        return convert2little_endian(ds, img_path)
 
     def _get_window_parameters(self, ds: pydicom.dataset.FileDataset) -> tuple:
         """Get window parameters from dicom file.
@@ -101,41 +218,7 @@ class ConvertDcm2Png(BaseStep):
         Args:
             ds (pydicom.dataset.FileDataset): Dicom file.
         """
-        # Sometimes window center is stored as a list of values, sometimes as a single value
-        # If it is a list, we take the first value for simplicity
-        if self.window_center is None:
-            try:
-                window_center = (
-                    int(ds.WindowCenter[0])
-                    if type(ds.WindowCenter) is pydicom.multival.MultiValue
-                    else int(ds.WindowCenter)
-                )
-            except AttributeError:
-                # There is no WindowCenter Attribute in dicom file
-                # Using middle of Hounsfield Unit Scale
-                window_center = 1023
-                print(
-                    f"There is no WindowCenter Attribute in {ds.filename} file. Using {window_center} as window center."  # type: ignore[str-bytes-safe]
-                )
-        else:
-            window_center = self.window_center
-
-        if self.window_width is None:
-            try:
-                window_width = (
-                    int(ds.WindowWidth[0])
-                    if type(ds.WindowWidth) is pydicom.multival.MultiValue
-                    else int(ds.WindowWidth)
-                )
-            except AttributeError:
-                # There is no WindowWidth Attribute in dicom file
-                # Using half of Hounsfield Unit Range
-                window_width = 2048
-                print(f"There is no WindowWidth Attribute in {ds.filename} file. Using {window_width} as window width.")  # type: ignore[str-bytes-safe]
-
-        else:
-            window_width = self.window_width
-        return window_center, window_width
+        return get_window_parameters(ds, self.window_center, self.window_width)
 
     def _apply_window(self, output: np.ndarray, ds: pydicom.dataset.FileDataset) -> np.ndarray:
         """Apply window to the image.
@@ -146,25 +229,332 @@ class ConvertDcm2Png(BaseStep):
         Returns:
             np.ndarray: Image data with applied window.
         """
-        with warnings.catch_warnings():
-            warnings.simplefilter("error")
-            try:
-                window_center, window_width = self._get_window_parameters(ds)
-                output = np.clip(
-                    output,
-                    window_center - window_width / 2,
-                    window_center + window_width / 2,
-                )
-                min_val = np.min(output)
-                min_val = -1000 if min_val < -1000 else min_val
-                output = output - min_val
-                max_val = np.max(output)
-                ratio = max_val / 255 if max_val != 0 else 1  # Avoid division by zero
-
-                output = np.divide(output, ratio).astype(int)
-            except RuntimeWarning as e:
-                print("Runtime warning caught:", e)
-                print("Output max value:", max_val)
-                print("Output min value:", min_val)
-                # Handle the exception or adjust output as necessary
-        return output
+        return apply_window(output, ds, self.window_center, self.window_width)
+
+
+# The per-file conversion is kept at module level (not as bound methods) so it can be pickled
+# into spawn-started worker processes without dragging the step's PipelineContext along.
+
+
+def convert_dcm(img_path: str, window_center: Optional[int], window_width: Optional[int]) -> DcmConversionResult:
+    """Decode a dicom file, apply the modality LUT and window, and encode it as PNG in memory.
+
+    Args:
+        img_path (str): Path to the dicom file.
+        window_center (Optional[int]): Configured window center, or None to read it from the file.
+        window_width (Optional[int]): Configured window width, or None to read it from the file.
+    Returns:
+        DcmConversionResult: The encoded PNG, or the error message when conversion failed.
+    """
+    ds = dcmread(img_path)
+    try:
+        pixels = decode_pixel_array(ds)
+    except Exception as e:
+        return _conversion_error(e, img_path, ds)
+    return _encode_slice(img_path, ds, pixels, window_center, window_width)
+
+
+def convert_dcm_series(
+    img_paths: list, window_center: Optional[int], window_width: Optional[int]
+) -> list[DcmConversionResult]:
+    """Convert a batch of slices of one series, applying rescale and window to the whole stack.
+
+    Slices of the same size are decoded into one float32 stack; the modality rescale, the window
+    and the per-slice min/max normalization of :func:`apply_window` are then a few vectorized
+    operations over the stack, with every slice keeping its own rescale and window parameters.
+    Slices that cannot be stacked (multi-frame or color data, a Modality LUT Sequence, pixel
+    data wider than 16 bits) and stacks whose vectorized pass raises or warns are converted
+    per file like :func:`convert_dcm`.
+
+    Args:
+        img_paths (list): Paths to the dicom files.
+        window_center (Optional[int]): Configured window center, or None to read it from the files.
+        window_width (Optional[int]): Configured window width, or None to read it from the files.
+    Returns:
+        list[DcmConversionResult]: One result per path, in input order.
+    """
+    results: list = [None] * len(img_paths)
+    stacks: dict = {}  # slice shape -> [(index, ds, pixels), ...]
+    for index, img_path in enumerate(img_paths):
+        ds = dcmread(img_path)
+        try:
+            pixels = decode_pixel_array(ds)
+        except Exception as e:
+            results[index] = _conversion_error(e, img_path, ds)
+            continue
+        if pixels.ndim == 2 and pixels.dtype.itemsize <= 2 and not ds.get("ModalityLUTSequence"):
+            stacks.setdefault(pixels.shape, []).append((index, ds, pixels))
+        else:
+            results[index] = _encode_slice(img_path, ds, pixels, window_center, window_width)
+
+    for stack in stacks.values():
+        try:
+            images = _window_stack(stack, window_center, window_width)
+        except Exception:  # includes the RuntimeWarnings raised as errors
+            images = None
+        for position, (index, ds, pixels) in enumerate(stack):
+            if images is None:
+                results[index] = _encode_slice(img_paths[index], ds, pixels, window_center, window_width)
+                continue
+            success, encoded = cv2.imencode(".png", images[position])
+            if success:
+                results[index] = DcmConversionResult(encoded.tobytes(), None)
+            else:
+                results[index] = _conversion_error(ValueError("PNG encoding failed"), img_paths[index], ds)
+    return results
+
+
+def _window_stack(stack: list, window_center: Optional[int], window_width: Optional[int]) -> np.ndarray:
+    """Apply the modality rescale and :func:`apply_window` to equally sized slices at once.
+
+    Args:
+        stack (list): ``(index, ds, pixels)`` tuples of 2D slices of the same shape.
+        window_center (Optional[int]): Configured window center, or None to read it from the files.
+        window_width (Optional[int]): Configured window width, or None to read it from the files.
+    Returns:
+        np.ndarray: uint8 images, one per slice (raises on any numerical warning).
+    """
+    count = len(stack)
+    slopes, intercepts = np.ones(count, np.float32), np.zeros(count, np.float32)
+    lows, highs = np.empty(count, np.float32), np.empty(count, np.float32)
+    for position, (_, ds, _) in enumerate(stack):
+        if "RescaleSlope" in ds and "RescaleIntercept" in ds:
+            slopes[position], intercepts[position] = ds.RescaleSlope, ds.RescaleIntercept
+        center, width = get_window_parameters(ds, window_center, window_width)
+        lows[position], highs[position] = center - width / 2, center + width / 2
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        volume = np.stack([pixels for _, _, pixels in stack]).astype(np.float32)
+        volume *= slopes[:, None, None]
+        volume += intercepts[:, None, None]
+        np.clip(volume, lows[:, None, None], highs[:, None, None], out=volume)
+        volume -= np.maximum(volume.min(axis=(1, 2)), -1000)[:, None, None]
+        maxima = volume.max(axis=(1, 2))
+        volume /= np.where(maxima != 0, maxima / 255, 1)[:, None, None]
+        # Truncate like apply_window's astype(int); PNG encoding saturates the result to 0..255.
+        np.clip(volume, 0, 255, out=volume)
+        return volume.astype(np.uint8)
+
+
+def _encode_slice(
+    img_path: str,
+    ds: pydicom.dataset.FileDataset,
+    pixels: np.ndarray,
+    window_center: Optional[int],
+    window_width: Optional[int],
+) -> DcmConversionResult:
+    """Apply the modality LUT and window to decoded pixels and encode them as PNG in memory."""
+    try:
+        output = ddh.apply_modality_lut(pixels, ds)
+        # if window parameters are provided use it to remove redundant data
+        output = apply_window(output, ds, window_center, window_width)
+        success, encoded = cv2.imencode(".png", output)
+        if not success:
+            raise ValueError("PNG encoding failed")
+        return DcmConversionResult(encoded.tobytes(), None)
+
+    except Exception as e:
+        return _conversion_error(e, img_path, ds)
+
+
+def _conversion_error(error: Exception, img_path: str, ds: pydicom.dataset.FileDataset) -> DcmConversionResult:
+    """Build the failed-conversion result reported for ``img_path``."""
+    return DcmConversionResult(None, f"Error {error} occurred while converting {img_path} {ds.is_little_endian}")
+
+
+def _convert_dcm_task(task: tuple) -> DcmConversionResult:
+    """Convert an ``(img_path, window_center, window_width, cache)`` task for :func:`iter_in_parallel`.
+
+    With a :class:`~base.conversion_cache.ConversionCache` the PNG is read from the cache when
+    present; otherwise the result carries its key so the main process can store it.
+    """
+    img_path, window_center, window_width, cache = task
+    if cache is None:
+        return convert_dcm(img_path, window_center, window_width)
+    key = cache.key(img_path, CACHE_NAME, _cache_settings(window_center, window_width, series_batches=False))
+    png = cache.get(key)
+    if png is not None:
+        return DcmConversionResult(png, None, key, cached=True)
+    return convert_dcm(img_path, window_center, window_width)._replace(cache_key=key)
+
+
+def _convert_series_task(task: tuple) -> list[DcmConversionResult]:
+    """Convert an ``(img_paths, window_center, window_width, cache)`` task for :func:`iter_in_parallel`.
+
+    With a cache only the slices missing from it are decoded (still as one batch).
+    """
+    img_paths, window_center, window_width, cache = task
+    if cache is None:
+        return convert_dcm_series(img_paths, window_center, window_width)
+    settings = _cache_settings(window_center, window_width, series_batches=True)
+    keys = [cache.key(img_path, CACHE_NAME, settings) for img_path in img_paths]
+    results: list = [None] * len(img_paths)
+    misses = []
+    for index, key in enumerate(keys):
+        png = cache.get(key)
+        if png is None:
+            misses.append(index)
+        else:
+            results[index] = DcmConversionResult(png, None, key, cached=True)
+    converted = convert_dcm_series([img_paths[index] for index in misses], window_center, window_width)
+    for index, result in zip(misses, converted):
+        results[index] = result._replace(cache_key=keys[index])
+    return results
+
+
+def _cache_settings(window_center: Optional[int], window_width: Optional[int], series_batches: bool) -> dict:
+    """The settings a converted PNG depends on, as part of its conversion cache key."""
+    return {"window_center": window_center, "window_width": window_width, "series_batches": series_batches}
+
+
+def _series_batches(dcm_paths: list) -> list:
+    """Split paths into runs of consecutive files of one folder, at most ``SERIES_BATCH_SLICES`` long.
+
+    Datasets keep one series per folder, so a run of files sharing a folder is (part of) a series;
+    stacking only needs equally sized slices, so a folder mixing series is still converted correctly.
+    """
+    batches: list = []
+    for _, group in groupby(dcm_paths, key=os.path.dirname):
+        paths = list(group)
+        batches.extend(
+            paths[start : start + SERIES_BATCH_SLICES] for start in range(0, len(paths), SERIES_BATCH_SLICES)
+        )
+    return batches
+
+
+#: Pixel decoders by transfer syntax UID, tried before pydicom's own pixel data handlers.
+PIXEL_DECODERS: dict[str, Callable[[pydicom.dataset.Dataset], np.ndarray]] = {}
+
+
+def register_pixel_decoder(transfer_syntax_uid: str, decoder: Callable[[pydicom.dataset.Dataset], np.ndarray]) -> None:
+    """Decode the pixel data of one transfer syntax with ``decoder`` instead of pydicom's handlers.
+
+    Register decoders at import time of the pipeline module, so spawn-started conversion workers
+    (which import it again) see them too.
+
+    Args:
+        transfer_syntax_uid (str): Transfer syntax UID, e.g. ``pydicom.uid.JPEG2000``.
+        decoder (Callable[[pydicom.dataset.Dataset], np.ndarray]): Returns the pixel array of a data set.
+    """
+    PIXEL_DECODERS[str(transfer_syntax_uid)] = decoder
+
+
+def decode_pixel_array(ds: pydicom.dataset.Dataset) -> np.ndarray:
+    """Decode the pixel data of a data set in memory, in native byte order.
+
+    Uses the decoder registered for the data set's transfer syntax, or pydicom's pixel data
+    handlers, which byteswap big endian data and decompress encapsulated data themselves.
+
+    Args:
+        ds (pydicom.dataset.Dataset): Dicom file.
+    Returns:
+        np.ndarray: The stored pixel values.
+    """
+    decoder = PIXEL_DECODERS.get(str(ds.file_meta.TransferSyntaxUID))
+    array = decoder(ds) if decoder is not None else ds.pixel_array
+    if not array.dtype.isnative:
+        array = array.astype(array.dtype.newbyteorder("="))
+    return array
+
+
+def convert2little_endian(ds: pydicom.dataset.FileDataset, img_path: str) -> pydicom.dataset.FileDataset:
+    """Convert dicom image to little endian.
+
+    The pixel data is decoded and rewritten in memory as Explicit VR Little Endian; the file at
+    ``img_path`` is left untouched.
+
+    Args:
+        ds (pydicom.dataset.FileDataset): Dicom file.
+        img_path (str): Path to the image.
+    Returns:
+        ds (pydicom.dataset.FileDataset): Dicom file.
+    """
+    if ds.is_little_endian is False:
+        pixels = decode_pixel_array(ds)
+        ds.PixelData = pixels.astype(pixels.dtype.newbyteorder("<")).tobytes()
+        ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+        ds.is_little_endian = True
+        ds.is_implicit_VR = False
+    return ds
+
+
+def get_window_parameters(
+    ds: pydicom.dataset.FileDataset, window_center: Optional[int], window_width: Optional[int]
+) -> tuple:
+    """Get window parameters from dicom file.
+
+    Args:
+        ds (pydicom.dataset.FileDataset): Dicom file.
+        window_center (Optional[int]): Configured window center, or None to read it from the file.
+        window_width (Optional[int]): Configured window width, or None to read it from the file.
+    """
+    # Sometimes window center is stored as a list of values, sometimes as a single value
+    # If it is a list, we take the first value for simplicity
+    if window_center is None:
+        try:
+            window_center = (
+                int(ds.WindowCenter[0])
+                if type(ds.WindowCenter) is pydicom.multival.MultiValue
+                else int(ds.WindowCenter)
+            )
+        except AttributeError:
+            # There is no WindowCenter Attribute in dicom file
+            # Using middle of Hounsfield Unit Scale
+            window_center = 1023
+            print(
+                f"There is no WindowCenter Attribute in {ds.filename} file. Using {window_center} as window center."  # type: ignore[str-bytes-safe]
+            )
+
+    if window_width is None:
+        try:
+            window_width = (
+                int(ds.WindowWidth[0]) if type(ds.WindowWidth) is pydicom.multival.MultiValue else int(ds.WindowWidth)
+            )
+        except AttributeError:
+            # There is no WindowWidth Attribute in dicom file
+            # Using half of Hounsfield Unit Range
+            window_width = 2048
+            print(f"There is no WindowWidth Attribute in {ds.filename} file. Using {window_width} as window width.")  # type: ignore[str-bytes-safe]
+
+    return window_center, window_width
+
+
+def apply_window(
+    output: np.ndarray,
+    ds: pydicom.dataset.FileDataset,
+    window_center: Optional[int],
+    window_width: Optional[int],
+) -> np.ndarray:
+    """Apply window to the image.
+
+    Args:
+        output (np.ndarray): Image to apply window to.
+        ds (pydicom.dataset.FileDataset): Dicom file.
+        window_center (Optional[int]): Configured window center, or None to read it from the file.
+        window_width (Optional[int]): Configured window width, or None to read it from the file.
+    Returns:
+        np.ndarray: Image data with applied window.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            window_center, window_width = get_window_parameters(ds, window_center, window_width)
+            output = np.clip(
+                output,
+                window_center - window_width / 2,
+                window_center + window_width / 2,
+            )
+            min_val = np.min(output)
+            min_val = -1000 if min_val < -1000 else min_val
+            output = output - min_val
+            max_val = np.max(output)
+            ratio = max_val / 255 if max_val != 0 else 1  # Avoid division by zero
+
+            output = np.divide(output, ratio).astype(int)
+        except RuntimeWarning as e:
+            print("Runtime warning caught:", e)
+            print("Output max value:", max_val)
+            print("Output min value:", min_val)
+            # Handle the exception or adjust output as necessary
+    return output
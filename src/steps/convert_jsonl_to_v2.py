@@ -10,8 +10,6 @@ conversion (the DICOM window from ``DicomConfig``), so the v2 record faithfully
 pixel values were derived.
 """
 
-import jsonlines
-
 from base.step import BaseStep
 from constants import SCHEMA_VERSION_V2
 from metadata_schema import build_png_representation, build_v2_record
@@ -32,14 +30,8 @@ class ConvertJsonlToV2(BaseStep):
         if self.schema_version != SCHEMA_VERSION_V2:
             return X
 
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            v1_records = list(reader)
-
-        v2_records = [self._to_v2(record) for record in v1_records]
-
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for record in v2_records:
-                writer.write(record)
+        v2_records = [self._to_v2(record) for record in self.records.read()]
+        self.records.write(v2_records)
         return X
 
     def _to_v2(self, record: dict) -> dict:
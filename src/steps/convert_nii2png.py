@@ -2,11 +2,12 @@
 
 import glob
 import os
-from typing import Callable
+from typing import Any, Callable, Iterator
 
 import cv2
 import nibabel as nib
 import numpy as np
+from nibabel.volumeutils import apply_read_scaling
 from tqdm import tqdm
 
 from base.extractors.img_id import BaseImgIdExtractor
@@ -17,6 +18,9 @@ from geometry import build_slice_geometry, write_slice_geometry_sidecar
 class ConvertNii2Png(BaseStep):
     """Converts nii files to png images with appropriate color encoding."""
 
+    supports_streaming = True
+    stream_outputs_are_temporary = True
+
     def transform(
         self,
         X: list,  # img_paths
@@ -38,25 +42,48 @@ class ConvertNii2Png(BaseStep):
         new_paths = glob.glob(os.path.join(self.source_path, f"**/{self.img_prefix}*.png"), recursive=True)
         return new_paths
 
-    def convert_nii2png(self, img_path: str) -> None:
+    def transform_stream(self, X: Iterator[str]) -> Iterator[str]:
+        """Slice nii volumes one by one and yield the image slices as soon as each volume is written.
+
+        Segmentation slices are written next to their volume (for ``CopyMasks``) but not forwarded.
+
+        Args:
+            X (Iterator[str]): Paths to the images.
+        Returns:
+            Iterator[str]: Paths to the image PNG slices.
+        """
+        for img_path in X:
+            if img_path.endswith(".nii.gz"):
+                if self.segmentation_prefix in img_path or self.img_selector(img_path):
+                    for new_path in self.convert_nii2png(img_path):
+                        if self.segmentation_prefix in new_path:
+                            continue
+                        if os.path.basename(new_path).startswith(self.img_prefix or ""):
+                            yield new_path
+
+    def convert_nii2png(self, img_path: str) -> list:
         """Convert nii files to png images with appropriate color encoding.
 
         Args:
             img_path (str): Path to the image.
+        Returns:
+            list: Paths to the PNG slices written.
         """
+        new_paths = []
         try:
             nii_img = nib.load(img_path)
-            nii_data = nii_img.get_fdata()  # type: ignore[attr-defined]
-            slices = nii_data.shape[0]
-            for idx in range(slices):
+            is_segmentation = self.segmentation_prefix in img_path
+            for idx, img in enumerate(self._iter_slices(nii_img)):  # type: ignore[arg-type]
                 root_path = os.path.dirname(img_path)
                 name = os.path.basename(img_path).split(".")[0] + f"_{str(idx).zfill(self.zfill)}.png"
                 new_path = os.path.join(root_path, name)
-                img = np.array(nii_data[idx, :, :])
+                if is_segmentation:
+                    self._record_slice_values(new_path, img)
                 if self.segmentation_prefix not in new_path:
                     img = self._apply_window(img)
 
                 cv2.imwrite(new_path, img)
+                new_paths.append(new_path)
 
             # Task 40 (opt-in): persist the source 3D geometry so the PNG slices can be mapped back
             # to physical space. Sidecar only - the PNG pixels/filenames above are unchanged.
@@ -66,6 +93,48 @@ class ConvertNii2Png(BaseStep):
             print(f"Error {e} occurred while converting {img_path}")
             if self.on_error_remove:
                 os.remove(img_path)
+        return new_paths
+
+    @staticmethod
+    def _iter_slices(nii_img: nib.Nifti1Image) -> Iterator[np.ndarray]:
+        """Yield the axis-0 slices of a volume as float64, without holding a float64 copy of the volume.
+
+        The voxels are read through nibabel's array proxy in their stored dtype - memory-mapped for
+        uncompressed ``.nii`` files, one native-dtype array for ``.nii.gz`` - and each slice is scaled
+        and converted on its own, exactly as ``get_fdata`` scales the full volume.
+
+        Args:
+            nii_img (nib.Nifti1Image): The loaded volume.
+        Returns:
+            Iterator[np.ndarray]: The float64 slices, in order.
+        """
+        proxy: Any = nii_img.dataobj
+        if not nib.is_proxy(proxy):  # type: ignore[no-untyped-call]
+            volume = np.asanyarray(proxy)
+            for idx in range(volume.shape[0]):
+                yield np.array(volume[idx], dtype=np.float64)
+            return
+        raw = proxy.get_unscaled()
+        # get_fdata applies the scale factors in float64
+        slope, inter = np.float64(proxy.slope), np.float64(proxy.inter)
+        for idx in range(raw.shape[0]):
+            yield np.array(apply_read_scaling(raw[idx], slope, inter), dtype=np.float64)
+
+    def _record_slice_values(self, slice_path: str, segmentation_slice: np.ndarray) -> None:
+        """Record which label values a segmentation slice contains.
+
+        The values are stored in ``ctx.mask_slice_values`` under the UMIE id the slice will get,
+        so label extractors can tell which masks contain a finding without decoding the mask PNGs.
+
+        Args:
+            slice_path (str): Path of the PNG slice.
+            segmentation_slice (np.ndarray): The slice's label values.
+        """
+        try:
+            umie_id = self.get_umie_id(slice_path)
+        except (KeyError, IndexError, ValueError):
+            return
+        self.ctx.mask_slice_values[umie_id] = frozenset(int(value) for value in np.unique(segmentation_slice))
 
     def _write_geometry_sidecar(self, img_path: str) -> None:
         """Write the orientation sidecar for a sliced volume next to its slices (Task 40)."""
@@ -1,14 +1,13 @@
 """Create blank masks for images that don't have masks."""
 
-import glob
 import os
 
 import cv2
-import jsonlines
 import numpy as np
 from tqdm import tqdm
 
 from base.step import BaseStep
+from constants import BLANK_MASKS_FOLDER_NAME
 
 
 class CreateBlankMasks(BaseStep):
@@ -23,51 +22,73 @@ class CreateBlankMasks(BaseStep):
         Returns:
             X (list): List of paths to the images.
         """
-        mask_paths = glob.glob(
-            os.path.join(
-                self.target_path, f"**/{self.dataset_uid}_{self.dataset_name}/**/{self.mask_folder_name}/*.png"
-            ),
-            recursive=True,
-        )
-
-        mask_names = [os.path.basename(mask) for mask in mask_paths]
+        mask_paths = self.file_index.files(folder=self.mask_folder_name, extension="png")
+
+        mask_names = {os.path.basename(mask) for mask in mask_paths}
         print("Creating blank masks...")
-        self.blank_masks: list = []
+        self.blank_masks: dict = {}  # umie_path -> mask path of every image given a blank mask
+        self._encoded_blank_masks: dict = {}  # (height, width) -> PNG bytes of a zero mask
+        self._shared_blank_masks: dict = {}  # (height, width) -> shared mask path written in this run
         for img_path in tqdm(X):
             img_name = os.path.basename(img_path)
             if img_name not in mask_names:
                 self.create_blank_masks(img_path)
 
-        updated_lines = []
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                if obj["umie_path"] in self.blank_masks:
-                    mask_path = self.get_umie_mask_path_from_img_path(obj["umie_path"])
-                    obj["mask_path"] = self.get_path_without_target_path(mask_path)
-
-                updated_lines.append(obj)
-
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for obj in updated_lines:
-                writer.write(obj)
+        updated_lines = self.records.read()
+        for obj in updated_lines:
+            mask_path = self.blank_masks.get(obj["umie_path"])
+            if mask_path is not None:
+                obj["mask_path"] = self.get_path_without_target_path(mask_path)
+        self.records.write(updated_lines)
 
         return X
 
     def create_blank_masks(self, img_path: str) -> None:
         """Create blank masks for images that don't have masks.
 
+        Only the image header is read, and a zero mask is PNG-encoded once per resolution; every
+        further mask of that resolution is written from the cached bytes. With
+        ``ExportConfig.shared_blank_masks`` the image's mask path points to one mask per
+        resolution under the dataset's ``BlankMasks`` folder instead of a copy in its mask folder.
+
         Args:
             img_path (str): Path to the image.
         """
         img_name = os.path.basename(img_path)
-        img = cv2.imread(img_path)
+        image_shape = self.image_probe.shape(img_path)  # header only, the image is not decoded
+        if image_shape is None:
+            raise ValueError(f"Cannot read the dimensions of {img_path}.")
+        mask_shape = (image_shape[0], image_shape[1])  # Flatten the mask to grayscale
+        umie_path = self.get_path_without_target_path(img_path)
+
+        if self.export_config.shared_blank_masks:
+            new_path = self._shared_blank_masks.get(mask_shape)
+            if new_path is None:
+                new_path = os.path.join(
+                    self.dataset_root, BLANK_MASKS_FOLDER_NAME, f"{mask_shape[0]}x{mask_shape[1]}.png"
+                )
+                os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                self._write_blank_mask(new_path, mask_shape)
+                self._shared_blank_masks[mask_shape] = new_path
+            self.blank_masks[umie_path] = new_path
+            return
 
         new_path = os.path.dirname(os.path.dirname(img_path))
         new_path = os.path.join(new_path, self.mask_folder_name, img_name)
-        original_image_shape = img.shape
-        mask_shape = (original_image_shape[0], original_image_shape[1])  # Flatten the mask to grayscale
-        mask = np.zeros(mask_shape, np.uint8)  # Create a black mask
-        cv2.imwrite(new_path, mask)
+        self._write_blank_mask(new_path, mask_shape)
+        self.blank_masks[umie_path] = self.get_umie_mask_path_from_img_path(umie_path)
 
-        umie_path = new_path.replace(self.mask_folder_name, self.image_folder_name)
-        self.blank_masks.append(self.get_path_without_target_path(umie_path))
+    def _write_blank_mask(self, path: str, mask_shape: tuple) -> None:
+        """Write a black grayscale PNG mask, encoding it only once per resolution.
+
+        Args:
+            path (str): Path of the mask to write.
+            mask_shape (tuple): ``(height, width)`` of the mask.
+        """
+        encoded = self._encoded_blank_masks.get(mask_shape)
+        if encoded is None:
+            _, buffer = cv2.imencode(".png", np.zeros(mask_shape, np.uint8))  # Create a black mask
+            encoded = buffer.tobytes()
+            self._encoded_blank_masks[mask_shape] = encoded
+        with open(path, "wb") as mask_file:
+            mask_file.write(encoded)
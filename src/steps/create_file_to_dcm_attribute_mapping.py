@@ -1,12 +1,24 @@
-"""Create filename to dicom attribute mapping."""
+"""Create filename to dicom attribute mapping.
+
+Only the mapped attribute is needed, so the files are scanned header-only: for a standard
+attribute keyword the read stops as soon as the data set has passed the attribute's tag (the
+elements of a data set are sorted by tag, so an early tag such as SOPInstanceUID is reached
+after a few hundred bytes), and only that element's value is parsed. Other attributes are read
+with ``stop_before_pixels``. The scan runs over ``ExportConfig.num_workers`` processes.
+"""
 
 import json
 import os
-from typing import Any
+from functools import partial
+from typing import Any, Optional
 
 from pydicom import dcmread
+from pydicom.datadict import tag_for_keyword
+from pydicom.filereader import read_partial
+from pydicom.tag import BaseTag, Tag
 
 from base.step import BaseStep
+from utils.parallel import iter_in_parallel
 
 
 class CreateFileToDcmAttributeMapping(BaseStep):
@@ -33,11 +45,45 @@ class CreateFileToDcmAttributeMapping(BaseStep):
         Args:
             path_list (list): List of paths to the images.
         """
+        dcm_paths = [filepath for filepath in path_list if filepath.endswith(".dcm")]
+        tasks = ((filepath, self.dicom_mapping_attribute) for filepath in dcm_paths)
+        values = iter_in_parallel(_read_attribute_task, tasks, num_workers=self.export_config.num_workers)
+
         file_to_dicom_attr_mapping = dict()
-        for filepath in path_list:
-            if filepath.endswith(".dcm"):
-                ds = dcmread(filepath)
-                file_to_dicom_attr_mapping[getattr(ds, self.dicom_mapping_attribute)] = filepath
+        for filepath, value in zip(dcm_paths, values):
+            file_to_dicom_attr_mapping[value] = filepath
 
         with open(os.path.join(self.target_path, "file_to_dcm_attribute_mapping.json"), "w") as temp_file:
             temp_file.write(json.dumps(file_to_dicom_attr_mapping))
+
+
+# The per-file read is kept at module level so it can be pickled into spawn-started workers.
+
+
+def read_dcm_attribute(filepath: str, attribute: str) -> Any:
+    """Read one attribute of a DICOM file without reading its pixel data.
+
+    Args:
+        filepath (str): Path to the DICOM file.
+        attribute (str): DICOM keyword of the attribute, e.g. ``"SOPInstanceUID"``.
+
+    Returns:
+        Any: The attribute value (raises ``AttributeError`` when the file does not have it).
+    """
+    tag: Optional[int] = tag_for_keyword(attribute)
+    if tag is not None:
+        with open(filepath, "rb") as handle:
+            ds = read_partial(handle, stop_when=partial(_past_tag, Tag(tag)), specific_tags=[Tag(tag)])
+        if attribute in ds:
+            return getattr(ds, attribute)
+    return getattr(dcmread(filepath, stop_before_pixels=True), attribute)
+
+
+def _read_attribute_task(task: tuple) -> Any:
+    """Unpack a ``(filepath, attribute)`` task for :func:`iter_in_parallel`."""
+    return read_dcm_attribute(*task)
+
+
+def _past_tag(target: BaseTag, tag: BaseTag, vr: Optional[str], length: int) -> bool:
+    """``read_partial`` stop condition: stop before the first element after ``target``."""
+    return tag > target
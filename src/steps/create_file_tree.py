@@ -33,9 +33,10 @@ class CreateFileTree(BaseStep):
 
     def _create_json(self) -> None:
         """Create JSON file for storing information about target datafiles."""
-        # Always create a new file
+        # Always create a new file (and drop any records still held from a previous run)
         with open(self.json_path, "w"):
             pass
+        self.records.reset()
 
     def create_file_tree(self) -> None:
         """Create file tree for dataset."""
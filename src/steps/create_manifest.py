@@ -45,6 +45,8 @@ class CreateManifest(BaseStep):
         Returns:
             list: The same ``X``, unchanged.
         """
+        # The JSONL is one of the hashed outputs: write any deferred records first.
+        self.records.flush()
         if self.export_config.verify_manifest:
             self._verify_manifest()
         elif self.export_config.write_manifest:
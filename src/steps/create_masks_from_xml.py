@@ -5,6 +5,7 @@ import json
 import os
 import plistlib
 import re
+from typing import Union
 
 import cv2
 import numpy as np
@@ -35,10 +36,37 @@ class CreateMasksFromXml(BaseStep):
         if os.path.exists(file_to_dicom_attr_mapping_file):
             self.file_to_dicom_attr_mapping = json.load(open(file_to_dicom_attr_mapping_file))
 
+        self._mask_canvases: dict = {}
         for mask_path in tqdm(mask_paths):
-            self.xml_mask_creator(mask_path)
+            try:
+                self.xml_mask_creator(mask_path)
+            finally:
+                self.flush_masks()
 
         # Free the memory occupied by whole json file as it will not be used anymore
         self.file_to_dicom_attr_mapping = None
 
         return X
+
+    def draw_polygon(self, mask_path: str, points: list, color: Union[int, tuple]) -> None:
+        """Fill a polygon on a mask, keeping the mask in memory until ``flush_masks``.
+
+        Mask creators submit every ROI of an XML file through this method, so each mask is decoded
+        once, all of its polygons are rasterized in submission order, and it is encoded once.
+
+        Args:
+            mask_path (str): Path to the existing mask PNG.
+            points (list): Polygon vertices as ``[x, y]`` pairs.
+            color (Union[int, tuple]): Fill color.
+        """
+        canvas = self._mask_canvases.get(mask_path)
+        if canvas is None:
+            canvas = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+            self._mask_canvases[mask_path] = canvas
+        cv2.fillPoly(canvas, [np.array(points)], (color))  # type: ignore[arg-type]  # cv2 accepts a scalar color
+
+    def flush_masks(self) -> None:
+        """Write every mask drawn on since the last flush, once each, and drop them from memory."""
+        for mask_path, canvas in self._mask_canvases.items():
+            cv2.imwrite(mask_path, canvas)
+        self._mask_canvases = {}
@@ -33,8 +33,6 @@ import random
 from collections import Counter, defaultdict
 from typing import Any
 
-import jsonlines
-
 from base.step import BaseStep
 
 
@@ -52,14 +50,11 @@ class CreateSplits(BaseStep):
         Returns:
             list: The unchanged list of image paths.
         """
-        if not os.path.exists(self.json_path):
+        if not self.records.exists():
             return X
 
         print("Creating reproducible study-level splits...")
-        records: list[dict] = []
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                records.append(obj)
+        records = self.records.read()
 
         if not records:
             return X
@@ -182,11 +177,10 @@ class CreateSplits(BaseStep):
             records (list[dict]): All JSONL records, in original order.
             study_to_split (dict[str, str]): ``{study_id: split}`` mapping.
         """
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for obj in records:
-                study_id = str(obj.get("study_id", ""))
-                obj["split"] = study_to_split.get(study_id, "train")
-                writer.write(obj)
+        for obj in records:
+            study_id = str(obj.get("study_id", ""))
+            obj["split"] = study_to_split.get(study_id, "train")
+        self.records.write(records)
 
     def _write_manifest(self, study_to_split: dict[str, str]) -> None:
         """Write the ``{study_id: split}`` manifest to JSON under the reports dir.
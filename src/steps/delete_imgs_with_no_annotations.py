@@ -1,10 +1,8 @@
 """Delete images without masks."""
 
-import glob
 import os
 
 import cv2
-import jsonlines
 import numpy as np
 from tqdm import tqdm
 
@@ -23,30 +21,30 @@ class DeleteImgsWithNoAnnotations(BaseStep):
             X (list): List of paths to the images.
         """
         root_path = os.path.dirname(os.path.dirname(X[0]))
+        modality = os.path.basename(root_path)
 
         self.json_lines = {}
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                umie_file_name = os.path.basename(obj["umie_path"])
-                self.json_lines[umie_file_name] = obj
+        for obj in self.records.read():
+            umie_file_name = os.path.basename(obj["umie_path"])
+            self.json_lines[umie_file_name] = obj
 
         if self.mask_folder_name:
-            mask_paths = glob.glob(f"{os.path.join(root_path, self.mask_folder_name)}/**/*.png", recursive=True)
-            self.mask_names = [os.path.basename(mask) for mask in mask_paths]
+            mask_paths = self.file_index.files(
+                folder=self.mask_folder_name, extension="png", modality=modality, nested=True
+            )
+            self.mask_names = set(os.path.basename(mask) for mask in mask_paths)
         print("Deleting images without annotations...")
 
         for img_path in tqdm(X):
             self.delete_imgs_with_no_annotations(img_path, root_path)
 
         # Create new list of paths after the deletion
-        root_path = os.path.dirname(X[0])
-        new_paths = glob.glob(os.path.join(root_path, "**/*.png"), recursive=True)
+        new_paths = self.file_index.files(
+            folder=self.image_folder_name, extension="png", modality=modality, nested=True
+        )
 
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            remaining_files = set(os.path.basename(path) for path in new_paths)
-            for k, obj in self.json_lines.items():
-                if k in remaining_files:
-                    writer.write(obj)
+        remaining_files = set(os.path.basename(path) for path in new_paths)
+        self.records.write([obj for k, obj in self.json_lines.items() if k in remaining_files])
 
         return new_paths
 
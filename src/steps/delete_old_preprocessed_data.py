@@ -22,6 +22,7 @@ class DeleteOldPreprocessedData(BaseStep):
         if os.path.exists(directory_to_delete):
             print(f"Deleting old preprocessed data from: {directory_to_delete}")
             shutil.rmtree(directory_to_delete)
+            self.records.reset()
         else:
             print(f"No old preprocessed data to delete in: {directory_to_delete}")
 
@@ -1,6 +1,5 @@
 """Detect corrupt, truncated, blank or undersized output images and write a report."""
 
-import glob
 import json
 import os
 from typing import Optional
@@ -47,10 +46,9 @@ class DetectCorruptImages(BaseStep):
         return X
 
     def _output_image_paths(self) -> list:
-        """Glob the dataset's output images (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
+        """List the dataset's output images (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
         extension = "nii.gz" if self.output_mode == OutputMode.VOLUMES_3D else "png"
-        pattern = os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.{extension}")
-        return sorted(glob.glob(pattern, recursive=True))
+        return self.file_index.files(folder=self.image_folder_name, extension=extension)
 
     def _read_array(self, path: str) -> Optional[np.ndarray]:
         """Read an output image or volume into a numpy array, or None if unreadable.
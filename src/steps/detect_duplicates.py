@@ -1,18 +1,45 @@
-"""Detect duplicate and near-duplicate output images using a perceptual (dHash) hash."""
+"""Detect duplicate and near-duplicate output images using a perceptual (dHash) hash.
+
+Hashes are packed into a ``uint64`` matrix (one row of ``ceil(hash_size**2 / 64)`` words per
+image) and Hamming distances are computed with a vectorized popcount. Near-duplicate pairs are
+found by multi-index hashing instead of comparing every pair: each hash is split into
+``duplicate_threshold + 1`` disjoint bit chunks, and two hashes within the threshold must agree
+exactly on at least one chunk (pigeonhole), so only hashes sharing a chunk value are compared.
+The clusters are the connected components of the same "distance <= threshold" graph as a full
+pairwise comparison, so the reports are unchanged.
+"""
 
 import csv
-import glob
 import json
 import os
 from typing import Optional
 
 import cv2  # type: ignore[import-untyped]
-import jsonlines
 import numpy as np
 
 from base.step import BaseStep
 from constants import OutputMode
 
+_DISTANCE_BLOCK_WORDS = 1 << 21  # cap on the XOR buffer (in uint64 words) of one block of pairwise distances
+
+
+def _hamming_distances(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Return the ``(len(left), len(right))`` Hamming distances between two packed-hash matrices.
+
+    Args:
+        left (np.ndarray): ``(n, n_words)`` ``uint64`` packed hashes.
+        right (np.ndarray): ``(m, n_words)`` ``uint64`` packed hashes.
+    Returns:
+        np.ndarray: Pairwise bit distances.
+    """
+    x = left[:, None, :] ^ right[None, :, :]
+    # SWAR popcount of every 64-bit word.
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    x = (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+    return x.sum(axis=2, dtype=np.int64)
+
 
 class DetectDuplicates(BaseStep):
     """Detect duplicate and near-duplicate output images using a perceptual (dHash) hash."""
@@ -45,10 +72,9 @@ class DetectDuplicates(BaseStep):
         return X
 
     def _output_image_paths(self) -> list:
-        """Glob the dataset's output images (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
+        """List the dataset's output images (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
         extension = "nii.gz" if self.output_mode == OutputMode.VOLUMES_3D else "png"
-        pattern = os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.{extension}")
-        return sorted(glob.glob(pattern, recursive=True))
+        return self.file_index.files(folder=self.image_folder_name, extension=extension)
 
     def _dhash(self, image: np.ndarray) -> int:
         """Compute the difference hash of a grayscale image as a ``hash_size**2`` bit integer.
@@ -60,11 +86,9 @@ class DetectDuplicates(BaseStep):
         """
         hash_size = self.quality.duplicate_hash_size
         resized = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
-        diff = resized[:, 1:] > resized[:, :-1]
-        value = 0
-        for bit in diff.flatten():
-            value = (value << 1) | int(bool(bit))
-        return value
+        diff = (resized[:, 1:] > resized[:, :-1]).flatten()
+        # packbits pads the last byte with zero bits on the right; shift them back out.
+        return int.from_bytes(np.packbits(diff).tobytes(), "big") >> (-diff.size % 8)
 
     def _load_image_grayscale(self, path: str) -> Optional[np.ndarray]:
         """Load an output image as a 2D grayscale array, or None if it cannot be read.
@@ -115,18 +139,6 @@ class DetectDuplicates(BaseStep):
             raw = json.load(handle)
         return {key: int(value) for key, value in raw.items()}
 
-    @staticmethod
-    def _hamming(left: int, right: int) -> int:
-        """Return the Hamming distance between two integer hashes.
-
-        Args:
-            left (int): First hash.
-            right (int): Second hash.
-        Returns:
-            int: Number of differing bits.
-        """
-        return int(bin(left ^ right).count("1"))
-
     def _cluster(self, hashes: dict, reference: dict) -> list:
         """Cluster images whose pairwise Hamming distance is within the configured threshold.
 
@@ -142,49 +154,135 @@ class DetectDuplicates(BaseStep):
         threshold = self.quality.duplicate_threshold
         own_keys = set(hashes.keys())
         combined = {**reference, **hashes}  # this dataset's hashes win on key collisions
-        items = list(combined.items())
+        keys = list(combined.keys())
+        if not keys:
+            return []
 
-        parent = {key: key for key, _ in items}
+        # Identical hashes are always within the threshold: cluster on the distinct hashes only.
+        packed = self._pack_hashes(list(combined.values()))
+        unique, inverse = np.unique(packed, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        parent = list(range(len(unique)))
 
-        def find(node: str) -> str:
+        def find(node: int) -> int:
             while parent[node] != node:
                 parent[node] = parent[parent[node]]
                 node = parent[node]
             return node
 
-        def union(left: str, right: str) -> None:
+        for left, right in self._near_pairs(unique, threshold):
             parent[find(left)] = find(right)
 
-        for i in range(len(items)):
-            for j in range(i + 1, len(items)):
-                if self._hamming(items[i][1], items[j][1]) <= threshold:
-                    union(items[i][0], items[j][0])
-
         groups: dict = {}
-        for key, _ in items:
-            groups.setdefault(find(key), []).append(key)
+        for key, unique_index in zip(keys, inverse.tolist()):
+            groups.setdefault(find(unique_index), []).append((key, unique_index))
 
         clusters = []
-        for members in groups.values():
+        for group in groups.values():
+            members = [key for key, _ in group]
             if len(members) < 2:
                 continue
             if not any(member in own_keys for member in members):
                 continue
             ordered = sorted(members)
-            max_distance = 0
-            for i in range(len(ordered)):
-                for j in range(i + 1, len(ordered)):
-                    max_distance = max(max_distance, self._hamming(combined[ordered[i]], combined[ordered[j]]))
+            rows = unique[sorted({unique_index for _, unique_index in group})]
             representative = next((member for member in ordered if member in own_keys), ordered[0])
             clusters.append(
                 {
                     "members": ordered,
                     "representative": representative,
-                    "max_distance": max_distance,
+                    "max_distance": self._max_distance(rows),
                 }
             )
         return sorted(clusters, key=lambda cluster: cluster["representative"])
 
+    def _pack_hashes(self, values: list) -> np.ndarray:
+        """Pack integer hashes into a ``(n, n_words)`` ``uint64`` matrix, most significant word first.
+
+        Args:
+            values (list): Integer hashes of ``duplicate_hash_size**2`` bits.
+        Returns:
+            np.ndarray: One row of 64-bit words per hash.
+        """
+        n_bits = max(self.quality.duplicate_hash_size**2, *(value.bit_length() for value in values), 1)
+        n_words = -(-n_bits // 64)
+        shifts = [64 * (n_words - 1 - word) for word in range(n_words)]
+        mask = (1 << 64) - 1
+        return np.array([[(value >> shift) & mask for shift in shifts] for value in values], dtype=np.uint64)
+
+    @staticmethod
+    def _chunk_keys(packed: np.ndarray, n_chunks: int) -> list:
+        """Split every packed hash into ``n_chunks`` disjoint bit chunks and label each chunk's value.
+
+        Args:
+            packed (np.ndarray): ``(n, n_words)`` matrix of packed hashes.
+            n_chunks (int): Number of chunks (at most the number of bits).
+        Returns:
+            list: One length-``n`` array per chunk; equal labels mean equal chunk values.
+        """
+        n_words = packed.shape[1]
+        if n_chunks <= n_words:
+            # Whole words per chunk.
+            return [
+                np.unique(packed[:, columns], axis=0, return_inverse=True)[1].reshape(-1)
+                for columns in np.array_split(np.arange(n_words), n_chunks)
+            ]
+        keys = []
+        for word, word_chunks in enumerate(np.array_split(np.arange(n_chunks), n_words)):
+            bounds = np.linspace(0, 64, len(word_chunks) + 1).astype(int)
+            for low, high in zip(bounds[:-1], bounds[1:]):
+                width_mask = np.uint64((1 << int(high - low)) - 1)
+                keys.append((packed[:, word] >> np.uint64(low)) & width_mask)
+        return keys
+
+    def _near_pairs(self, packed: np.ndarray, threshold: int) -> list:
+        """Find all pairs of distinct packed hashes within ``threshold`` bits, by multi-index hashing.
+
+        Args:
+            packed (np.ndarray): ``(n, n_words)`` matrix of distinct packed hashes.
+            threshold (int): Maximum Hamming distance.
+        Returns:
+            list: ``(i, j)`` row-index pairs with ``i < j``.
+        """
+        n_rows, n_words = packed.shape
+        if threshold + 1 > 64 * n_words:
+            # Too few bits for a pigeonhole split: every row is a candidate of every other.
+            candidate_groups = [np.arange(n_rows)]
+        else:
+            candidate_groups = []
+            for key in self._chunk_keys(packed, threshold + 1):
+                order = np.argsort(key, kind="stable")
+                splits = np.flatnonzero(np.diff(key[order])) + 1
+                candidate_groups.extend(group for group in np.split(order, splits) if len(group) > 1)
+
+        pairs = set()
+        for group in candidate_groups:
+            # Rows of a group are in ascending order: compare each block with the rows after it only.
+            block_rows = max(1, _DISTANCE_BLOCK_WORDS // (len(group) * n_words))
+            for start in range(0, len(group), block_rows):
+                block, rest = group[start : start + block_rows], group[start:]
+                distances = _hamming_distances(packed[block], packed[rest])
+                for i, j in zip(*np.nonzero(distances <= threshold)):
+                    if i < j:
+                        pairs.add((int(block[i]), int(rest[j])))
+        return sorted(pairs)
+
+    @staticmethod
+    def _max_distance(packed: np.ndarray) -> int:
+        """Return the largest pairwise Hamming distance between the rows of a packed-hash matrix.
+
+        Args:
+            packed (np.ndarray): ``(n, n_words)`` matrix of packed hashes.
+        Returns:
+            int: The maximum distance (0 for fewer than two rows).
+        """
+        max_distance = 0
+        block_rows = max(1, _DISTANCE_BLOCK_WORDS // (len(packed) * packed.shape[1]))
+        for start in range(0, len(packed), block_rows):
+            distances = _hamming_distances(packed[start : start + block_rows], packed[start:])
+            max_distance = max(max_distance, int(distances.max()))
+        return max_distance
+
     def _write_reports(self, clusters: list) -> None:
         """Write the duplicate clusters to a JSON and a CSV report under the reports dir.
 
@@ -210,21 +308,16 @@ class DetectDuplicates(BaseStep):
         Args:
             clusters (list): The detected duplicate clusters.
         """
-        if not os.path.exists(self.json_path):
+        if not self.records.exists():
             return
         member_to_group = {}
         for group_id, cluster in enumerate(clusters):
             for member in cluster["members"]:
                 member_to_group[member] = group_id
 
-        updated = []
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                member_group = member_to_group.get(obj.get("umie_path"))
-                if member_group is not None:
-                    obj["duplicate_group_id"] = member_group
-                updated.append(obj)
-
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for obj in updated:
-                writer.write(obj)
+        updated = self.records.read()
+        for obj in updated:
+            member_group = member_to_group.get(obj.get("umie_path"))
+            if member_group is not None:
+                obj["duplicate_group_id"] = member_group
+        self.records.write(updated)
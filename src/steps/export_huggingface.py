@@ -16,18 +16,28 @@ kept as strings. When a ``split`` field is present the records are grouped into
 single ``train`` split so the output is always a ``DatasetDict`` and therefore consistently
 round-trip-able with ``datasets.load_from_disk``.
 
+The export runs in bounded memory: the JSONL is streamed, and every ``ExportConfig.hf_shard_size``
+records of a split are written by ``Dataset.from_generator`` into a shard directory next to the
+export (``{export_dir}.shards``), with the image bytes embedded as the shard is saved. Shards are
+written across ``ExportConfig.num_workers`` processes, each into its own directory, renamed into
+place once complete. A run that fails part-way therefore resumes from the completed shards, as
+long as the JSONL is unchanged. The finished shards are then concatenated (memory-mapped) into the
+final ``DatasetDict`` and the shard directory is removed.
+
 Future work: additional first-class exporters for medical / training-oriented formats are
 planned but intentionally out of scope here -- MONAI / nnU-Net dataset layouts for segmentation
-training, and sharded ``WebDataset`` / ``TFRecord`` exports for large-scale streaming.
+training, and sharded ``TFRecord`` exports for large-scale streaming (WebDataset shards are
+written by ``ExportWebDataset``).
 """
 
 from __future__ import annotations
 
 import json
 import os
-from typing import Any
-
-import pandas as pd
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Iterator
 
 from base.step import BaseStep
 from config.provenance import get_provenance
@@ -37,12 +47,30 @@ from datasets import (  # type: ignore[attr-defined]
     Features,
     Image,
     Value,
+    concatenate_datasets,
+    load_from_disk,
 )
+from utils.parallel import iter_in_parallel
 
 # Canonical ordering of splits when a "split" field is present in the JSONL (Task 21).
 SPLIT_ORDER = ("train", "val", "test")
 # Fallback single-split name used when the records carry no "split" field.
 DEFAULT_SPLIT = "train"
+# Suffix of the directory holding the resumable shards next to the export directory.
+SHARDS_SUFFIX = ".shards"
+# Keys of a record that become the image / mask / labels columns instead of string columns.
+SPECIAL_KEYS = ("umie_path", "mask_path", "labels")
+
+
+@dataclass
+class JsonlSummary:
+    """What the export needs to know about the dataset JSONL before writing any shard."""
+
+    num_records: int = 0
+    columns: list[str] = field(default_factory=list)  # every record key, in first-seen order
+    has_masks: bool = False
+    has_split: bool = False
+    modality_counts: dict[str, int] = field(default_factory=dict)
 
 
 class ExportHuggingFace(BaseStep):
@@ -66,38 +94,62 @@ class ExportHuggingFace(BaseStep):
         Returns:
             list: The unchanged list of image paths.
         """
+        # Deferred JSONL records (ExportConfig.defer_jsonl_writes) must be on disk before they are read.
+        self.records.flush()
         if not os.path.exists(self.json_path):
             print(f"HuggingFace export skipped: dataset JSONL not found at {self.json_path}.")
             return X
 
         export_dir = self.export_config.hf_export_path or os.path.join(self.dataset_root, "huggingface")
 
-        records = self._read_records()
-        if not records:
+        summary = self._scan_records()
+        if not summary.num_records:
             print("HuggingFace export skipped: dataset JSONL is empty.")
             return X
 
-        has_masks = any(bool(record.get("mask_path")) for record in records)
-        features = self._build_features(records[0], has_masks)
+        features = self._build_features(summary.columns, summary.has_masks)
 
-        print(f"Exporting {len(records)} record(s) to HuggingFace dataset at {export_dir} ...")
-        dataset_dict = self._build_dataset_dict(records, features, has_masks)
+        print(f"Exporting {summary.num_records} record(s) to HuggingFace dataset at {export_dir} ...")
+        shards_dir = export_dir.rstrip(os.sep) + SHARDS_SUFFIX
+        dataset_dict = self._build_dataset_dict(shards_dir, features, summary)
 
         os.makedirs(export_dir, exist_ok=True)
         dataset_dict.save_to_disk(export_dir)
-        self._write_card(export_dir, records, dataset_dict)
+        self._write_card(export_dir, summary.modality_counts, dataset_dict)
+        shutil.rmtree(shards_dir)
 
         print(f"HuggingFace export complete: {sum(d.num_rows for d in dataset_dict.values())} record(s) written.")
         return X
 
-    def _read_records(self) -> list[dict[str, Any]]:
-        """Read the dataset JSONL into a list of plain dict records via pandas.
+    def _iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream the dataset JSONL records in file order.
+
+        Yields:
+            dict[str, Any]: One dict per non-empty JSONL line.
+        """
+        with open(self.json_path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _scan_records(self) -> JsonlSummary:
+        """Collect the columns, mask / split presence and modality counts in one streaming pass.
 
         Returns:
-            list[dict[str, Any]]: One dict per JSONL line, in file order.
+            JsonlSummary: The summary of the dataset JSONL.
         """
-        df = pd.read_json(self.json_path, lines=True)
-        return df.to_dict(orient="records")
+        summary = JsonlSummary()
+        columns: dict[str, None] = {}
+        for record in self._iter_records():
+            summary.num_records += 1
+            columns.update(dict.fromkeys(record))
+            summary.has_masks = summary.has_masks or bool(record.get("mask_path"))
+            summary.has_split = summary.has_split or bool(record.get("split"))
+            modality = str(record.get("modality_name") or "unknown")
+            summary.modality_counts[modality] = summary.modality_counts.get(modality, 0) + 1
+        summary.columns = list(columns)
+        summary.modality_counts = dict(sorted(summary.modality_counts.items()))
+        return summary
 
     @staticmethod
     def _flatten_labels(labels: Any) -> str:
@@ -128,15 +180,15 @@ class ExportHuggingFace(BaseStep):
                 raise ValueError(f"Invalid label type: {type(label)}")
         return json.dumps(merged)
 
-    def _build_features(self, sample_record: dict[str, Any], has_masks: bool) -> Features:
+    def _build_features(self, columns: list[str], has_masks: bool) -> Features:
         """Build the HuggingFace ``Features`` schema for the export.
 
         The ``image`` (and ``mask`` when masks exist) columns are cast with ``Image()``;
         ``labels`` is a JSON string; ``dataset_uid`` / ``study_id`` are strings; every other
-        scalar field present in the sample record is kept as a string ``Value``.
+        field of the records is kept as a string ``Value``.
 
         Args:
-            sample_record (dict[str, Any]): A representative record used to discover columns.
+            columns (list[str]): Every record key, in first-seen order.
             has_masks (bool): Whether the dataset has masks (adds a ``mask`` Image column).
 
         Returns:
@@ -149,18 +201,17 @@ class ExportHuggingFace(BaseStep):
         # Keep every remaining scalar field (e.g. dataset_name, modality_name, comparative,
         # umie_id, split, license, source_dataset, source_labels) as a string Value. Keys that
         # become the image/mask columns are remapped from umie_path / mask_path below.
-        skip = {"umie_path", "mask_path", "labels"}
-        for key in sample_record:
-            if key in skip:
-                continue
-            feature_map[key] = Value("string")
+        for key in columns:
+            if key not in SPECIAL_KEYS:
+                feature_map[key] = Value("string")
         return Features(feature_map)
 
-    def _record_to_row(self, record: dict[str, Any], has_masks: bool) -> dict[str, Any]:
+    def _record_to_row(self, record: dict[str, Any], columns: list[str], has_masks: bool) -> dict[str, Any]:
         """Convert one JSONL record into a HF row matching the ``_build_features`` schema.
 
         Args:
             record (dict[str, Any]): A single JSONL record.
+            columns (list[str]): Every record key; keys missing from this record become ``""``.
             has_masks (bool): Whether the dataset has masks.
 
         Returns:
@@ -174,77 +225,115 @@ class ExportHuggingFace(BaseStep):
             mask_path = record.get("mask_path")
             row["mask"] = os.path.join(self.target_path, str(mask_path)) if mask_path else None
 
-        skip = {"umie_path", "mask_path", "labels"}
-        for key, value in record.items():
-            if key in skip:
-                continue
-            row[key] = "" if value is None else str(value)
+        for key in columns:
+            if key not in SPECIAL_KEYS:
+                value = record.get(key)
+                row[key] = "" if value is None else str(value)
         return row
 
-    def _build_dataset_dict(
-        self,
-        records: list[dict[str, Any]],
-        features: Features,
-        has_masks: bool,
-    ) -> DatasetDict:
-        """Group records into a split-aware ``DatasetDict`` and cast to the feature schema.
+    def _build_dataset_dict(self, shards_dir: str, features: Features, summary: JsonlSummary) -> DatasetDict:
+        """Write (or reuse) the shards of every split and assemble them into a ``DatasetDict``.
 
         When the records carry a ``split`` field, the resulting ``DatasetDict`` contains the
         ``train`` / ``val`` / ``test`` splits that are actually present; otherwise all records
         go into a single ``train`` split. The output is always a ``DatasetDict``.
 
         Args:
-            records (list[dict[str, Any]]): All JSONL records.
-            features (Features): The feature schema to cast each split to.
-            has_masks (bool): Whether the dataset has masks.
+            shards_dir (str): Directory holding the resumable shards.
+            features (Features): The feature schema of every shard.
+            summary (JsonlSummary): The summary of the dataset JSONL.
 
         Returns:
             DatasetDict: The split-aware dataset, image/mask columns cast with ``Image()``.
         """
-        rows = [self._record_to_row(record, has_masks) for record in records]
-
-        has_split = any(record.get("split") for record in records)
-        grouped: dict[str, list[dict[str, Any]]] = {}
-        if has_split:
-            for record, row in zip(records, rows):
-                split = str(record.get("split") or DEFAULT_SPLIT)
-                grouped.setdefault(split, []).append(row)
-        else:
-            grouped[DEFAULT_SPLIT] = rows
+        self._prepare_shards_dir(shards_dir)
+        shard_dirs: dict[str, list[str]] = {}
+        tasks = self._shard_tasks(shards_dir, features, summary, shard_dirs)
+        for _ in iter_in_parallel(_write_shard_task, tasks, num_workers=self.export_config.num_workers):
+            pass
 
         # Emit known splits in canonical order first, then any unexpected extras deterministically.
-        ordered_splits = [s for s in SPLIT_ORDER if s in grouped]
-        ordered_splits += sorted(s for s in grouped if s not in SPLIT_ORDER)
+        ordered_splits = [s for s in SPLIT_ORDER if s in shard_dirs]
+        ordered_splits += sorted(s for s in shard_dirs if s not in SPLIT_ORDER)
 
-        splits = {split: Dataset.from_list(grouped[split], features=features) for split in ordered_splits}
+        splits = {
+            split: concatenate_datasets([load_from_disk(path) for path in shard_dirs[split]])
+            for split in ordered_splits
+        }
         return DatasetDict(splits)
 
-    def _modality_breakdown(self, records: list[dict[str, Any]]) -> dict[str, int]:
-        """Count records per ``modality_name`` for the dataset card.
+    def _prepare_shards_dir(self, shards_dir: str) -> None:
+        """Keep the shards of an interrupted export of the same JSONL; otherwise start afresh.
 
         Args:
-            records (list[dict[str, Any]]): All JSONL records.
+            shards_dir (str): Directory holding the resumable shards.
+        """
+        stat = os.stat(self.json_path)
+        source = {
+            "jsonl": os.path.abspath(self.json_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "shard_size": self.export_config.hf_shard_size,
+        }
+        source_path = os.path.join(shards_dir, "source.json")
+        if os.path.exists(source_path):
+            with open(source_path, encoding="utf-8") as handle:
+                if json.load(handle) == source:
+                    return
+        shutil.rmtree(shards_dir, ignore_errors=True)
+        os.makedirs(shards_dir)
+        with open(source_path, mode="w", encoding="utf-8") as handle:
+            json.dump(source, handle)
+
+    def _shard_tasks(
+        self,
+        shards_dir: str,
+        features: Features,
+        summary: JsonlSummary,
+        shard_dirs: dict[str, list[str]],
+    ) -> Iterator[tuple[list[dict[str, Any]], Features, str]]:
+        """Stream the records into per-split shards, yielding a task for every shard not yet written.
 
-        Returns:
-            dict[str, int]: Record count keyed by modality name (deterministically ordered).
+        Args:
+            shards_dir (str): Directory holding the resumable shards.
+            features (Features): The feature schema of every shard.
+            summary (JsonlSummary): The summary of the dataset JSONL.
+            shard_dirs (dict[str, list[str]]): Filled with the shard directories of each split, in order.
+
+        Yields:
+            tuple[list[dict[str, Any]], Features, str]: The rows, schema and directory of a missing shard.
         """
-        counts: dict[str, int] = {}
-        for record in records:
-            modality = str(record.get("modality_name") or "unknown")
-            counts[modality] = counts.get(modality, 0) + 1
-        return dict(sorted(counts.items()))
+        shard_size = max(1, self.export_config.hf_shard_size)
+        buffers: dict[str, list[dict[str, Any]]] = {}
+
+        def flush(split: str) -> Iterator[tuple[list[dict[str, Any]], Features, str]]:
+            paths = shard_dirs.setdefault(split, [])
+            shard_dir = os.path.join(shards_dir, split, f"{len(paths):05d}")
+            paths.append(shard_dir)
+            if not os.path.isdir(shard_dir):
+                yield buffers[split], features, shard_dir
+            buffers[split] = []
+
+        for record in self._iter_records():
+            split = str(record.get("split") or DEFAULT_SPLIT) if summary.has_split else DEFAULT_SPLIT
+            buffers.setdefault(split, []).append(self._record_to_row(record, summary.columns, summary.has_masks))
+            if len(buffers[split]) >= shard_size:
+                yield from flush(split)
+        for split in list(buffers):
+            if buffers[split]:
+                yield from flush(split)
 
     def _write_card(
         self,
         export_dir: str,
-        records: list[dict[str, Any]],
+        modality_counts: dict[str, int],
         dataset_dict: DatasetDict,
     ) -> None:
         """Write a ``README.md`` dataset card describing license, provenance and breakdowns.
 
         Args:
             export_dir (str): Directory the dataset was saved to (card is written here).
-            records (list[dict[str, Any]]): All JSONL records (for the breakdowns).
+            modality_counts (dict[str, int]): Record count keyed by modality name.
             dataset_dict (DatasetDict): The saved dataset (for per-split counts).
         """
         provenance = get_provenance(self.dataset_name)
@@ -283,9 +372,37 @@ class ExportHuggingFace(BaseStep):
             "## Modality breakdown",
             "",
         ]
-        for modality, count in self._modality_breakdown(records).items():
+        for modality, count in modality_counts.items():
             lines.append(f"- **{modality}:** {count}")
         lines.append("")
 
         with open(os.path.join(export_dir, "README.md"), mode="w", encoding="utf-8") as card:
             card.write("\n".join(lines))
+
+
+def _iter_rows(rows: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Generator behind ``Dataset.from_generator`` for one shard."""
+    yield from rows
+
+
+def _write_shard_task(task: tuple[list[dict[str, Any]], Features, str]) -> str:
+    """Write one shard for :func:`iter_in_parallel`, embedding its image bytes.
+
+    Each shard goes to its own directory (no output is shared between workers): it is saved
+    under a temporary name and renamed into place only once complete, so an existing shard
+    directory is always a finished shard.
+
+    Args:
+        task (tuple[list[dict[str, Any]], Features, str]): The shard rows, schema and directory.
+
+    Returns:
+        str: The shard directory.
+    """
+    rows, features, shard_dir = task
+    partial_dir = f"{shard_dir}.partial"
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        shard = Dataset.from_generator(_iter_rows, features=features, gen_kwargs={"rows": rows}, cache_dir=cache_dir)
+        shard.save_to_disk(partial_dir)
+    os.replace(partial_dir, shard_dir)
+    return shard_dir
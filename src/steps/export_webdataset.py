@@ -0,0 +1,217 @@
+"""Export the processed dataset as WebDataset ``.tar`` shards for streaming training.
+
+Training nodes reading from object storage spend most of their data-loading time opening
+millions of small PNGs. This optional, opt-in step packs the dataset into a few large tar
+shards in the `WebDataset <https://github.com/webdataset/webdataset>`_ layout instead. Each
+sample is stored under its UMIE id (without extension) as:
+
+* ``{key}.png`` - the image PNG, byte for byte,
+* ``{key}.mask.png`` - the mask PNG, when the record has one,
+* ``{key}.json`` - the JSONL record.
+
+Like ``ExportHuggingFace`` the step only *reads* the processed outputs. The JSONL is streamed
+and the samples of each split (the record's ``split`` field, else ``train``) are cut into
+shards of at most ``ExportConfig.wds_shard_max_mb`` megabytes and
+``ExportConfig.wds_shard_max_samples`` samples. The shards are named
+``{split}-{index:06d}.tar`` and written across ``ExportConfig.num_workers`` processes. Each
+worker writes only its own shard under a temporary name and renames it into place. The main
+process writes ``index.json``, listing the shards of every split with their sample counts,
+sizes and a brace pattern that ``webdataset.WebDataset`` can open directly.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+from typing import Any, Iterator, Optional
+
+import webdataset as wds  # type: ignore[import-untyped]
+
+from base.step import BaseStep
+from utils.parallel import iter_in_parallel
+
+# Canonical ordering of splits in the index, and the split of records without a "split" field
+# (as in ExportHuggingFace).
+SPLIT_ORDER = ("train", "val", "test")
+DEFAULT_SPLIT = "train"
+# Name of the shard index written next to the shards.
+INDEX_NAME = "index.json"
+# Size of a tar header / block: every member costs a header plus its data padded to a block.
+TAR_BLOCK = 512
+
+# (key, image path, mask path or None, JSON metadata) of one sample
+Sample = tuple[str, str, Optional[str], bytes]
+
+
+class ExportWebDataset(BaseStep):
+    """Write the processed dataset as size-bounded, split-aware WebDataset tar shards."""
+
+    def transform(
+        self,
+        X: list,  # img_paths
+    ) -> list:
+        """Pack the images, masks and records of the dataset JSONL into tar shards.
+
+        ``X`` is returned unchanged; the step is a no-op when the source JSONL does not exist.
+
+        Args:
+            X (list): List of paths to the images (unchanged on return).
+
+        Returns:
+            list: The unchanged list of image paths.
+        """
+        # Deferred JSONL records (ExportConfig.defer_jsonl_writes) must be on disk before they are read.
+        self.records.flush()
+        if not os.path.exists(self.json_path):
+            print(f"WebDataset export skipped: dataset JSONL not found at {self.json_path}.")
+            return X
+
+        export_dir = self.export_config.wds_export_path or os.path.join(self.dataset_root, "webdataset")
+        os.makedirs(export_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(export_dir, "*.tar")) + glob.glob(os.path.join(export_dir, INDEX_NAME)):
+            os.remove(stale)
+
+        shards: dict[str, list[dict[str, Any]]] = {}
+        tasks = self._shard_tasks(export_dir)
+        for split, shard in iter_in_parallel(_write_shard_task, tasks, num_workers=self.export_config.num_workers):
+            shards.setdefault(split, []).append(shard)
+
+        index = self._write_index(export_dir, shards)
+        print(f"WebDataset export complete: {index['num_samples']} sample(s) in {export_dir}.")
+        return X
+
+    def _iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream the dataset JSONL records in file order.
+
+        Yields:
+            dict[str, Any]: One dict per non-empty JSONL line.
+        """
+        with open(self.json_path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _sample(self, record: dict[str, Any]) -> Optional[tuple[Sample, int]]:
+        """Build the sample of a record and its size in the tar, or None when its image is missing.
+
+        Args:
+            record (dict[str, Any]): A single JSONL record.
+
+        Returns:
+            Optional[tuple[Sample, int]]: The sample and the bytes it occupies in a tar shard.
+        """
+        image_path = os.path.join(self.target_path, str(record["umie_path"]))
+        if not os.path.exists(image_path):
+            print(f"WebDataset export: image {image_path} not found, skipping.")
+            return None
+        mask_path = os.path.join(self.target_path, str(record["mask_path"])) if record.get("mask_path") else None
+        if mask_path is not None and not os.path.exists(mask_path):
+            print(f"WebDataset export: mask {mask_path} not found, exporting the image without it.")
+            mask_path = None
+        umie_id = str(record.get("umie_id") or os.path.basename(image_path))
+        key = os.path.splitext(umie_id)[0].replace(".", "_")
+        metadata = json.dumps(record).encode("utf-8")
+        sizes = [os.path.getsize(image_path), len(metadata)]
+        if mask_path is not None:
+            sizes.append(os.path.getsize(mask_path))
+        num_bytes = sum(TAR_BLOCK + -(-size // TAR_BLOCK) * TAR_BLOCK for size in sizes)
+        return (key, image_path, mask_path, metadata), num_bytes
+
+    def _shard_tasks(self, export_dir: str) -> Iterator[tuple[str, str, list[Sample]]]:
+        """Stream the records into per-split shards bounded in size and sample count.
+
+        Args:
+            export_dir (str): Directory the shards are written to.
+
+        Yields:
+            tuple[str, str, list[Sample]]: The split, shard path and samples of each shard.
+        """
+        max_bytes = int(self.export_config.wds_shard_max_mb * 1024 * 1024)
+        max_samples = max(1, self.export_config.wds_shard_max_samples)
+        buffers: dict[str, list[Sample]] = {}
+        buffer_bytes: dict[str, int] = {}
+        shard_counts: dict[str, int] = {}
+
+        def flush(split: str) -> tuple[str, str, list[Sample]]:
+            index = shard_counts.get(split, 0)
+            shard_counts[split] = index + 1
+            samples, buffers[split], buffer_bytes[split] = buffers[split], [], 0
+            return split, os.path.join(export_dir, f"{split}-{index:06d}.tar"), samples
+
+        for record in self._iter_records():
+            built = self._sample(record)
+            if built is None:
+                continue
+            sample, num_bytes = built
+            split = str(record.get("split") or DEFAULT_SPLIT)
+            buffer = buffers.setdefault(split, [])
+            if buffer and (len(buffer) >= max_samples or buffer_bytes[split] + num_bytes > max_bytes):
+                yield flush(split)
+            buffers[split].append(sample)
+            buffer_bytes[split] = buffer_bytes.get(split, 0) + num_bytes
+        for split in list(buffers):
+            if buffers[split]:
+                yield flush(split)
+
+    def _write_index(self, export_dir: str, shards: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+        """Write ``index.json`` describing the shards of every split.
+
+        Args:
+            export_dir (str): Directory the shards were written to.
+            shards (dict[str, list[dict[str, Any]]]): The written shards of each split, in order.
+
+        Returns:
+            dict[str, Any]: The index.
+        """
+        ordered_splits = [s for s in SPLIT_ORDER if s in shards]
+        ordered_splits += sorted(s for s in shards if s not in SPLIT_ORDER)
+        splits = {}
+        for split in ordered_splits:
+            split_shards = shards[split]
+            last = len(split_shards) - 1
+            pattern = f"{split}-{{000000..{last:06d}}}.tar" if last else split_shards[0]["name"]
+            splits[split] = {
+                "num_samples": sum(shard["num_samples"] for shard in split_shards),
+                "pattern": pattern,
+                "shards": split_shards,
+            }
+        index = {
+            "dataset": f"{self.dataset_uid}_{self.dataset_name}",
+            "num_samples": sum(split["num_samples"] for split in splits.values()),
+            "splits": splits,
+        }
+        with open(os.path.join(export_dir, INDEX_NAME), mode="w", encoding="utf-8") as handle:
+            json.dump(index, handle, indent=2)
+        return index
+
+
+def _read_bytes(path: str) -> bytes:
+    """Return the content of the file at ``path``."""
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+def _write_shard_task(task: tuple[str, str, list[Sample]]) -> tuple[str, dict[str, Any]]:
+    """Write one tar shard for :func:`iter_in_parallel`.
+
+    Each shard goes to its own file (no output is shared between workers). It is written under
+    a temporary name and renamed once complete, so a shard is never seen half-written.
+
+    Args:
+        task (tuple[str, str, list[Sample]]): The split, shard path and samples of the shard.
+
+    Returns:
+        tuple[str, dict[str, Any]]: The split and the shard's index entry.
+    """
+    split, path, samples = task
+    partial_path = f"{path}.partial"
+    with wds.TarWriter(partial_path, encoder=False) as sink:
+        for key, image_path, mask_path, metadata in samples:
+            sample = {"__key__": key, "png": _read_bytes(image_path), "json": metadata}
+            if mask_path is not None:
+                sample["mask.png"] = _read_bytes(mask_path)
+            sink.write(sample)
+    os.replace(partial_path, path)
+    entry = {"name": os.path.basename(path), "num_samples": len(samples), "num_bytes": os.path.getsize(path)}
+    return split, entry
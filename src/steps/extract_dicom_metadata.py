@@ -36,7 +36,6 @@ import os
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
-import jsonlines
 import pydicom
 
 from base.step import BaseStep
@@ -102,13 +101,10 @@ class ExtractDicomMetadata(BaseStep):
         source_paths = self._load_source_paths()
         basename_index = self._index_by_basename(X)
 
-        if not os.path.exists(self.json_path):
+        if not self.records.exists():
             return X
 
-        records: list[dict] = []
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            for obj in reader:
-                records.append(obj)
+        records = self.records.read()
 
         extracted: dict[str, dict[str, Any]] = {}
         for obj in records:
@@ -279,12 +275,11 @@ class ExtractDicomMetadata(BaseStep):
             records (list[dict]): All JSONL records, in original order.
             extracted (dict[str, dict[str, Any]]): ``{umie_path: metadata}`` mapping.
         """
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for obj in records:
-                metadata = extracted.get(obj["umie_path"])
-                if metadata:
-                    obj["dicom_metadata"] = metadata
-                writer.write(obj)
+        for obj in records:
+            metadata = extracted.get(obj["umie_path"])
+            if metadata:
+                obj["dicom_metadata"] = metadata
+        self.records.write(records)
 
     def _write_sidecar(self, extracted: dict[str, dict[str, Any]]) -> None:
         """Write the extracted metadata to a sidecar JSON under the reports dir.
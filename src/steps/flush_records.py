@@ -0,0 +1,25 @@
+"""Write the in-memory dataset JSONL records to disk once, at the end of the pipeline.
+
+Appended automatically by ``BasePipeline.pipeline`` when ``ExportConfig.defer_jsonl_writes`` is
+set: the JSONL-enriching steps then only edit the shared ``RecordStore`` (``base.record_store``)
+and this step serializes the final state in a single pass. It is a no-op in the default
+write-through mode, where every step already wrote its changes.
+"""
+
+from base.step import BaseStep
+
+
+class FlushRecords(BaseStep):
+    """Flush the shared JSONL record store to the dataset JSONL."""
+
+    def transform(self, X: list) -> list:
+        """Write pending JSONL records.
+
+        Args:
+            X (list): Paths flowing through the pipeline (returned unchanged).
+
+        Returns:
+            list: ``X`` unchanged.
+        """
+        self.records.flush()
+        return X
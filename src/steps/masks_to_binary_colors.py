@@ -1,6 +1,5 @@
 """Recolors masks from shades of gray to 2 colors."""
 
-import glob
 import os
 from typing import Callable
 
@@ -21,8 +20,7 @@ class MasksToBinaryColors(BaseStep):
         Returns:
             X (list): List of paths to the images.
         """
-        root_path = os.path.join(self.target_path, f"{self.dataset_uid}_{self.dataset_name}")
-        mask_paths = glob.glob(os.path.join(root_path, f"**/{self.mask_folder_name}/*.png"), recursive=True)
+        mask_paths = self.file_index.files(folder=self.mask_folder_name, extension="png")
 
         for mask_path in tqdm(mask_paths):
             if os.path.exists(mask_path):
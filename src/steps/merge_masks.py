@@ -1,6 +1,5 @@
 """Merge several single-structure mask PNGs for one image into one multi-class mask."""
 
-import glob
 import json
 import os
 from collections import defaultdict
@@ -10,6 +9,7 @@ import cv2  # type: ignore[import-untyped]
 import numpy as np
 
 from base.step import BaseStep
+from utils.parallel import iter_in_parallel
 
 
 class MergeMasks(BaseStep):
@@ -32,9 +32,10 @@ class MergeMasks(BaseStep):
 
         Masks are grouped by their output basename (the UMIE id) within each modality's
         ``Masks`` folder. A group with several distinct mask arrays is merged with the
-        configured overlap policy and written back over the group's masks. A per-group
-        overlap summary is written to ``reports_dir()/mask_merge_report.json``. ``X`` is
-        returned unchanged.
+        configured overlap policy and written back over the group's masks. Groups are read and
+        merged over ``export.num_workers`` processes; the main process writes the results. A
+        per-group overlap summary is written to ``reports_dir()/mask_merge_report.json``. ``X``
+        is returned unchanged.
 
         Args:
             X (list): List of paths to the images.
@@ -50,15 +51,16 @@ class MergeMasks(BaseStep):
             "merge_priority": priority,
             "groups": [],
         }
-        for group_key, mask_paths in sorted(groups.items()):
-            if len(mask_paths) < 2:
+        merge_groups = [(key, paths) for key, paths in sorted(groups.items()) if len(paths) >= 2]
+        tasks = ((paths, policy, priority) for _, paths in merge_groups)
+        results = iter_in_parallel(_merge_group_task, tasks, num_workers=self.export_config.num_workers)
+        for (group_key, mask_paths), result in zip(merge_groups, results):
+            if result is None:
                 continue
-            arrays = [array for array in (self._read_mask(path) for path in mask_paths) if array is not None]
-            if len(arrays) < 2:
-                continue
-            merged, overlap_count = self._merge(arrays, policy, priority)
+            merged_png, overlap_count = result
             for path in mask_paths:
-                cv2.imwrite(path, merged)
+                with open(path, "wb") as handle:
+                    handle.write(merged_png)
             report["groups"].append(
                 {
                     "group": group_key,
@@ -78,24 +80,12 @@ class MergeMasks(BaseStep):
         """
         # Single-structure masks for the same image share a UMIE-id basename; they live either
         # directly in a modality's Masks folder or in per-structure subfolders beneath it. Match
-        # both by globbing every PNG at any depth under a Masks folder.
-        pattern = os.path.join(self.dataset_root, f"**/{self.mask_folder_name}/**/*.png")
+        # both by listing every PNG at any depth under a Masks folder.
         groups: dict[str, list[str]] = defaultdict(list)
-        for path in glob.glob(pattern, recursive=True):
+        for path in self.file_index.files(folder=self.mask_folder_name, extension="png", nested=True):
             groups[os.path.basename(path)].append(path)
         return {key: sorted(value) for key, value in groups.items()}
 
-    def _read_mask(self, path: str) -> Optional[np.ndarray]:
-        """Read a single-channel mask PNG into a numpy array, or None if unreadable.
-
-        Args:
-            path (str): Path to the mask PNG.
-        Returns:
-            Optional[np.ndarray]: The mask array, or None when it cannot be read.
-        """
-        mask = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-        return mask
-
     @staticmethod
     def _merge(
         mask_arrays: list[np.ndarray],
@@ -107,7 +97,9 @@ class MergeMasks(BaseStep):
         ``report`` and ``first`` both keep the colour written by the earlier mask on an
         overlapping pixel; ``last`` keeps the colour from the later mask; ``priority`` keeps
         the colour appearing earlier in ``priority`` (descending priority). Overlap pixels are
-        counted wherever two or more input masks are simultaneously non-zero.
+        counted wherever two or more input masks are simultaneously non-zero. The masks are
+        stacked into one array and the winning mask of every pixel is picked with a single
+        reduction over the stack (through a 256-entry rank table for ``priority``).
 
         Args:
             mask_arrays (list[np.ndarray]): Single-structure masks for the same image.
@@ -116,37 +108,30 @@ class MergeMasks(BaseStep):
         Returns:
             tuple[np.ndarray, int]: The merged mask and the overlapping pixel count.
         """
-        first = mask_arrays[0]
-        merged = np.zeros_like(first)
-        occupied = np.zeros(first.shape[:2], dtype=bool)
-        overlap = np.zeros(first.shape[:2], dtype=bool)
-
-        priority_rank = {int(color): rank for rank, color in enumerate(priority or [])}
-        # Higher number == better-established colour already placed; default rank for the
-        # "priority" policy keeps unknown colours below any listed colour.
-        worst_rank = len(priority_rank) + 1
-        current_rank = np.full(first.shape[:2], worst_rank, dtype=np.int64)
-
-        for mask in mask_arrays:
-            present = mask > 0
-            overlap |= occupied & present
-
-            if policy == "last":
-                write = present
-            elif policy == "priority":
-                incoming_rank = np.full(first.shape[:2], worst_rank, dtype=np.int64)
-                for color, rank in priority_rank.items():
-                    incoming_rank[mask == color] = rank
-                # Lower rank value == higher priority; write where empty or strictly better.
-                write = present & (~occupied | (incoming_rank < current_rank))
-                current_rank = np.where(write, incoming_rank, current_rank)
-            else:  # "report" and "first" keep the earlier colour
-                write = present & ~occupied
-
-            merged[write] = mask[write]
-            occupied |= present
-
-        return merged, int(np.count_nonzero(overlap))
+        stack = np.stack(mask_arrays)
+        present = stack > 0
+        overlap_count = int(np.count_nonzero(np.count_nonzero(present, axis=0) >= 2))
+
+        if policy == "last":
+            winner = len(mask_arrays) - 1 - np.argmax(present[::-1], axis=0)
+        elif policy == "priority":
+            # A pixel keeps the present colour with the lowest rank (ties: the earlier mask), which
+            # is what writing mask by mask "where empty or strictly better" ends with. Unlisted
+            # colours share the worst rank; absent pixels rank below every present one.
+            priority_rank = {int(color): rank for rank, color in enumerate(priority or [])}
+            worst_rank = len(priority_rank) + 1
+            rank_lut = np.full(256, worst_rank, dtype=np.min_scalar_type(worst_rank + 1))
+            for color, rank in priority_rank.items():
+                if 0 <= color < 256:
+                    rank_lut[color] = rank
+            ranks = rank_lut[stack]
+            ranks[~present] = worst_rank + 1
+            winner = np.argmin(ranks, axis=0)
+        else:  # "report" and "first" keep the earlier colour
+            winner = np.argmax(present, axis=0)
+
+        merged = np.take_along_axis(stack, winner[np.newaxis], axis=0)[0]
+        return merged, overlap_count
 
     def _write_report(self, report: dict) -> None:
         """Write the mask-merge overlaps summary to JSON under the reports dir.
@@ -157,3 +142,26 @@ class MergeMasks(BaseStep):
         report_path = os.path.join(self.reports_dir(), "mask_merge_report.json")
         with open(report_path, "w") as handle:
             json.dump(report, handle, indent=2)
+
+
+# The per-group merge is kept at module level so it can be pickled into spawn-started workers.
+
+
+def _merge_group_task(task: tuple) -> Optional[tuple[bytes, int]]:
+    """Read and merge the masks of one group for :func:`iter_in_parallel`.
+
+    Args:
+        task (tuple): ``(mask_paths, policy, priority)``.
+    Returns:
+        Optional[tuple[bytes, int]]: The merged mask encoded as PNG and the overlapping pixel
+            count, or None when fewer than two of the masks can be read.
+    """
+    mask_paths, policy, priority = task
+    arrays = [array for array in (cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in mask_paths) if array is not None]
+    if len(arrays) < 2:
+        return None
+    merged, overlap_count = MergeMasks._merge(arrays, policy, priority)
+    success, encoded = cv2.imencode(".png", merged)
+    if not success:
+        raise ValueError(f"PNG encoding failed for {mask_paths[0]}")
+    return encoded.tobytes(), overlap_count
@@ -1,10 +1,8 @@
 """Optional, opt-in pixel-spacing normalization for NIfTI volumes (Theme E, Task 16)."""
 
-import glob
 import os
 from typing import Optional
 
-import jsonlines
 import nibabel as nib  # type: ignore[import-untyped]
 import numpy as np
 from scipy.ndimage import zoom  # type: ignore[import-untyped]
@@ -39,10 +37,8 @@ class NormalizeSpacing(BaseStep):
         target_spacing = tuple(float(v) for v in target)
         new_spacings: dict[str, list[float]] = {}
 
-        image_paths = glob.glob(
-            os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.nii.gz"), recursive=True
-        )
-        mask_paths = glob.glob(os.path.join(self.dataset_root, f"**/{self.mask_folder_name}/*.nii.gz"), recursive=True)
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="nii.gz")
+        mask_paths = self.file_index.files(folder=self.mask_folder_name, extension="nii.gz")
         print("Normalizing voxel spacing...")
         for image_path in image_paths:
             new_spacings[image_path] = self._resample(image_path, target_spacing, is_mask=False)
@@ -104,18 +100,15 @@ class NormalizeSpacing(BaseStep):
         Args:
             new_spacings (dict[str, list[float]]): Map of absolute image path -> new spacing.
         """
-        if not os.path.exists(self.json_path) or not new_spacings:
+        if not self.records.exists() or not new_spacings:
             return
         by_relpath = {self.get_path_without_target_path(path): spacing for path, spacing in new_spacings.items()}
-        with jsonlines.open(self.json_path, mode="r") as reader:
-            records = list(reader)
+        records = self.records.read()
         for record in records:
             spacing = self._lookup_spacing(record, by_relpath)
             if spacing is not None and "pixel_spacing_mm" not in record:
                 record["pixel_spacing_mm"] = spacing
-        with jsonlines.open(self.json_path, mode="w") as writer:
-            for record in records:
-                writer.write(record)
+        self.records.write(records)
 
     @staticmethod
     def _lookup_spacing(record: dict, by_relpath: dict[str, list[float]]) -> Optional[list[float]]:
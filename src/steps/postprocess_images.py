@@ -0,0 +1,183 @@
+"""Optional, opt-in fused image post-processing: every Theme E PNG transform in one pass.
+
+``ApplyWindowing``, ``ApplyClahe``, ``StandardizeBitDepth``, ``AutocropBorders`` and
+``ResizeImages`` each read every output PNG, transform it and write it back, so enabling all of
+them costs five decode/encode cycles per image. ``PostprocessImages`` replaces that chain: it
+loads each image (and, for the geometric transforms, its paired mask) once, applies the
+transforms enabled in ``PreprocessingConfig`` in that same order, and writes each file once.
+The output is identical to running the five steps one after another, because each transform is
+the step's own array-level helper and PNG round trips are lossless.
+
+Per-image work (decode, transforms, PNG encode) runs over ``export.num_workers`` processes via
+:func:`utils.parallel.iter_in_parallel`; the encoded files are written by the main process.
+"""
+
+import os
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import cv2  # type: ignore[import-untyped]
+
+from base.step import BaseStep
+from constants import OutputMode
+from utils.parallel import iter_in_parallel
+
+from .apply_clahe import ApplyClahe
+from .apply_windowing import ApplyWindowing
+from .autocrop_borders import AutocropBorders
+from .resize_images import ResizeImages
+from .standardize_bit_depth import StandardizeBitDepth
+
+
+class PostprocessPlan(NamedTuple):
+    """The enabled transforms with their settings (None = disabled), in application order."""
+
+    window: Optional[tuple]  # (center, width) for ApplyWindowing
+    clahe: Optional[tuple]  # (clip_limit, tile_grid_size) for ApplyClahe
+    bit_depth: Optional[int]  # target bit depth for StandardizeBitDepth
+    autocrop_tolerance: Optional[int]  # background tolerance for AutocropBorders
+    resize: Optional[tuple]  # ((height, width), strategy) for ResizeImages
+
+
+class PostprocessResult(NamedTuple):
+    """Encoded outputs of one image pair (None = leave the file as it is)."""
+
+    image_png: Optional[bytes]
+    mask_png: Optional[bytes]
+    converted_from: Optional[int]  # source bit depth when the bit depth was standardized
+
+
+class PostprocessImages(BaseStep):
+    """Apply the enabled Theme E image transforms with a single read and write per image and mask."""
+
+    def transform(self, X: list) -> list:
+        """Post-process every image PNG (and paired mask) in one pass; no-op when nothing is enabled.
+
+        Args:
+            X (list): List of paths to the images.
+
+        Returns:
+            list: The unchanged list of image paths.
+        """
+        plan = self._plan()
+        if plan is None or self.output_mode == OutputMode.VOLUMES_3D:
+            return X
+
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="png")
+        tasks = ((image_path, self._mask_path(image_path), plan) for image_path in image_paths)
+        print("Post-processing images...")
+        results = iter_in_parallel(_postprocess_task, tasks, num_workers=self.export_config.num_workers)
+        for image_path, result in zip(image_paths, results):
+            self._store_result(image_path, result, plan)
+        return X
+
+    def _plan(self) -> Optional[PostprocessPlan]:
+        """Resolve the enabled transforms from ``PreprocessingConfig``, validating them like the steps do.
+
+        Returns:
+            Optional[PostprocessPlan]: The plan, or None when no transform is enabled.
+        """
+        config = self.preprocessing
+        if config.target_bit_depth is not None and config.target_bit_depth not in (8, 16):
+            raise ValueError(f"target_bit_depth must be 8 or 16, got {config.target_bit_depth}.")
+        plan = PostprocessPlan(
+            window=ApplyWindowing(self.ctx)._resolve_window(),
+            clahe=(config.clahe_clip_limit, tuple(config.clahe_tile_grid_size)) if config.clahe_enabled else None,
+            bit_depth=config.target_bit_depth,
+            autocrop_tolerance=config.autocrop_tolerance if config.autocrop_enabled else None,
+            resize=(
+                ((int(config.target_size[0]), int(config.target_size[1])), config.resize_strategy)
+                if config.target_size is not None
+                else None
+            ),
+        )
+        return plan if any(setting is not None for setting in plan) else None
+
+    def _mask_path(self, image_path: str) -> str:
+        """Return the path of the mask paired with an output image."""
+        return image_path.replace(os.sep + self.image_folder_name + os.sep, os.sep + self.mask_folder_name + os.sep)
+
+    def _store_result(self, image_path: str, result: PostprocessResult, plan: PostprocessPlan) -> None:
+        """Write a worker's encoded image and mask.
+
+        Args:
+            image_path (str): Path to the image PNG.
+            result (PostprocessResult): The worker's result for ``image_path``.
+            plan (PostprocessPlan): The applied plan.
+        """
+        if result.converted_from is not None:
+            print(f"Converting {os.path.basename(image_path)} from {result.converted_from}-bit to {plan.bit_depth}-bit")
+        if result.image_png is not None:
+            with open(image_path, "wb") as handle:
+                handle.write(result.image_png)
+        if result.mask_png is not None:
+            with open(self._mask_path(image_path), "wb") as handle:
+                handle.write(result.mask_png)
+
+
+# The per-image work is kept at module level so it can be pickled into spawn-started workers.
+
+
+@lru_cache(maxsize=None)
+def _clahe(clip_limit: float, tile_grid_size: tuple) -> "cv2.CLAHE":
+    """Return a (per-process) cached CLAHE operator."""
+    return cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+
+
+def postprocess_image(image_path: str, mask_path: str, plan: PostprocessPlan) -> PostprocessResult:
+    """Load an image (and its mask when needed) once, apply the plan and encode the changed files.
+
+    Args:
+        image_path (str): Path to the image PNG.
+        mask_path (str): Path to the paired mask PNG (it may not exist).
+        plan (PostprocessPlan): The transforms to apply.
+
+    Returns:
+        PostprocessResult: The encoded PNGs of the files that changed.
+    """
+    image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        return PostprocessResult(None, None, None)
+    changed, converted_from, crop_box = False, None, None
+    if plan.window is not None:
+        image, changed = ApplyWindowing._window(image, *plan.window), True
+    if plan.clahe is not None:
+        image, changed = ApplyClahe._equalize(image, _clahe(*plan.clahe)), True
+    if plan.bit_depth is not None:
+        converted = StandardizeBitDepth._convert(image, plan.bit_depth)
+        if converted is not None:
+            converted_from = 16 if image.dtype.itemsize == 2 else 8
+            image, changed = converted, True
+    if plan.autocrop_tolerance is not None:
+        crop_box = AutocropBorders._content_bbox(image, plan.autocrop_tolerance)
+        if crop_box is not None:
+            top, bottom, left, right = crop_box
+            image, changed = image[top:bottom, left:right], True
+    if plan.resize is not None:
+        target, strategy = plan.resize
+        image, changed = ResizeImages._resize(image, target, strategy, cv2.INTER_LINEAR), True
+
+    mask_png = None
+    if (crop_box is not None or plan.resize is not None) and os.path.exists(mask_path):
+        mask = cv2.imread(mask_path, cv2.IMREAD_UNCHANGED)
+        if mask is not None:
+            if crop_box is not None:
+                top, bottom, left, right = crop_box
+                mask = mask[top:bottom, left:right]
+            if plan.resize is not None:
+                mask = ResizeImages._resize(mask, target, strategy, cv2.INTER_NEAREST)
+            mask_png = _encode(mask)
+    return PostprocessResult(_encode(image) if changed else None, mask_png, converted_from)
+
+
+def _postprocess_task(task: tuple) -> PostprocessResult:
+    """Unpack an ``(image_path, mask_path, plan)`` task for :func:`iter_in_parallel`."""
+    return postprocess_image(*task)
+
+
+def _encode(array: "cv2.typing.MatLike") -> bytes:
+    """Encode an array as PNG bytes (identical to what ``cv2.imwrite`` writes)."""
+    success, encoded = cv2.imencode(".png", array)
+    if not success:
+        raise ValueError("PNG encoding failed")
+    return encoded.tobytes()
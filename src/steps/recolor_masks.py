@@ -1,7 +1,7 @@
 """Recolors masks from default color to the color specified in the config."""
 
-import glob
 import os
+from typing import Iterator, Optional
 
 import cv2
 import nibabel as nib
@@ -14,6 +14,8 @@ from constants import OutputMode
 class RecolorMasks(BaseStep):
     """Recolors masks from default color to the color specified in the config."""
 
+    supports_streaming = True
+
     def transform(self, X: list) -> list:
         """Recolors masks from default color to the color specified in the config.
 
@@ -24,34 +26,89 @@ class RecolorMasks(BaseStep):
         """
         if len(X) == 0:
             raise ValueError("No list of files provided.")
-        # Robust to multiple modalities and lack of masks for some images
-        root_path = os.path.join(self.target_path, f"{self.dataset_uid}_{self.dataset_name}")
-        extension = "nii.gz" if self.output_mode == OutputMode.VOLUMES_3D else "png"
-        mask_paths = glob.glob(os.path.join(root_path, f"**/{self.mask_folder_name}/*.{extension}"), recursive=True)
         print("Recoloring masks...")
-        for mask_path in mask_paths:
-            if os.path.exists(mask_path):
-                if self.output_mode == OutputMode.VOLUMES_3D:
-                    self.recolor_masks_3d(mask_path)
-                else:
-                    self.recolor_masks(mask_path)
+        for mask_path in self._mask_paths():
+            self._recolor(mask_path)
         return X
 
+    def start_stream(self) -> None:
+        """Start tracking which masks were already recolored, so none is remapped twice."""
+        self._recolored: set = set()
+
+    def transform_stream(self, X: Iterator[str]) -> Iterator[str]:
+        """Recolor the mask of each image as it arrives, so later streamed steps see final colors.
+
+        Args:
+            X (Iterator[str]): Paths to the images (source paths or UMIE paths).
+        Returns:
+            Iterator[str]: The same paths.
+        """
+        for img_path in X:
+            mask_path = self._stream_mask_path(img_path)
+            if mask_path is not None and mask_path not in self._recolored and os.path.exists(mask_path):
+                self._recolor(mask_path)
+                self._recolored.add(mask_path)
+            yield img_path
+
+    def finish_stream(self) -> None:
+        """Recolor the masks no streamed image pointed to, matching the stage-at-a-time result."""
+        for mask_path in self._mask_paths():
+            if mask_path not in self._recolored:
+                self._recolor(mask_path)
+
+    def _mask_paths(self) -> list:
+        """List the dataset's output masks (PNG in 2D mode, ``.nii.gz`` in 3D mode)."""
+        # Robust to multiple modalities and lack of masks for some images
+        extension = "nii.gz" if self.output_mode == OutputMode.VOLUMES_3D else "png"
+        return self.file_index.files(folder=self.mask_folder_name, extension=extension)
+
+    def _stream_mask_path(self, img_path: str) -> Optional[str]:
+        """Return the output mask path of a streamed image, or None if it cannot be mapped.
+
+        Args:
+            img_path (str): UMIE path of the image, or its source path when recoloring runs before ``AddUmieIds``.
+        Returns:
+            Optional[str]: Path to the image's output mask.
+        """
+        try:
+            if not img_path.startswith(self.dataset_root):
+                img_path = self.get_umie_img_path(img_path)
+            return self.get_umie_mask_path_from_img_path(img_path)
+        except (KeyError, IndexError, ValueError):
+            return None
+
+    def _recolor(self, mask_path: str) -> None:
+        """Recolor a single output mask in 2D or 3D mode.
+
+        Args:
+            mask_path (str): Path to the mask.
+        """
+        if os.path.exists(mask_path):
+            if self.output_mode == OutputMode.VOLUMES_3D:
+                self.recolor_masks_3d(mask_path)
+            else:
+                self.recolor_masks(mask_path)
+
     def recolor_masks_3d(self, mask_path: str) -> None:
         """Remap voxel values of a full NIfTI mask volume to the configured target colors.
 
-        Reads from the original data and writes into a copy so each source color is remapped
-        exactly once (no need for the 2D +255 guard); affine and header are preserved.
+        Integer volumes with values in 0-255 are remapped in their native dtype through the
+        ``_volume_lut`` lookup table; any other volume takes the float path. Each source color
+        is remapped exactly once (no need for the 2D +255 guard); affine and header are preserved.
 
         Args:
             mask_path (str): Path to the ``.nii.gz`` mask volume.
         """
         nii = nib.load(mask_path)
-        data = nii.get_fdata()  # type: ignore[attr-defined]
-        recolored = data.copy()
-        for mask_color in self.masks.values():
-            recolored[data == mask_color["source_color"]] = mask_color["target_color"]
-        recolored = recolored.astype(np.uint8)
+        data = np.asanyarray(nii.dataobj)  # type: ignore[attr-defined]
+        if data.dtype.kind in "iu" and data.size and data.min() >= 0 and data.max() <= 255:
+            recolored = self._volume_lut()[data]
+        else:
+            data = nii.get_fdata()  # type: ignore[attr-defined]
+            recolored = data.copy()
+            for mask_color in self.masks.values():
+                recolored[data == mask_color["source_color"]] = mask_color["target_color"]
+            recolored = recolored.astype(np.uint8)
         new_header = nii.header.copy()  # type: ignore[attr-defined]
         new_header.set_data_dtype(recolored.dtype)  # type: ignore[attr-defined]  # nibabel stub gap
         out = nib.Nifti1Image(recolored, affine=nii.affine, header=new_header)  # type: ignore[no-untyped-call,attr-defined]
@@ -64,12 +121,37 @@ class RecolorMasks(BaseStep):
             mask_path (str): Path to the mask.
         """
         mask = cv2.imread(mask_path)
-        # changing pixel values
-        # add and then subtract factor of 255 to prevent changing color of the same area more than once
-        mask = mask.astype("uint16")
-        for mask_color in self.masks.values():
-            np.place(mask, mask == mask_color["source_color"], mask_color["target_color"] + 255)
-
-        mask[mask > 255] -= 255  # type: ignore[misc]  # numpy stub false positive on in-place subtract
-        mask = mask.astype("uint8")
-        cv2.imwrite(mask_path, mask)
+        # One table lookup per pixel, whatever the number of configured colors
+        cv2.imwrite(mask_path, cv2.LUT(mask, self._image_lut()))
+
+    def _image_lut(self) -> np.ndarray:
+        """Build (once) the 256-entry uint8 lookup table applied to 2D masks.
+
+        The table is the result of the per-color remapping on every possible 8-bit value: each
+        source color is replaced by its target color + 255, so an already remapped value is not
+        remapped again by a later color, and 255 is subtracted from the values above 255 at the end.
+
+        Returns:
+            np.ndarray: The lookup table.
+        """
+        if getattr(self, "_image_lut_table", None) is None:
+            values = np.arange(256, dtype=np.uint16)
+            for mask_color in self.masks.values():
+                np.place(values, values == mask_color["source_color"], mask_color["target_color"] + 255)
+            values[values > 255] -= 255
+            self._image_lut_table = values.astype(np.uint8)
+        return self._image_lut_table
+
+    def _volume_lut(self) -> np.ndarray:
+        """Build (once) the 256-entry uint8 lookup table applied to 3D masks with values in 0-255.
+
+        Returns:
+            np.ndarray: The lookup table (identity for values that are not a source color).
+        """
+        if getattr(self, "_volume_lut_table", None) is None:
+            values = np.arange(256, dtype=np.float64)
+            table = values.copy()
+            for mask_color in self.masks.values():
+                table[values == mask_color["source_color"]] = mask_color["target_color"]
+            self._volume_lut_table = table.astype(np.uint8)
+        return self._volume_lut_table
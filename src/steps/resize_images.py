@@ -1,6 +1,5 @@
 """Optional, opt-in image resizing keeping the paired mask aligned (Theme E, Task 17)."""
 
-import glob
 import os
 
 import cv2  # type: ignore[import-untyped]
@@ -32,7 +31,7 @@ class ResizeImages(BaseStep):
 
         target = (int(target_size[0]), int(target_size[1]))
         strategy = self.preprocessing.resize_strategy
-        image_paths = glob.glob(os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.png"), recursive=True)
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="png")
         print("Resizing images...")
         for image_path in image_paths:
             image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
@@ -49,7 +48,8 @@ class ResizeImages(BaseStep):
                     cv2.imwrite(mask_path, self._resize(mask, target, strategy, cv2.INTER_NEAREST))
         return X
 
-    def _resize(self, image: np.ndarray, target: tuple, strategy: str, interpolation: int) -> np.ndarray:
+    @classmethod
+    def _resize(cls, image: np.ndarray, target: tuple, strategy: str, interpolation: int) -> np.ndarray:
         """Resize one array to ``target`` (height, width) using the requested strategy.
 
         Args:
@@ -68,16 +68,16 @@ class ResizeImages(BaseStep):
         if strategy == "letterbox":
             # Scale to fit inside the target preserving aspect ratio, then zero-pad.
             scale = min(target_h / image.shape[0], target_w / image.shape[1])
-            resized = self._scale(image, scale, interpolation)
-            return self._fit_canvas(resized, target_h, target_w)
+            resized = cls._scale(image, scale, interpolation)
+            return cls._fit_canvas(resized, target_h, target_w)
         if strategy == "pad":
             # No scaling: center on a zero canvas, center-cropping any axis that overflows.
-            return self._fit_canvas(image, target_h, target_w)
+            return cls._fit_canvas(image, target_h, target_w)
         if strategy == "crop":
             # Scale to cover the target preserving aspect ratio, then center-crop the overflow.
             scale = max(target_h / image.shape[0], target_w / image.shape[1])
-            resized = self._scale(image, scale, interpolation)
-            return self._fit_canvas(resized, target_h, target_w)
+            resized = cls._scale(image, scale, interpolation)
+            return cls._fit_canvas(resized, target_h, target_w)
         raise ValueError(f"Unknown resize strategy '{strategy}'. Choose from pad, crop, letterbox, stretch.")
 
     @staticmethod
@@ -19,6 +19,12 @@ Placement / interaction with ``DeleteOldPreprocessedData``:
     never skips files whose outputs were just deleted). With both steps active, the
     delete-old step always wins and the resume optimisation simply becomes a no-op.
 
+Re-runs after a settings change:
+    Once ``DeleteOldPreprocessedData`` has run there is nothing left to skip. Enable the
+    persistent conversion cache (``ExportConfig.conversion_cache_dir``, see
+    ``base.conversion_cache``) so that sources already converted with the same settings are
+    copied from the cache instead of being decoded again.
+
 Robustness:
     ``get_umie_img_path`` can raise (e.g. a source whose modality id is not in the configured
     modalities). Such sources are treated as not-yet-processed and kept in ``X`` so they flow on
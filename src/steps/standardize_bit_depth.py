@@ -1,7 +1,7 @@
 """Optional, opt-in bit-depth standardization for image PNGs only (Theme E, Task 18)."""
 
-import glob
 import os
+from typing import Optional
 
 import cv2  # type: ignore[import-untyped]
 import numpy as np
@@ -32,7 +32,7 @@ class StandardizeBitDepth(BaseStep):
         if target not in (8, 16):
             raise ValueError(f"target_bit_depth must be 8 or 16, got {target}.")
 
-        image_paths = glob.glob(os.path.join(self.dataset_root, f"**/{self.image_folder_name}/*.png"), recursive=True)
+        image_paths = self.file_index.files(folder=self.image_folder_name, extension="png")
         print(f"Standardizing image bit depth to {target}-bit...")
         for image_path in image_paths:
             self._standardize(image_path, target)
@@ -48,15 +48,29 @@ class StandardizeBitDepth(BaseStep):
         image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
         if image is None:
             return
+        converted = self._convert(image, target)
+        if converted is None:
+            return
+        current = 16 if image.dtype == np.uint16 else 8
+        print(f"Converting {os.path.basename(image_path)} from {current}-bit to {target}-bit")
+        cv2.imwrite(image_path, converted)
+
+    @staticmethod
+    def _convert(image: np.ndarray, target: int) -> Optional[np.ndarray]:
+        """Convert an image array to the target bit depth.
+
+        Args:
+            image (np.ndarray): Image array (uint8 or uint16).
+            target (int): Target bit depth (8 or 16).
+
+        Returns:
+            Optional[np.ndarray]: The converted image, or None when it is already at ``target``.
+        """
         current = 16 if image.dtype == np.uint16 else 8
         if current == target:
-            return
-        converted: np.ndarray
+            return None
         if target == 8:
             # 16->8: integer divide by 256 keeps the high byte; no clipping/overflow possible.
-            converted = (image.astype(np.uint16) // 256).astype(np.uint8)
-        else:
-            # 8->16: multiply by 256 to spread values across the wider range.
-            converted = (image.astype(np.uint16) * 256).astype(np.uint16)
-        print(f"Converting {os.path.basename(image_path)} from {current}-bit to {target}-bit")
-        cv2.imwrite(image_path, converted)
+            return (image.astype(np.uint16) // 256).astype(np.uint8)
+        # 8->16: multiply by 256 to spread values across the wider range.
+        return (image.astype(np.uint16) * 256).astype(np.uint16)
@@ -2,9 +2,6 @@
 
 import os
 
-import cv2
-import jsonlines
-import nibabel as nib
 from tqdm import tqdm
 
 from base.step import BaseStep
@@ -34,19 +31,18 @@ class ValidateData(BaseStep):
         self,
     ) -> None:
         """Validate the dataset output data."""
-        if not os.path.exists(self.json_path):
+        if not self.records.exists():
             raise FileNotFoundError(f"Dataset jsonl file {self.json_path} does not exist")
         print("Validating output data...")
 
-        self._validate_jsonl(self.json_path)
+        self._validate_jsonl()
 
-    def _validate_jsonl(self, json_path: str) -> None:
-        with jsonlines.open(json_path, mode="r") as reader:
-            for obj in tqdm(reader):
-                try:
-                    self._validate_object(obj)
-                except Exception as e:
-                    print(f"Error in image {obj['umie_path']}: {e}")
+    def _validate_jsonl(self) -> None:
+        for obj in tqdm(self.records.read()):
+            try:
+                self._validate_object(obj)
+            except Exception as e:
+                print(f"Error in image {obj['umie_path']}: {e}")
 
     def _validate_object(self, obj: dict) -> None:
         self._validate_string_keys(obj)
@@ -64,14 +60,8 @@ class ValidateData(BaseStep):
                 print(f"{str_key} is not a string or is empty in {obj['umie_path']}")
 
     def _is_readable(self, path: str) -> bool:
-        """Check that an output file is a readable image (.png) or volume (.nii.gz)."""
-        if path.endswith(".nii.gz"):
-            try:
-                nib.load(path).shape  # type: ignore[attr-defined]  # touches the header to validate
-                return True
-            except Exception:
-                return False
-        return cv2.imread(path) is not None
+        """Check that an output file is a readable image (.png) or volume (.nii.gz), from its header."""
+        return self.image_probe.is_readable(path)
 
     def _validate_image(self, obj: dict) -> None:
         umie_path = os.path.join(self.target_path, obj["umie_path"])
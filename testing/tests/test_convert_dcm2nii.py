@@ -5,17 +5,19 @@ import tempfile
 
 import nibabel as nib
 import numpy as np
+import pydicom.pixel_data_handlers.util as ddh
 import pytest
+from pydicom import dcmread
 from pydicom.dataset import FileDataset, FileMetaDataset
 from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
 
-from base.pipeline import PathArgs, PipelineArgs, PipelineContext
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
 from config.dataset_config import DatasetArgs
 from constants import OutputMode
 from src.steps.convert_dcm2nii import ConvertDcm2Nii
 
 
-def _make_ctx(tmp: str, output_mode: OutputMode = OutputMode.VOLUMES_3D) -> PipelineContext:
+def _make_ctx(tmp: str, output_mode: OutputMode = OutputMode.VOLUMES_3D, num_workers: int = 1) -> PipelineContext:
     """Build a minimal PipelineContext (no windowing) for the step."""
     identity, dicom, file_selection, output = PipelineArgs().to_configs()
     return PipelineContext(
@@ -25,10 +27,11 @@ def _make_ctx(tmp: str, output_mode: OutputMode = OutputMode.VOLUMES_3D) -> Pipe
         dicom=dicom,
         file_selection=file_selection,
         output=output,
+        export=ExportConfig(num_workers=num_workers),
     )
 
 
-def _write_slice(path, series_uid, instance_number, z, pixels, row_spacing=2.0, col_spacing=1.0):
+def _write_slice(path, series_uid, instance_number, z, pixels, row_spacing=2.0, col_spacing=1.0, slope=1, intercept=0):
     """Write one axial CT DICOM slice with the given geometry and int16 pixel array."""
     meta = FileMetaDataset()
     meta.MediaStorageSOPClassUID = CTImageStorage
@@ -52,8 +55,8 @@ def _write_slice(path, series_uid, instance_number, z, pixels, row_spacing=2.0,
     ds.BitsStored = 16
     ds.HighBit = 15
     ds.PixelRepresentation = 1  # signed -> int16
-    ds.RescaleSlope = 1
-    ds.RescaleIntercept = 0
+    ds.RescaleSlope = slope
+    ds.RescaleIntercept = intercept
     ds.PixelData = pixels.tobytes()
     ds.is_little_endian = True
     ds.is_implicit_VR = False
@@ -128,3 +131,38 @@ def test_windowing_applied_when_configured():
         assert vol.get_data_dtype() == np.uint8
         data = vol.get_fdata()
         assert data.min() >= 0 and data.max() <= 255
+
+
+def _stacked_reference(paths: list, window: tuple = None) -> np.ndarray:
+    """The rescaled (and windowed) volume computed by stacking every full slice at once."""
+    datasets = sorted((dcmread(path) for path in paths), key=lambda ds: float(ds.ImagePositionPatient[2]))
+    volume = np.stack([ddh.apply_modality_lut(ds.pixel_array, ds).T for ds in datasets], axis=-1)
+    if window is None:
+        return volume
+    volume = np.clip(volume, window[0] - window[1] / 2, window[0] + window[1] / 2)
+    volume = volume - max(np.min(volume), -1000)
+    ratio = np.max(volume) / 255
+    return np.divide(volume, ratio if ratio != 0 else 1).astype(np.uint8)
+
+
+@pytest.mark.parametrize(
+    "slope, intercept, window, stored_dtype, num_workers",
+    [(1, -1024, None, np.int16, 2), (2.5, -1024, None, np.float64, 1), (1, -1024, (40, 400), np.uint8, 1)],
+)
+def test_streamed_reconstruction_matches_stacked_volume(slope, intercept, window, stored_dtype, num_workers):
+    """Parallel, slice-by-slice reconstruction gives the stacked float64 values (int16 + NIfTI scaling if exact)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        uid, paths = generate_uid(), []
+        for inst, z in [(3, 10), (1, 0), (2, 5), (4, 15)]:
+            pixels = np.fromfunction(lambda r, c: 900 + 40 * z + 9 * r - 7 * c, (5, 6), dtype=int)
+            paths.append(os.path.join(tmp, f"slice_{z}.dcm"))
+            _write_slice(paths[-1], uid, inst, z, pixels, slope=slope, intercept=intercept)
+        ctx = _make_ctx(tmp, num_workers=num_workers)
+        if window is not None:
+            ctx.dicom.window_center, ctx.dicom.window_width = window
+
+        out_paths = ConvertDcm2Nii(ctx).transform(paths)
+
+        vol = nib.load(out_paths[0])
+        assert vol.get_data_dtype() == stored_dtype
+        np.testing.assert_array_equal(vol.get_fdata(), _stacked_reference(paths, window))
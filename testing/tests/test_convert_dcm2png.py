@@ -0,0 +1,200 @@
+"""Unit tests for ConvertDcm2Png using small synthetic DICOM slices (no external data)."""
+
+import glob
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+from pydicom import dcmread
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import CTImageStorage, ExplicitVRBigEndian, ExplicitVRLittleEndian, generate_uid
+
+import src.steps.convert_dcm2png as convert_module
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from config.dataset_config import DatasetArgs
+from src.base.conversion_cache import ConversionCache
+from src.steps.convert_dcm2png import (
+    CACHE_NAME,
+    PIXEL_DECODERS,
+    ConvertDcm2Png,
+    convert_dcm,
+    register_pixel_decoder,
+)
+
+
+def _make_ctx(tmp: str, num_workers: int = 1, series_batches: bool = False) -> PipelineContext:
+    """Build a minimal PipelineContext with a fixed window, the given worker count and conversion mode."""
+    identity, dicom, file_selection, output = PipelineArgs(window_center=40, window_width=400).to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(num_workers=num_workers, dicom_series_batches=series_batches),
+    )
+
+
+def _write_slice(path: str, pixels: np.ndarray, truncate_pixel_data: bool = False, big_endian: bool = False) -> None:
+    """Write one CT DICOM slice with an int16 pixel array (optionally with broken pixel data or big endian)."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = CTImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRBigEndian if big_endian else ExplicitVRLittleEndian
+    ds = FileDataset(path, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = CTImageStorage
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    pixels = pixels.astype(">i2" if big_endian else np.int16)
+    ds.Rows, ds.Columns = pixels.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 1
+    ds.RescaleSlope = 1
+    ds.RescaleIntercept = -1024
+    ds.PixelData = pixels.tobytes()[:4] if truncate_pixel_data else pixels.tobytes()
+    ds.is_little_endian = not big_endian
+    ds.is_implicit_VR = False
+    ds.save_as(path)
+
+
+def _write_series(folder: str, count: int) -> list:
+    """Write ``count`` slices with distinct intensity ramps and return their paths."""
+    os.makedirs(folder)
+    paths = []
+    for index in range(count):
+        pixels = np.fromfunction(lambda r, c: 900 + 25 * index + 7 * r + 3 * c, (16, 16), dtype=int)
+        path = os.path.join(folder, f"slice_{index}.dcm")
+        _write_slice(path, pixels)
+        paths.append(path)
+    return paths
+
+
+def test_parallel_output_is_identical_to_serial():
+    """num_workers=1 and num_workers=2 write byte-identical PNGs next to the sources."""
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_dir, parallel_dir = os.path.join(tmp, "serial"), os.path.join(tmp, "parallel")
+        serial_paths = _write_series(serial_dir, 5)
+        shutil.copytree(serial_dir, parallel_dir)
+        parallel_paths = [path.replace(serial_dir, parallel_dir) for path in serial_paths]
+
+        serial_pngs = ConvertDcm2Png(_make_ctx(serial_dir)).transform(serial_paths)
+        parallel_pngs = ConvertDcm2Png(_make_ctx(parallel_dir, num_workers=2)).transform(parallel_paths)
+
+        assert len(serial_pngs) == len(parallel_pngs) == 5
+        for path in serial_paths:
+            png_path = path.replace(".dcm", ".png")
+            with open(png_path, "rb") as left, open(png_path.replace(serial_dir, parallel_dir), "rb") as right:
+                assert left.read() == right.read()
+        image = cv2.imread(serial_paths[0].replace(".dcm", ".png"), cv2.IMREAD_UNCHANGED)
+        assert image.shape == (16, 16) and image.max() <= 255
+
+
+def test_unconvertible_source_is_reported_and_deleted_by_main_process():
+    """A file that fails to decode in a worker is removed and produces no PNG."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_series(os.path.join(tmp, "series"), 2)
+        broken = os.path.join(tmp, "series", "broken.dcm")
+        _write_slice(broken, np.zeros((16, 16)), truncate_pixel_data=True)
+
+        ConvertDcm2Png(_make_ctx(tmp, num_workers=2)).transform(paths + [broken])
+
+        assert not os.path.exists(broken)
+        assert not os.path.exists(broken.replace(".dcm", ".png"))
+        assert all(os.path.exists(path.replace(".dcm", ".png")) for path in paths)
+
+
+def test_big_endian_source_converts_in_process_like_little_endian():
+    """A big endian slice is byteswapped in memory and encodes to the same PNG as its little endian twin."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pixels = np.fromfunction(lambda r, c: 1000 + 40 * r + 20 * c, (16, 16), dtype=int)
+        little, big = os.path.join(tmp, "little.dcm"), os.path.join(tmp, "big.dcm")
+        _write_slice(little, pixels)
+        _write_slice(big, pixels, big_endian=True)
+        assert dcmread(big).is_little_endian is False
+
+        ConvertDcm2Png(_make_ctx(tmp)).transform([little, big])
+
+        assert sorted(os.listdir(tmp)) == ["big.dcm", "big.png", "little.dcm", "little.png"]
+        with open(little.replace(".dcm", ".png"), "rb") as left, open(big.replace(".dcm", ".png"), "rb") as right:
+            assert left.read() == right.read()
+        assert len(np.unique(cv2.imread(big.replace(".dcm", ".png"), cv2.IMREAD_UNCHANGED))) > 1
+
+
+def test_registered_pixel_decoder_is_used_for_its_transfer_syntax():
+    """A decoder registered for a transfer syntax replaces pydicom's handlers for those files only."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pixels = np.fromfunction(lambda r, c: 700 + 11 * r - 5 * c, (16, 16), dtype=int)
+        big, transposed = os.path.join(tmp, "big.dcm"), os.path.join(tmp, "transposed.dcm")
+        _write_slice(big, pixels, big_endian=True)
+        _write_slice(transposed, pixels.T)
+
+        register_pixel_decoder(ExplicitVRBigEndian, lambda ds: ds.pixel_array.T)
+        try:
+            assert convert_dcm(big, -300, 400) == convert_dcm(transposed, -300, 400)
+        finally:
+            del PIXEL_DECODERS[ExplicitVRBigEndian]
+        assert convert_dcm(big, -300, 400) != convert_dcm(transposed, -300, 400)
+
+
+def test_series_batches_match_per_file_conversion():
+    """Stacked float32 conversion of a mixed folder matches per-file conversion within one gray level."""
+    with tempfile.TemporaryDirectory() as tmp:
+        per_file_dir, series_dir = os.path.join(tmp, "per_file"), os.path.join(tmp, "series")
+        paths = _write_series(per_file_dir, 5)
+        _write_slice(os.path.join(per_file_dir, "small.dcm"), np.arange(144).reshape(12, 12) + 950)
+        _write_slice(os.path.join(per_file_dir, "big.dcm"), np.arange(256).reshape(16, 16) + 1000, big_endian=True)
+        _write_slice(os.path.join(per_file_dir, "broken.dcm"), np.zeros((16, 16)), truncate_pixel_data=True)
+        paths += [os.path.join(per_file_dir, name) for name in ("small.dcm", "big.dcm", "broken.dcm")]
+        shutil.copytree(per_file_dir, series_dir)
+
+        ConvertDcm2Png(_make_ctx(per_file_dir)).transform(paths)
+        ConvertDcm2Png(_make_ctx(series_dir, num_workers=2, series_batches=True)).transform(
+            [path.replace(per_file_dir, series_dir) for path in paths]
+        )
+
+        assert sorted(os.listdir(per_file_dir)) == sorted(os.listdir(series_dir))
+        assert "broken.png" not in os.listdir(series_dir)
+        for name in os.listdir(per_file_dir):
+            if name.endswith(".png"):
+                expected = cv2.imread(os.path.join(per_file_dir, name), cv2.IMREAD_UNCHANGED).astype(int)
+                actual = cv2.imread(os.path.join(series_dir, name), cv2.IMREAD_UNCHANGED).astype(int)
+                assert np.abs(actual - expected).max() <= 1
+
+
+def test_conversion_cache_serves_identical_sources_without_decoding(monkeypatch):
+    """Copied sources hit the cache on a re-run; other settings miss; LRU eviction honours the size limit."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        first_dir, second_dir = os.path.join(tmp, "first"), os.path.join(tmp, "second")
+        paths = _write_series(first_dir, 3)
+        shutil.copytree(first_dir, second_dir)
+
+        ctx = _make_ctx(first_dir)
+        ctx.export.conversion_cache_dir = cache_dir
+        ConvertDcm2Png(ctx).transform(paths)
+        assert len(glob.glob(os.path.join(cache_dir, "*", "*"))) == 3
+
+        def fail(*args):
+            raise AssertionError("decoded despite a cache hit")
+
+        monkeypatch.setattr(convert_module, "convert_dcm", fail)
+        ctx = _make_ctx(second_dir)
+        ctx.export.conversion_cache_dir = cache_dir
+        ConvertDcm2Png(ctx).transform([path.replace(first_dir, second_dir) for path in paths])
+        for path in paths:
+            with open(path.replace(".dcm", ".png"), "rb") as left:
+                with open(path.replace(first_dir, second_dir).replace(".dcm", ".png"), "rb") as right:
+                    assert left.read() == right.read()
+        monkeypatch.undo()
+
+        cache = ConversionCache(cache_dir, max_bytes=1)
+        assert cache.key(paths[0], CACHE_NAME, {"window_center": 40}) != cache.key(
+            paths[0], CACHE_NAME, {"window_center": 50}
+        )
+        assert cache.evict() == 3 and not glob.glob(os.path.join(cache_dir, "*", "*"))
@@ -0,0 +1,53 @@
+"""Unit tests for the slice-wise NIfTI reads of ConvertNii2Png using synthetic volumes (no external data)."""
+
+import os
+import tempfile
+
+import cv2
+import nibabel as nib
+import numpy as np
+import pytest
+
+from base.pipeline import PathArgs, PipelineArgs, PipelineContext
+from config.dataset_config import DatasetArgs
+from src.steps.convert_nii2png import ConvertNii2Png
+
+
+def _make_ctx(tmp: str) -> PipelineContext:
+    """Build a minimal PipelineContext rooted at ``tmp`` with an abdominal CT window."""
+    pa = PipelineArgs(zfill=2, window_center=50, window_width=400, segmentation_prefix="segmentation")
+    identity, dicom, file_selection, output = pa.to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+    )
+
+
+@pytest.mark.parametrize("extension", ["nii", "nii.gz"])
+def test_slice_wise_reads_match_full_float_volume(extension: str):
+    """Slices read through the proxy in the stored dtype give the PNGs of the get_fdata volume."""
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(0)
+        raw = rng.integers(-1200, 3000, size=(5, 16, 12), dtype=np.int16)
+        image = nib.Nifti1Image(raw, np.eye(4))
+        image.header.set_slope_inter(0.7, -13.0)
+        path = os.path.join(tmp, f"imaging.{extension}")
+        nib.save(image, path)
+
+        step = ConvertNii2Png(_make_ctx(tmp))
+        expected = []
+        volume = nib.load(path).get_fdata()
+        for idx in range(volume.shape[0]):
+            success, encoded = cv2.imencode(".png", step._apply_window(np.array(volume[idx, :, :])))
+            assert success
+            expected.append(encoded.tobytes())
+
+        new_paths = step.convert_nii2png(path)
+        assert [os.path.basename(p) for p in new_paths] == [f"imaging_{idx:02d}.png" for idx in range(5)]
+        for new_path, expected_bytes in zip(new_paths, expected):
+            with open(new_path, "rb") as handle:
+                assert handle.read() == expected_bytes
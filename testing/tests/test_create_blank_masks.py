@@ -0,0 +1,86 @@
+"""Unit tests for CreateBlankMasks: cached encodings and shared per-resolution masks (no external data)."""
+
+import os
+import tempfile
+
+import cv2
+import jsonlines
+import numpy as np
+
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from config.dataset_config import DatasetArgs
+from src.steps.create_blank_masks import CreateBlankMasks
+
+SHAPES = {"99_0_1_1.png": (6, 8), "99_0_1_2.png": (6, 8), "99_0_1_3.png": (5, 3), "99_0_1_4.png": (6, 8)}
+
+
+def _make_ctx(tmp: str, shared_blank_masks: bool = False) -> PipelineContext:
+    """Build a minimal PipelineContext for the step."""
+    identity, dicom, file_selection, output = PipelineArgs().to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(shared_blank_masks=shared_blank_masks),
+    )
+
+
+def _write_dataset(tmp: str) -> list:
+    """Write images of two resolutions (one already with a mask) and their JSONL; return the image paths."""
+    dataset_dir = os.path.join(tmp, "99_synthetic")
+    os.makedirs(os.path.join(dataset_dir, "CT", "Images"))
+    os.makedirs(os.path.join(dataset_dir, "CT", "Masks"))
+    paths = []
+    with jsonlines.open(os.path.join(dataset_dir, "99_synthetic.jsonl"), mode="w") as writer:
+        for name, shape in SHAPES.items():
+            path = os.path.join(dataset_dir, "CT", "Images", name)
+            cv2.imwrite(path, np.full(shape + (3,), 128, dtype=np.uint8))
+            paths.append(path)
+            writer.write({"umie_path": f"99_synthetic/CT/Images/{name}", "mask_path": ""})
+    cv2.imwrite(os.path.join(dataset_dir, "CT", "Masks", "99_0_1_4.png"), np.ones((6, 8), dtype=np.uint8))
+    return paths
+
+
+def _mask_paths(tmp: str) -> dict:
+    """Map each image name to the mask_path recorded in the JSONL."""
+    with jsonlines.open(os.path.join(tmp, "99_synthetic", "99_synthetic.jsonl")) as reader:
+        return {os.path.basename(obj["umie_path"]): obj["mask_path"] for obj in reader}
+
+
+def test_blank_masks_match_freshly_encoded_zero_masks():
+    """Masks written from the per-resolution cache are byte-identical to encoding a zero mask per image."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_dataset(tmp)
+        CreateBlankMasks(_make_ctx(tmp)).transform(paths)
+
+        assert _mask_paths(tmp) == {
+            "99_0_1_1.png": "99_synthetic/CT/Masks/99_0_1_1.png",
+            "99_0_1_2.png": "99_synthetic/CT/Masks/99_0_1_2.png",
+            "99_0_1_3.png": "99_synthetic/CT/Masks/99_0_1_3.png",
+            "99_0_1_4.png": "",
+        }
+        for name in ("99_0_1_1.png", "99_0_1_2.png", "99_0_1_3.png"):
+            reference = os.path.join(tmp, f"reference_{name}")
+            cv2.imwrite(reference, np.zeros(SHAPES[name], np.uint8))
+            with open(reference, "rb") as expected, open(os.path.join(tmp, "99_synthetic/CT/Masks", name), "rb") as out:
+                assert out.read() == expected.read()
+
+
+def test_shared_blank_masks_point_to_one_mask_per_resolution():
+    """With shared_blank_masks no per-image copies are written; records share a mask per resolution."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_dataset(tmp)
+        CreateBlankMasks(_make_ctx(tmp, shared_blank_masks=True)).transform(paths)
+
+        assert os.listdir(os.path.join(tmp, "99_synthetic", "CT", "Masks")) == ["99_0_1_4.png"]
+        assert _mask_paths(tmp) == {
+            "99_0_1_1.png": "99_synthetic/BlankMasks/6x8.png",
+            "99_0_1_2.png": "99_synthetic/BlankMasks/6x8.png",
+            "99_0_1_3.png": "99_synthetic/BlankMasks/5x3.png",
+            "99_0_1_4.png": "",
+        }
+        shared = cv2.imread(os.path.join(tmp, "99_synthetic", "BlankMasks", "5x3.png"), cv2.IMREAD_UNCHANGED)
+        np.testing.assert_array_equal(shared, np.zeros((5, 3), np.uint8))
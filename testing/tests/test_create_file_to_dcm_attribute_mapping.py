@@ -0,0 +1,81 @@
+"""Unit tests for the header-only CreateFileToDcmAttributeMapping scan using synthetic DICOM files."""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from pydicom import dcmread
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
+
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from config.dataset_config import DatasetArgs
+from src.steps.create_file_to_dcm_attribute_mapping import CreateFileToDcmAttributeMapping, read_dcm_attribute
+
+
+def _make_ctx(tmp: str, attribute: str, num_workers: int = 1) -> PipelineContext:
+    """Build a minimal PipelineContext mapping files to ``attribute``."""
+    identity, dicom, file_selection, output = PipelineArgs(dicom_mapping_attribute=attribute).to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(num_workers=num_workers),
+    )
+
+
+def _write_slice(path: str, index: int) -> None:
+    """Write one CT DICOM slice with pixel data and a few identifying attributes."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = CTImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = FileDataset(path, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = CTImageStorage
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.PatientID = f"patient-{index}"
+    ds.InstanceNumber = index
+    ds.Rows, ds.Columns = 8, 8
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 1
+    ds.PixelData = np.full((8, 8), index, dtype=np.int16).tobytes()
+    ds.is_little_endian = True
+    ds.is_implicit_VR = False
+    ds.save_as(path)
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_mapping_matches_full_reads(num_workers: int):
+    """The header-only scan maps every file like a full dcmread, for any worker count."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"1-{index}.dcm") for index in range(4)]
+        for index, path in enumerate(paths):
+            _write_slice(path, index)
+
+        step = CreateFileToDcmAttributeMapping(_make_ctx(tmp, "SOPInstanceUID", num_workers))
+        assert step.transform(paths + [os.path.join(tmp, "notes.txt")]) == paths + [os.path.join(tmp, "notes.txt")]
+
+        with open(os.path.join(tmp, "file_to_dcm_attribute_mapping.json")) as handle:
+            mapping = json.load(handle)
+        assert mapping == {str(dcmread(path).SOPInstanceUID): path for path in paths}
+
+
+def test_read_dcm_attribute_reads_header_attributes():
+    """Keywords before and after the stop point resolve; a missing attribute raises like getattr."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "1-3.dcm")
+        _write_slice(path, 3)
+        assert read_dcm_attribute(path, "PatientID") == "patient-3"
+        assert read_dcm_attribute(path, "InstanceNumber") == 3
+        assert read_dcm_attribute(path, "Columns") == 8
+        with pytest.raises(AttributeError):
+            read_dcm_attribute(path, "StudyDescription")
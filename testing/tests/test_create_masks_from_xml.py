@@ -0,0 +1,98 @@
+"""Unit tests for the batched LIDC-IDRI XML mask rendering using a synthetic XML file (no external data)."""
+
+import json
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from base.pipeline import PathArgs
+from src.pipelines.lidc_idri import LidcIdriPipeline
+from src.steps.create_masks_from_xml import CreateMasksFromXml
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<LidcReadMessage xmlns="http://www.nih.gov" uid="1">
+  <readingSession>
+    <unblindedReadNodule>
+      <noduleID>1</noduleID>
+      <roi>
+        <imageSOP_UID>1.2.3.1</imageSOP_UID>
+        <inclusion>TRUE</inclusion>
+        <edgeMap><xCoord>2</xCoord><yCoord>2</yCoord></edgeMap>
+        <edgeMap><xCoord>12</xCoord><yCoord>2</yCoord></edgeMap>
+        <edgeMap><xCoord>12</xCoord><yCoord>12</yCoord></edgeMap>
+      </roi>
+      <roi>
+        <imageSOP_UID>1.2.3.1</imageSOP_UID>
+        <inclusion>FALSE</inclusion>
+        <edgeMap><xCoord>8</xCoord><yCoord>3</yCoord></edgeMap>
+        <edgeMap><xCoord>11</xCoord><yCoord>3</yCoord></edgeMap>
+        <edgeMap><xCoord>11</xCoord><yCoord>6</yCoord></edgeMap>
+      </roi>
+      <roi>
+        <imageSOP_UID>9.9.9</imageSOP_UID>
+        <inclusion>TRUE</inclusion>
+        <edgeMap><xCoord>0</xCoord><yCoord>0</yCoord></edgeMap>
+      </roi>
+    </unblindedReadNodule>
+    <nonNodule>
+      <roi>
+        <imageSOP_UID>1.2.3.2</imageSOP_UID>
+        <locus><xCoord>1</xCoord><yCoord>10</yCoord></locus>
+        <locus><xCoord>6</xCoord><yCoord>14</yCoord></locus>
+        <locus><xCoord>1</xCoord><yCoord>14</yCoord></locus>
+      </roi>
+    </nonNodule>
+    <unblindedReadNodule>
+      <roi>
+        <imageSOP_UID>1.2.3.2</imageSOP_UID>
+        <inclusion>TRUE</inclusion>
+        <edgeMap><xCoord>4</xCoord><yCoord>12</yCoord></edgeMap>
+        <edgeMap><xCoord>14</xCoord><yCoord>12</yCoord></edgeMap>
+        <edgeMap><xCoord>14</xCoord><yCoord>15</yCoord></edgeMap>
+      </roi>
+    </unblindedReadNodule>
+  </readingSession>
+</LidcReadMessage>
+"""
+
+
+def test_xml_rois_are_drawn_in_order_and_each_mask_written_once():
+    """Lesions, then nodules (with exclusions) are rasterized like the per-ROI draw, one write per mask."""
+    with tempfile.TemporaryDirectory() as tmp:
+        series = os.path.join(tmp, "LIDC-IDRI-0001", "study", "series")
+        os.makedirs(series)
+        with open(os.path.join(series, "069.xml"), "w") as handle:
+            handle.write(XML)
+        dcm_paths = {"1.2.3.1": os.path.join(series, "1-001.dcm"), "1.2.3.2": os.path.join(series, "1-002.dcm")}
+        with open(os.path.join(tmp, "file_to_dcm_attribute_mapping.json"), "w") as handle:
+            json.dump(dcm_paths, handle)
+
+        pipeline = LidcIdriPipeline(path_args=PathArgs(source_path=tmp, target_path=tmp, masks_path=tmp))
+        step = CreateMasksFromXml(pipeline.ctx)
+        mask_paths = {uid: step.get_umie_mask_path(path) for uid, path in dcm_paths.items()}
+        for mask_path in mask_paths.values():
+            os.makedirs(os.path.dirname(mask_path), exist_ok=True)
+            cv2.imwrite(mask_path, np.zeros((16, 16), dtype=np.uint8))
+
+        writes = []
+        original_imwrite = cv2.imwrite
+        cv2.imwrite = lambda path, image: writes.append(path) or original_imwrite(path, image)
+        try:
+            assert step.transform(["x"]) == ["x"]
+        finally:
+            cv2.imwrite = original_imwrite
+
+        nodule = step.masks["Nodule"]["target_color"]
+        lesion = step.masks["Lesion"]["target_color"]
+        first = np.zeros((16, 16), dtype=np.uint8)
+        cv2.fillPoly(first, [np.array([[2, 2], [12, 2], [12, 12]])], nodule)
+        cv2.fillPoly(first, [np.array([[8, 3], [11, 3], [11, 6]])], 0)
+        second = np.zeros((16, 16), dtype=np.uint8)
+        cv2.fillPoly(second, [np.array([[1, 10], [6, 14], [1, 14]])], lesion)
+        cv2.fillPoly(second, [np.array([[4, 12], [14, 12], [14, 15]])], nodule)
+
+        assert sorted(writes) == sorted(mask_paths.values())
+        assert np.array_equal(cv2.imread(mask_paths["1.2.3.1"], cv2.IMREAD_UNCHANGED), first)
+        assert np.array_equal(cv2.imread(mask_paths["1.2.3.2"], cv2.IMREAD_UNCHANGED), second)
@@ -174,3 +174,72 @@ def test_cross_dataset_reference_hashes():
         report = json.load(open(os.path.join(tmp, "99_synthetic", "reports", "duplicates_report.json")))
         all_members = {member for cluster in report["clusters"] for member in cluster["members"]}
         assert "other/00_0_001_x.png" in all_members
+
+
+def _reference_dhash(image: np.ndarray, hash_size: int) -> int:
+    """Bit-by-bit dHash, as originally implemented."""
+    resized = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    value = 0
+    for bit in (resized[:, 1:] > resized[:, :-1]).flatten():
+        value = (value << 1) | int(bool(bit))
+    return value
+
+
+def _reference_clusters(combined: dict, own_keys: set, threshold: int) -> list:
+    """All-pairs clustering (connected components of distance <= threshold), as originally implemented."""
+    keys = list(combined)
+    component = {key: {key} for key in keys}
+    for i, left in enumerate(keys):
+        for right in keys[i + 1 :]:
+            if (
+                bin(combined[left] ^ combined[right]).count("1") <= threshold
+                and component[left] is not component[right]
+            ):
+                merged = component[left] | component[right]
+                for key in merged:
+                    component[key] = merged
+    clusters = []
+    for members in {id(group): group for group in component.values()}.values():
+        ordered = sorted(members)
+        if len(ordered) < 2 or not own_keys & members:
+            continue
+        max_distance = max(bin(combined[a] ^ combined[b]).count("1") for a in ordered for b in ordered)
+        representative = next((member for member in ordered if member in own_keys), ordered[0])
+        clusters.append({"members": ordered, "representative": representative, "max_distance": max_distance})
+    return sorted(clusters, key=lambda cluster: cluster["representative"])
+
+
+def test_vectorized_dhash_matches_bit_loop():
+    """The packed dHash equals the bit-by-bit hash, including sizes that do not fill whole bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_ctx(tmp)
+        for hash_size in (5, 8, 16):
+            ctx.quality.duplicate_hash_size = hash_size
+            for seed in range(3):
+                image = _gradient(seed)
+                assert DetectDuplicates(ctx)._dhash(image) == _reference_dhash(image, hash_size)
+
+
+def test_indexed_search_matches_all_pairs_clustering():
+    """Multi-index clustering reproduces the all-pairs clusters on planted near-duplicate chains."""
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_ctx(tmp)
+        # 64-bit hashes split into whole words and into bit chunks, and 256-bit (multi-word) hashes.
+        for hash_size, threshold in ((8, 0), (8, 3), (8, 5), (8, 9), (16, 2), (16, 6)):
+            ctx.quality.duplicate_hash_size, ctx.quality.duplicate_threshold = hash_size, threshold
+            n_bits = hash_size**2
+            hashes, reference, values = {}, {}, []
+            for index in range(150):
+                value = int.from_bytes(rng.bytes(n_bits // 8), "big")
+                if index % 3:
+                    # Flip a few bits of an earlier hash to chain near-duplicates together.
+                    value = values[int(rng.integers(0, len(values)))]
+                    for bit in rng.choice(n_bits, size=int(rng.integers(0, 8)), replace=False):
+                        value ^= 1 << int(bit)
+                values.append(value)
+                target = reference if index % 7 == 0 else hashes
+                target[f"99_synthetic/CT/Images/{index:04d}.png"] = value
+            expected = _reference_clusters({**reference, **hashes}, set(hashes), threshold)
+            assert expected
+            assert DetectDuplicates(ctx)._cluster(hashes, reference) == expected
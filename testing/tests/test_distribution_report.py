@@ -3,7 +3,9 @@
 import os
 import tempfile
 
+import cv2
 import jsonlines
+import numpy as np
 
 from utils.distribution_report import generate_distribution_report
 
@@ -91,3 +93,29 @@ def test_reports_written_and_empty_dir_is_safe():
         assert stats["num_datasets"] == 0
         assert stats["total_records"] == 0
         assert stats["global"]["label_counts"] == {}
+
+
+def test_mask_sizes_per_record_from_stats_index():
+    """Mask sizes count every record's readable mask, served by the persistent mask-stats index."""
+    with tempfile.TemporaryDirectory() as tmp:
+        masks_dir = os.path.join(tmp, "00_alpha", "Masks")
+        os.makedirs(masks_dir)
+        for name, pixels in (("a.png", 4), ("b.png", 10)):
+            mask = np.zeros((5, 5), np.uint8)
+            mask.flat[:pixels] = 1
+            cv2.imwrite(os.path.join(masks_dir, name), mask)
+        records = [_record(str(i), "CT", []) for i in range(4)]
+        for record, mask_path in zip(records, ["a.png", "b.png", "b.png", "missing.png"]):
+            record["mask_path"] = f"00_alpha/Masks/{mask_path}"
+        _write_dataset(tmp, "00", "alpha", records)
+
+        first = generate_distribution_report(tmp)
+        assert first["per_dataset"]["00_alpha"]["mask_size_distribution"] == {
+            "count": 3,
+            "min": 4,
+            "max": 10,
+            "mean": 8.0,
+            "median": 10.0,
+        }
+        assert os.path.exists(os.path.join(tmp, "mask_stats.sqlite"))
+        assert generate_distribution_report(tmp) == first
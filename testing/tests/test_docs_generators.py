@@ -7,7 +7,7 @@ import tempfile
 import jsonlines
 
 from utils.datasheet import all_dataset_args, generate_datasheet, write_datasheet
-from utils.subset import build_manifest, query_subset, write_manifest
+from utils.subset import SubsetIndex, build_manifest, load_records, query_subset, write_manifest
 
 
 # --- Task 43: datasheet generation --------------------------------------------------------------
@@ -119,3 +119,63 @@ def test_manifest_written_to_disk():
         write_manifest(query_subset(_corpus(), modality="CT"), out)
         loaded = json.load(open(out))
         assert loaded["num_records"] == 2
+
+
+def _write_corpus(tmp: str) -> list[str]:
+    """Split the synthetic corpus over two JSONL files and return their paths."""
+    corpus = _corpus()
+    paths = []
+    for name, records in (("kits23.jsonl", corpus[:2]), ("chest_xray14.jsonl", corpus[2:])):
+        path = os.path.join(tmp, name)
+        with jsonlines.open(path, mode="w") as writer:
+            writer.write_all(records)
+        paths.append(path)
+    return paths
+
+
+def test_index_matches_in_memory_query():
+    """SubsetIndex answers every filter exactly like query_subset over the loaded records."""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SubsetIndex(os.path.join(tmp, "index.sqlite"))
+        assert index.update(_write_corpus(tmp)) == 2
+        filters = [
+            {},
+            {"modality": "CT"},
+            {"label": "Neoplasm"},
+            {"label": "Neoplasm", "include_label_descendants": False},
+            {"label": "Pneumonia", "modality": "Xray"},
+            {"license": "CC-BY-NC-SA-4.0"},
+            {"label": "Unknown"},
+        ]
+        for kwargs in filters:
+            assert index.query(**kwargs) == query_subset(_corpus(), **kwargs)
+
+
+def test_index_updates_incrementally():
+    """Only changed JSONLs are re-read; rewritten and removed files replace their records."""
+    with tempfile.TemporaryDirectory() as tmp:
+        kits, xray = _write_corpus(tmp)
+        index = SubsetIndex(os.path.join(tmp, "index.sqlite"))
+        index.update([kits, xray])
+        assert index.update([kits, xray]) == 0
+
+        # Re-indexing the first file keeps corpus order (file order, then line order).
+        with jsonlines.open(kits, mode="w") as writer:
+            writer.write_all([{**record, "umie_path": record["umie_path"] + "2"} for record in _corpus()[:2]])
+        os.utime(kits, ns=(1, 1))
+        assert index.update([kits, xray]) == 1
+        expected = query_subset(load_records([kits, xray]))
+        assert [r["umie_path"] for r in expected][0].endswith("a.png2")
+        assert index.query() == expected
+        assert index.query(modality="CT") == query_subset(load_records([kits, xray]), modality="CT")
+        index.update([xray, kits])
+        assert index.query() == query_subset(load_records([xray, kits]))
+
+        with jsonlines.open(xray, mode="w") as writer:
+            writer.write({"umie_path": "d.png", "dataset_name": "chest_xray14", "modality_name": "Xray"})
+        os.utime(xray, ns=(1, 1))
+        assert index.update([kits, xray]) == 1
+        assert [r["umie_path"] for r in index.query(modality="Xray")] == ["d.png"]
+
+        index.update([xray])
+        assert index.query(modality="CT") == []
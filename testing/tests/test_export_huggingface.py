@@ -6,12 +6,15 @@ import tempfile
 
 import jsonlines
 import numpy as np
+import pytest
 from PIL import Image as PILImage
 
 from base.pipeline import PathArgs, PipelineArgs, PipelineContext
 from config.dataset_config import DatasetArgs
 from config.provenance import get_provenance
 from datasets import DatasetDict, load_from_disk  # type: ignore[attr-defined]
+from datasets import Image as ImageFeature  # type: ignore[attr-defined]
+from src.steps import export_huggingface as export_module
 from src.steps.export_huggingface import ExportHuggingFace
 
 DATASET_NAME = "kits23"
@@ -137,3 +140,52 @@ def test_export_defaults_path_and_single_split():
         assert isinstance(loaded, DatasetDict)
         assert set(loaded.keys()) == {"train"}
         assert loaded["train"].num_rows == len(records)
+
+
+def _split_rows(export_dir: str) -> dict:
+    """Load an export and return its rows per split, with the raw embedded image / mask bytes."""
+    loaded = load_from_disk(export_dir)
+    rows = {}
+    for split, dataset in loaded.items():
+        dataset = dataset.cast_column("image", ImageFeature(decode=False)).cast_column(
+            "mask", ImageFeature(decode=False)
+        )
+        rows[split] = [{**row, "image": row["image"]["bytes"], "mask": row["mask"]["bytes"]} for row in dataset]
+    return rows
+
+
+def test_sharded_export_resumes_after_failure(monkeypatch):
+    """An interrupted sharded export resumes from its finished shards and equals a one-shard export."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _build_tiny_dataset(tmp)
+        ctx = _make_ctx(tmp)
+        ctx.export.hf_export_path = os.path.join(tmp, "single")
+        ctx.export.hf_shard_size = 100
+        ExportHuggingFace(ctx).transform([])
+        expected = _split_rows(ctx.export.hf_export_path)
+        assert expected["train"][0]["image"]  # image bytes are embedded, not just paths
+
+        written = []
+        write_shard = export_module._write_shard_task
+
+        def fail_on_second_shard(task):
+            if len(written) == 1:
+                raise RuntimeError("interrupted")
+            written.append(task[2])
+            return write_shard(task)
+
+        ctx.export.hf_export_path = os.path.join(tmp, "sharded")
+        ctx.export.hf_shard_size = 1
+        monkeypatch.setattr(export_module, "_write_shard_task", fail_on_second_shard)
+        with pytest.raises(RuntimeError):
+            ExportHuggingFace(ctx).transform([])
+        assert written == [os.path.join(tmp, "sharded.shards", "train", "00000")]
+
+        written.clear()
+        monkeypatch.setattr(
+            export_module, "_write_shard_task", lambda task: written.append(task[2]) or write_shard(task)
+        )
+        ExportHuggingFace(ctx).transform([])
+        assert len(written) == 3  # train/00001, val/00000, test/00000
+        assert not os.path.exists(os.path.join(tmp, "sharded.shards"))
+        assert _split_rows(ctx.export.hf_export_path) == expected
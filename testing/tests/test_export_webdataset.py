@@ -0,0 +1,105 @@
+"""Unit tests for ExportWebDataset: split-aware, size-bounded tar shards + index (no external data)."""
+
+import json
+import os
+import tarfile
+import tempfile
+
+import cv2
+import jsonlines
+import numpy as np
+
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from config.dataset_config import DatasetArgs
+from src.steps.export_webdataset import ExportWebDataset
+
+DATASET_DIR = "99_synthetic"
+SPLITS = ["train", "train", "train", "val", "test"]
+
+
+def _make_ctx(tmp: str, **export) -> PipelineContext:
+    """Build a minimal PipelineContext for the step."""
+    identity, dicom, file_selection, output = PipelineArgs().to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(**export),
+    )
+
+
+def _build_dataset(tmp: str) -> list:
+    """Write PNG images (masks for every other one) and a split-aware JSONL; return the records."""
+    os.makedirs(os.path.join(tmp, DATASET_DIR, "CT", "Images"))
+    os.makedirs(os.path.join(tmp, DATASET_DIR, "CT", "Masks"))
+    rng = np.random.default_rng(0)
+    records = []
+    for index, split in enumerate(SPLITS):
+        umie_id = f"99_0_{index:03d}_x.png"
+        umie_path = f"{DATASET_DIR}/CT/Images/{umie_id}"
+        cv2.imwrite(os.path.join(tmp, umie_path), rng.integers(0, 255, (16, 16), dtype=np.uint8))
+        mask_path = ""
+        if index % 2 == 0:
+            mask_path = f"{DATASET_DIR}/CT/Masks/{umie_id}"
+            cv2.imwrite(os.path.join(tmp, mask_path), np.eye(16, dtype=np.uint8))
+        records.append(
+            {"umie_path": umie_path, "umie_id": umie_id, "mask_path": mask_path, "labels": [], "split": split}
+        )
+    with jsonlines.open(os.path.join(tmp, DATASET_DIR, f"{DATASET_DIR}.jsonl"), mode="w") as writer:
+        writer.write_all(records)
+    return records
+
+
+def _read_shards(export_dir: str) -> dict:
+    """Map every tar member name to its content, per shard file."""
+    shards = {}
+    for name in sorted(os.listdir(export_dir)):
+        if name.endswith(".tar"):
+            with tarfile.open(os.path.join(export_dir, name)) as tar:
+                shards[name] = {member.name: tar.extractfile(member).read() for member in tar.getmembers()}
+    return shards
+
+
+def test_samples_round_trip_into_split_shards_and_index():
+    """Each sample holds the original PNG bytes, mask and record; shards respect the sample bound."""
+    with tempfile.TemporaryDirectory() as tmp:
+        records = _build_dataset(tmp)
+        ExportWebDataset(_make_ctx(tmp, wds_shard_max_samples=2)).transform([])
+
+        export_dir = os.path.join(tmp, DATASET_DIR, "webdataset")
+        shards = _read_shards(export_dir)
+        assert sorted(shards) == ["test-000000.tar", "train-000000.tar", "train-000001.tar", "val-000000.tar"]
+        assert sorted(shards["train-000001.tar"]) == ["99_0_002_x.json", "99_0_002_x.mask.png", "99_0_002_x.png"]
+
+        members = {name: data for shard in shards.values() for name, data in shard.items()}
+        for record in records:
+            key = record["umie_id"][:-4]
+            with open(os.path.join(tmp, record["umie_path"]), "rb") as image:
+                assert members[f"{key}.png"] == image.read()
+            assert json.loads(members[f"{key}.json"]) == record
+            assert (f"{key}.mask.png" in members) == bool(record["mask_path"])
+
+        with open(os.path.join(export_dir, "index.json")) as handle:
+            index = json.load(handle)
+        assert index["num_samples"] == len(records)
+        assert list(index["splits"]) == ["train", "val", "test"]
+        assert index["splits"]["train"]["pattern"] == "train-{000000..000001}.tar"
+        assert [shard["num_samples"] for shard in index["splits"]["train"]["shards"]] == [2, 1]
+
+
+def test_size_bound_and_parallel_workers():
+    """A small size bound gives one sample per shard; workers write the same shards as one process."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _build_dataset(tmp)
+        serial_dir, parallel_dir = os.path.join(tmp, "serial"), os.path.join(tmp, "parallel")
+        ExportWebDataset(_make_ctx(tmp, wds_export_path=serial_dir, wds_shard_max_mb=0.001)).transform([])
+        ExportWebDataset(_make_ctx(tmp, wds_export_path=parallel_dir, wds_shard_max_mb=0.001, num_workers=2)).transform(
+            []
+        )
+
+        serial = _read_shards(serial_dir)
+        assert len(serial) == len(SPLITS)
+        assert _read_shards(parallel_dir) == serial
@@ -0,0 +1,66 @@
+"""Unit tests for the cached output-tree file index."""
+
+import glob
+import os
+import tempfile
+
+from base.file_index import FileIndex
+
+
+def _touch(path: str) -> None:
+    """Create an empty file, including its parent folders."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+def _make_tree(root: str) -> None:
+    """Write a small two-modality output tree with nested masks and hidden files."""
+    for name in ("CT/Images/a.png", "CT/Images/b.png", "CT/Images/c.nii.gz", "MRI/Images/d.png"):
+        _touch(os.path.join(root, name))
+    for name in ("CT/Masks/a.png", "CT/Masks/kidney/b.png", "CT/Images/.hidden.png", ".cache/Images/e.png"):
+        _touch(os.path.join(root, name))
+
+
+def test_queries_match_recursive_glob():
+    """Folder / extension / nested queries return the same files as the equivalent recursive glob."""
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        index = FileIndex(root)
+
+        for folder, extension, pattern in (
+            ("Images", "png", "**/Images/*.png"),
+            ("Images", "nii.gz", "**/Images/*.nii.gz"),
+            ("Masks", "png", "**/Masks/*.png"),
+        ):
+            expected = sorted(glob.glob(os.path.join(root, pattern), recursive=True))
+            assert index.files(folder=folder, extension=extension) == expected
+        nested = sorted(glob.glob(os.path.join(root, "**/Masks/**/*.png"), recursive=True))
+        assert index.files(folder="Masks", extension="png", nested=True) == nested
+        assert index.files(folder="Images", extension="png", modality="MRI") == [os.path.join(root, "MRI/Images/d.png")]
+
+
+def test_changed_directories_are_relisted_and_unchanged_ones_are_not():
+    """Created, renamed and deleted files show up; an untouched folder is never listed twice."""
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        # Backdate the folders so the first listing is not within the racy window of their creation.
+        for directory, _, _ in os.walk(root):
+            os.utime(directory, (0, 0))
+        index = FileIndex(root)
+        index.files()
+
+        listed = []
+        original_list = index._list
+        index._list = lambda directory, mtime_ns: listed.append(directory) or original_list(directory, mtime_ns)
+
+        os.rename(os.path.join(root, "CT/Images/a.png"), os.path.join(root, "CT/Images/z.png"))
+        os.remove(os.path.join(root, "CT/Images/b.png"))
+        _touch(os.path.join(root, "PET/Images/f.png"))
+
+        assert index.files(folder="Images", extension="png") == [
+            os.path.join(root, "CT/Images/z.png"),
+            os.path.join(root, "MRI/Images/d.png"),
+            os.path.join(root, "PET/Images/f.png"),
+        ]
+        assert os.path.join(root, "MRI/Images") not in listed
+        assert os.path.join(root, "CT/Images") in listed
@@ -0,0 +1,56 @@
+"""Unit tests for the Hub rows built by utils/huggingface_cli.py."""
+
+import json
+import os
+import tempfile
+
+from datasets import Dataset, Sequence, Value  # type: ignore[attr-defined]
+
+from utils.huggingface_cli import iter_hub_rows, scan_hub_features
+
+
+def _record(index: int, labelled: bool) -> dict:
+    """Build a UMIE JSONL record; unlabelled ones carry ``source_labels: []`` as AddUmieIds writes it."""
+    record = {
+        "umie_path": f"99_kits23/CT/Images/99_0_{index:04d}.png",
+        "umie_id": f"99_0_{index:04d}.png",
+        "dataset_name": "kits23",
+        "dataset_uid": "99",
+        "modality_name": "CT",
+        "study_id": index,
+        "labels": [{"neoplasm": 1}] if labelled else [],
+        "source_labels": ["tumor"] if labelled else [],
+    }
+    if index == 1400:
+        record["duplicate_group_id"] = 3
+    return record
+
+
+def test_from_generator_types_columns_from_the_whole_jsonl():
+    """Labels and optional keys first seen after the first 1000-row writer batch still fit the schema."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_file = os.path.join(tmp, "99_kits23.jsonl")
+        with open(dataset_file, mode="w", encoding="utf-8") as handle:
+            for index in range(1500):
+                handle.write(json.dumps(_record(index, labelled=index >= 1200)) + "\n")
+
+        features = scan_hub_features(dataset_file, has_masks=False)
+        dataset = Dataset.from_generator(
+            iter_hub_rows,
+            features=features,
+            gen_kwargs={"dataset_file": dataset_file, "data_dir": tmp, "has_masks": False, "features": features},
+            cache_dir=os.path.join(tmp, "cache"),
+        )
+
+        assert dataset.num_rows == 1500
+        assert dataset.features["source_labels"] == Sequence(Value("string"))
+        assert dataset.features["duplicate_group_id"] == Value("int64")
+        assert dataset.features["study_id"] == Value("string")
+        rows = dataset.remove_columns("image")  # the images are not on disk; don't decode them
+        assert rows[0]["source_labels"] == []
+        assert rows[1200]["source_labels"] == ["tumor"]
+        assert rows[1400]["duplicate_group_id"] == 3
+        assert rows[0]["duplicate_group_id"] is None
+        assert rows[1200]["study_id"] == "1200"
+        assert json.loads(json.loads(rows[1200]["labels"])) == {"neoplasm": 1}
+        assert rows[0]["mask"] is None
@@ -0,0 +1,77 @@
+"""Unit tests for the header-only ImageProbe using synthetic images (no external data)."""
+
+import os
+import tempfile
+
+import cv2
+import nibabel as nib
+import numpy as np
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
+
+from src.base.image_probe import ImageProbe
+
+
+def _write_dicom(path: str, rows: int, columns: int) -> None:
+    """Write a minimal CT DICOM file with the given matrix size."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = CTImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = FileDataset(path, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.Rows, ds.Columns = rows, columns
+    ds.BitsAllocated = 16
+    ds.PixelData = np.zeros((rows, columns), dtype=np.int16).tobytes()
+    ds.is_little_endian = True
+    ds.is_implicit_VR = False
+    ds.save_as(path)
+
+
+def test_shapes_match_decoded_images():
+    """PNG, JPEG, NIfTI and DICOM dimensions equal those of the decoded data."""
+    with tempfile.TemporaryDirectory() as tmp:
+        images = {
+            "gray.png": np.zeros((7, 11), dtype=np.uint8),
+            "color.png": np.zeros((5, 9, 3), dtype=np.uint8),
+            "deep.png": np.zeros((6, 4), dtype=np.uint16),
+            "photo.jpg": np.zeros((8, 3, 3), dtype=np.uint8),
+        }
+        probe = ImageProbe()
+        for name, image in images.items():
+            path = os.path.join(tmp, name)
+            cv2.imwrite(path, image)
+            assert probe.shape(path) == cv2.imread(path).shape[:2]
+
+        volume = os.path.join(tmp, "volume.nii.gz")
+        nib.save(nib.Nifti1Image(np.zeros((3, 4, 5), dtype=np.uint8), np.eye(4)), volume)
+        assert probe.shape(volume) == (3, 4, 5)
+
+        dicom = os.path.join(tmp, "slice.dcm")
+        _write_dicom(dicom, 12, 10)
+        assert probe.shape(dicom) == (12, 10)
+
+
+def test_unreadable_files_and_rewrites():
+    """Missing, truncated and corrupt files are unreadable; a rewritten file is probed again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        probe = ImageProbe()
+        path = os.path.join(tmp, "image.png")
+        cv2.imwrite(path, np.zeros((4, 4), dtype=np.uint8))
+        assert probe.shape(path) == (4, 4)
+
+        cv2.imwrite(path, np.zeros((20, 30), dtype=np.uint8))
+        os.utime(path, ns=(1, 1))  # a different mtime, whatever the filesystem timestamp resolution
+        assert probe.shape(path) == (20, 30)
+
+        with open(path, "rb") as handle:
+            content = handle.read()
+        truncated = os.path.join(tmp, "truncated.png")
+        with open(truncated, "wb") as handle:
+            handle.write(content[:30])
+        corrupt = os.path.join(tmp, "corrupt.nii.gz")
+        with open(corrupt, "wb") as handle:
+            handle.write(b"not a volume")
+
+        assert not probe.is_readable(truncated)
+        assert not probe.is_readable(corrupt)
+        assert not probe.is_readable(os.path.join(tmp, "missing.png"))
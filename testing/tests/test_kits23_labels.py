@@ -0,0 +1,58 @@
+"""Unit tests for the KITS23 label extractor's slice-value index using a synthetic volume (no external data)."""
+
+import json
+import os
+import tempfile
+
+import nibabel as nib
+import numpy as np
+
+from base.pipeline import PathArgs, PipelineContext
+from config.dataset_config import kits23
+from src.pipelines.kits23 import KITS23Pipeline, LabelExtractor
+from src.steps.convert_nii2png import ConvertNii2Png
+
+
+def _write_case(root: str) -> str:
+    """Write a 4-slice segmentation volume: tumor on slice 1, cyst on slice 2, kidney only on slice 3."""
+    case_dir = os.path.join(root, "case_00007")
+    os.makedirs(case_dir)
+    segmentation = np.zeros((4, 8, 8), dtype=np.uint8)
+    segmentation[1, 2:4, 2:4] = 2
+    segmentation[2, 5:7, 1:3] = 3
+    segmentation[1:4, 0, :] = 1
+    path = os.path.join(case_dir, "segmentation.nii.gz")
+    nib.save(nib.Nifti1Image(segmentation, np.eye(4)), path)
+    return path
+
+
+def test_slice_values_label_images_without_reading_masks():
+    """Slices recorded by ConvertNii2Png are labelled from the index; unknown slices fall back to the mask."""
+    with tempfile.TemporaryDirectory() as tmp:
+        segmentation_path = _write_case(tmp)
+        labels_path = os.path.join(tmp, "kits23.json")
+        with open(labels_path, "w") as f:
+            json.dump([{"case_id": "case_00007", "tumor_histologic_subtype": "clear_cell_rcc"}], f)
+
+        pipeline = KITS23Pipeline(path_args=PathArgs(source_path=tmp, target_path=tmp, labels_path=labels_path))
+        ctx: PipelineContext = pipeline.ctx
+        ConvertNii2Png(ctx).convert_nii2png(segmentation_path)
+
+        assert ctx.mask_slice_values == {
+            "00_0_00007_00.png": frozenset({0}),
+            "00_0_00007_01.png": frozenset({0, 1, 2}),
+            "00_0_00007_02.png": frozenset({0, 1, 3}),
+            "00_0_00007_03.png": frozenset({0, 1}),
+        }
+        extractor = ctx.identity.label_extractor
+        assert isinstance(extractor, LabelExtractor)
+        images = os.path.join(tmp, "00_kits23", "CT", "Images")
+        # No mask PNGs exist in the output tree: the answers come from the recorded slice values.
+        assert extractor(os.path.join(images, "00_0_00007_00.png"), "") == ([], [])
+        assert extractor(os.path.join(images, "00_0_00007_01.png"), "") == (
+            kits23.labels["clear_cell_rcc"],
+            ["clear_cell_rcc"],
+        )
+        assert extractor(os.path.join(images, "00_0_00007_02.png"), "")[1] == ["clear_cell_rcc"]
+        assert extractor(os.path.join(images, "00_0_00007_03.png"), "") == ([], [])
+        assert not extractor._has_kidney_finding(os.path.join(images, "00_0_00007_99.png"))
@@ -0,0 +1,59 @@
+"""Unit tests for the indexed label extractors using small synthetic label tables (no external data)."""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from config.dataset_config import chest_xray14, cmmd
+from src.pipelines.chest_xray14 import LabelExtractor as ChestXray14LabelExtractor
+from src.pipelines.cmmd import LabelExtractor as CmmdLabelExtractor
+
+
+def test_chest_xray14_index_matches_table_scan():
+    """Indexed lookups (single and batched) return the labels of the first matching table row."""
+    with tempfile.TemporaryDirectory() as tmp:
+        labels_path = os.path.join(tmp, "Data_Entry_2017_v2020.csv")
+        pd.DataFrame(
+            {
+                "Image Index": ["00000001_000.png", "00000001_001.png", "00000002_000.png", "00000001_000.png"],
+                "Finding Labels": ["Cardiomegaly|Effusion", "No Finding", "Atelectasis", "Effusion"],
+                "Patient Age": [58, 58, 81, 58],
+            }
+        ).to_csv(labels_path, index=False)
+        extractor = ChestXray14LabelExtractor(chest_xray14.labels, labels_path)
+
+        radlex, source = extractor(os.path.join(tmp, "Images", "00000001_000.png"), "")
+        assert source == ["Cardiomegaly", "Effusion"]
+        assert radlex == chest_xray14.labels["Cardiomegaly"] + chest_xray14.labels["Effusion"]
+        assert extractor("/x/99999999_000.png", "") == ([], [])
+
+        paths = [(f"/x/{name}", "") for name in ("00000002_000.png", "missing.png", "00000001_001.png")]
+        assert extractor.extract_many(paths) == [extractor(*path) for path in paths]
+        assert extractor.extract_many(paths)[2][1] == ["No Finding"]
+
+
+def test_cmmd_index_resolves_left_and_right_breast():
+    """The (id, LeftRight) index reproduces the per-breast label selection of the table filter."""
+    with tempfile.TemporaryDirectory() as tmp:
+        labels_path = os.path.join(tmp, "CMMD_clinicaldata_revision.xlsx")
+        pd.DataFrame(
+            {
+                "ID1": ["D1-0001", "D1-0002", "D1-0002"],
+                "LeftRight": ["R", "L", "R"],
+                "Age": [44, 51, 51],
+                "abnormality": ["calcification", "mass", "both"],
+                "classification": ["Benign", "Malignant", "Benign"],
+            }
+        ).to_excel(labels_path, index=False)
+        extractor = CmmdLabelExtractor(cmmd.labels, labels_path)
+
+        def image(patient: str, number: int) -> str:
+            return os.path.join(tmp, patient, "study", "series", f"1-{number}.dcm")
+
+        assert extractor(image("D1-0001", 1), "")[1] == ["calcification", "Benign"]
+        assert extractor(image("D1-0002", 2), "")[1] == ["mass", "Malignant"]
+        assert extractor(image("D1-0002", 3), "") == (
+            cmmd.labels["both"] + cmmd.labels["Benign"],
+            ["both", "Benign"],
+        )
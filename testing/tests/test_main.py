@@ -12,5 +12,7 @@ def test_main_no_exceptions():
     """Test that checks if main.py doesn't raise any exceptions."""
     try:
         import main
+
+        main.main()
     except Exception as e:
         pytest.fail(f'Trying to import main.py raised an exception: "{e}"')
@@ -0,0 +1,63 @@
+"""Unit tests for the shared mask-statistics index using synthetic masks (no external data)."""
+
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+import utils.mask_stats as mask_stats_module
+from utils.mask_stats import MaskStats, MaskStatsIndex
+
+
+def _write_masks(tmp: str) -> list:
+    """Write three masks (one empty) plus a corrupt file; return their paths."""
+    first = np.zeros((6, 8), np.uint8)
+    first[1:3, 2:5] = 1
+    first[4, 7] = 3
+    second = np.zeros((5, 5), np.uint8)
+    paths = []
+    for name, mask in (("first.png", first), ("empty.png", second)):
+        path = os.path.join(tmp, name)
+        cv2.imwrite(path, mask)
+        paths.append(path)
+    corrupt = os.path.join(tmp, "corrupt.png")
+    with open(corrupt, "wb") as handle:
+        handle.write(b"not a png")
+    return paths + [corrupt, os.path.join(tmp, "missing.png")]
+
+
+def test_stats_are_computed_once_and_refreshed_on_change(monkeypatch):
+    """Stats match the decoded masks; a second lookup decodes nothing, a rewritten mask is decoded again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        first, empty, corrupt, missing = _write_masks(tmp)
+        index = MaskStatsIndex(os.path.join(tmp, "stats.sqlite"))
+        stats = index.stats([first, empty, first, corrupt, missing])
+        assert stats == {
+            first: MaskStats(nonzero=7, color_counts={0: 41, 1: 6, 3: 1}, bbox=(1, 2, 4, 7)),
+            empty: MaskStats(nonzero=0, color_counts={0: 25}, bbox=None),
+            corrupt: None,
+            missing: None,
+        }
+        index.close()
+
+        decoded = []
+        compute = mask_stats_module.compute_mask_stats
+        monkeypatch.setattr(mask_stats_module, "compute_mask_stats", lambda path: decoded.append(path) or compute(path))
+        index = MaskStatsIndex(os.path.join(tmp, "stats.sqlite"))
+        assert index.stats([first, empty, corrupt]) == {k: stats[k] for k in (first, empty, corrupt)}
+        assert decoded == []
+
+        cv2.imwrite(empty, np.full((5, 5), 2, np.uint8))
+        os.utime(empty, ns=(1, 1))
+        assert index.stats([first, empty])[empty] == MaskStats(nonzero=25, color_counts={2: 25}, bbox=(0, 0, 4, 4))
+        assert decoded == [empty]
+
+
+def test_parallel_stats_match_serial():
+    """Decoding stale masks across worker processes gives the same statistics."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_masks(tmp)
+        serial = MaskStatsIndex(":memory:").stats(paths)
+        parallel = MaskStatsIndex(":memory:").stats(paths, num_workers=2)
+        assert parallel == serial
@@ -7,12 +7,12 @@ import tempfile
 import cv2
 import numpy as np
 
-from base.pipeline import PathArgs, PipelineArgs, PipelineContext
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
 from config.dataset_config import DatasetArgs
 from src.steps.merge_masks import MergeMasks
 
 
-def _make_ctx(tmp: str) -> PipelineContext:
+def _make_ctx(tmp: str, num_workers: int = 1) -> PipelineContext:
     """Build a minimal PipelineContext for the step."""
     pa = PipelineArgs()
     identity, dicom, file_selection, output = pa.to_configs()
@@ -23,6 +23,7 @@ def _make_ctx(tmp: str) -> PipelineContext:
         dicom=dicom,
         file_selection=file_selection,
         output=output,
+        export=ExportConfig(num_workers=num_workers),
     )
 
 
@@ -115,3 +116,61 @@ def test_transform_writes_report_and_merged_masks():
         assert report["overlap_policy"] == "report"
         assert len(report["groups"]) == 1
         assert report["groups"][0]["overlap_pixel_count"] == 0
+
+
+def _sequential_merge(mask_arrays: list, policy: str, priority: list) -> tuple:
+    """Reference: write mask by mask, resolving each overlap as it is met."""
+    merged = np.zeros_like(mask_arrays[0])
+    occupied = np.zeros(merged.shape, dtype=bool)
+    overlap = np.zeros(merged.shape, dtype=bool)
+    rank_of = {color: rank for rank, color in enumerate(priority)}
+    current_rank = np.full(merged.shape, len(priority) + 1)
+    for mask in mask_arrays:
+        present = mask > 0
+        overlap |= occupied & present
+        if policy == "last":
+            write = present
+        elif policy == "priority":
+            incoming_rank = np.vectorize(lambda color: rank_of.get(int(color), len(priority) + 1))(mask)
+            write = present & (~occupied | (incoming_rank < current_rank))
+            current_rank = np.where(write, incoming_rank, current_rank)
+        else:
+            write = present & ~occupied
+        merged[write] = mask[write]
+        occupied |= present
+    return merged, int(np.count_nonzero(overlap))
+
+
+def test_vectorized_merge_matches_sequential_merge():
+    """On random overlapping masks every policy picks the same colours and counts as writing mask by mask."""
+    rng = np.random.default_rng(0)
+    masks = [
+        np.where(rng.random((24, 24)) < 0.5, rng.choice([1, 2, 5, 7], (24, 24)), 0).astype(np.uint8) for _ in range(4)
+    ]
+    for policy, priority in [("report", None), ("first", None), ("last", None), ("priority", [7, 2, 300, 7])]:
+        merged, overlap_count = MergeMasks._merge(masks, policy, priority)
+        expected, expected_count = _sequential_merge(masks, policy, priority or [])
+        np.testing.assert_array_equal(merged, expected)
+        assert overlap_count == expected_count
+
+
+def test_parallel_transform_matches_serial():
+    """Groups merged over two workers give the same masks and report as one worker."""
+    outputs = []
+    for num_workers in (1, 2):
+        with tempfile.TemporaryDirectory() as tmp:
+            masks_dir = os.path.join(tmp, "99_synthetic", "CT", "Masks")
+            for structure, color in (("Kidney", 1), ("Neoplasm", 2)):
+                os.makedirs(os.path.join(masks_dir, structure))
+                for index in range(3):
+                    mask = np.zeros((8, 8), dtype=np.uint8)
+                    mask[index : index + 4, color : color + 4] = color
+                    cv2.imwrite(os.path.join(masks_dir, structure, f"99_0_001_{index}.png"), mask)
+
+            MergeMasks(_make_ctx(tmp, num_workers)).transform([])
+
+            merged = [cv2.imread(os.path.join(masks_dir, "Kidney", f"99_0_001_{index}.png")) for index in range(3)]
+            report = json.load(open(os.path.join(tmp, "99_synthetic", "reports", "mask_merge_report.json")))
+            outputs.append((merged, [group["overlap_pixel_count"] for group in report["groups"]]))
+    np.testing.assert_array_equal(outputs[0][0], outputs[1][0])
+    assert outputs[0][1] == outputs[1][1] and sum(outputs[0][1]) > 0
@@ -6,10 +6,15 @@ registry-validation audit. They also pin the backwards-compatibility guarantee t
 or RadLex name changed.
 """
 
+from dataclasses import dataclass
+from typing import Optional
+
 from config import labels, masks
 from config.ontology import (
+    OntologyIndex,
     OntologyTerm,
     ancestors,
+    children,
     descendants,
     descendants_of,
     group_by_level,
@@ -145,3 +150,29 @@ def test_ancestors_descendants_consistency():
     neoplasm = labels.label_by_name("Neoplasm")
     for child in descendants(neoplasm, labels.all_labels):
         assert neoplasm in ancestors(child, labels.all_labels)
+
+
+@dataclass(eq=False)
+class _Node:
+    radlex_name: str
+    radlex_id: str
+    radlex_parent_id: Optional[str] = None
+
+
+def test_index_matches_generic_helpers():
+    """OntologyIndex answers exactly like the scanning helpers, including cycles and duplicate ids."""
+    loop_a = _Node("LoopA", "R1", "R2")
+    loop_b = _Node("LoopB", "R2", "R1")
+    twin = _Node("Twin", "R2", "R9")  # duplicate id with a dangling parent
+    leaf = _Node("Leaf", "R3", "R2")
+    synthetic = [loop_a, loop_b, twin, leaf, _Node("Orphan", "")]
+    for registry in (labels.all_labels, masks.all_masks, synthetic):
+        index = OntologyIndex(registry)
+        for entry in registry:
+            assert index.ancestors(entry) == ancestors(entry, registry)
+            assert index.descendants(entry) == descendants(entry, registry)
+            assert index.children(entry) == children(entry, registry)
+            assert index.descendants_of(entry.radlex_name) == descendants_of(entry.radlex_name, registry)
+        assert index.roots() == roots(registry)
+        assert index.group_by_level() == group_by_level(registry)
+    assert OntologyIndex(synthetic).descendants_of("Unknown") == []
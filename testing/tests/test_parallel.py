@@ -1,6 +1,6 @@
 """Unit tests for process_in_parallel: deterministic, order-preserving results."""
 
-from utils.parallel import process_in_parallel
+from utils.parallel import iter_in_parallel, process_in_parallel
 
 
 def _square(value: int) -> int:
@@ -25,3 +25,13 @@ def test_empty_input_returns_empty():
     """An empty item list returns an empty result for any worker count."""
     assert process_in_parallel(_square, [], num_workers=1) == []
     assert process_in_parallel(_square, [], num_workers=4) == []
+
+
+def test_iter_in_parallel_streams_in_input_order():
+    """iter_in_parallel yields the same ordered results as the list-based helper."""
+    items = list(range(25))
+    expected = [v * v for v in items]
+
+    assert list(iter_in_parallel(_square, items, num_workers=1)) == expected
+    assert list(iter_in_parallel(_square, iter(items), num_workers=3, max_pending=2)) == expected
+    assert list(iter_in_parallel(_square, [], num_workers=3)) == []
@@ -0,0 +1,110 @@
+"""Unit tests for the fused PostprocessImages step using small synthetic PNGs (no external data)."""
+
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from config.dataset_config import DatasetArgs
+from src.steps.apply_clahe import ApplyClahe
+from src.steps.apply_windowing import ApplyWindowing
+from src.steps.autocrop_borders import AutocropBorders
+from src.steps.postprocess_images import PostprocessImages
+from src.steps.resize_images import ResizeImages
+from src.steps.standardize_bit_depth import StandardizeBitDepth
+
+
+def _make_ctx(tmp: str, num_workers: int = 1) -> PipelineContext:
+    """Build a PipelineContext rooted at ``tmp`` with every Theme E PNG transform enabled."""
+    pa = PipelineArgs()
+    identity, dicom, file_selection, output = pa.to_configs()
+    ctx = PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(num_workers=num_workers),
+    )
+    ctx.preprocessing.window_preset = "soft_tissue"
+    ctx.preprocessing.clahe_enabled = True
+    ctx.preprocessing.target_bit_depth = 16
+    ctx.preprocessing.autocrop_enabled = True
+    ctx.preprocessing.target_size = (24, 40)
+    ctx.preprocessing.resize_strategy = "letterbox"
+    return ctx
+
+
+def _write_dataset(tmp: str) -> list[str]:
+    """Write three 16-bit images with black borders and paired label masks; return the image paths."""
+    rng = np.random.default_rng(0)
+    image_dir = os.path.join(tmp, "99_synthetic", "CT", "Images")
+    mask_dir = os.path.join(tmp, "99_synthetic", "CT", "Masks")
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(mask_dir, exist_ok=True)
+    image_paths = []
+    for index in range(3):
+        image = np.zeros((48, 64), dtype=np.uint16)
+        image[6 + index : 40, 4 : 60 - index] = rng.integers(100, 400, size=(34 - index, 56 - index))
+        mask = np.zeros((48, 64), dtype=np.uint8)
+        mask[10:30, 10 + index : 40] = 2
+        name = f"99_0_00{index}_x.png"
+        cv2.imwrite(os.path.join(image_dir, name), image)
+        cv2.imwrite(os.path.join(mask_dir, name), mask)
+        image_paths.append(os.path.join(image_dir, name))
+    return image_paths
+
+
+def _read_tree(tmp: str) -> dict:
+    """Return the bytes of every PNG below ``tmp``, keyed by relative path."""
+    contents = {}
+    for directory, _, files in os.walk(tmp):
+        for name in files:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as handle:
+                contents[os.path.relpath(path, tmp)] = handle.read()
+    return contents
+
+
+def test_fused_pass_matches_the_sequential_steps():
+    """One fused pass (serial and parallel) writes byte-identical images and masks to the five steps."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sequential, fused, parallel = (os.path.join(tmp, name) for name in ("sequential", "fused", "parallel"))
+        os.makedirs(sequential)
+        image_paths = _write_dataset(sequential)
+        shutil.copytree(sequential, fused)
+        shutil.copytree(sequential, parallel)
+
+        ctx = _make_ctx(sequential)
+        for step in (ApplyWindowing, ApplyClahe, StandardizeBitDepth, AutocropBorders, ResizeImages):
+            step(ctx).transform(image_paths)
+        PostprocessImages(_make_ctx(fused)).transform([])
+        PostprocessImages(_make_ctx(parallel, num_workers=2)).transform([])
+
+        expected = _read_tree(sequential)
+        assert len(expected) == 6
+        assert _read_tree(fused) == expected
+        assert _read_tree(parallel) == expected
+
+
+def test_noop_when_no_transform_is_enabled():
+    """With the default preprocessing config nothing is rewritten."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_dataset(tmp)
+        before = _read_tree(tmp)
+        pa = PipelineArgs()
+        identity, dicom, file_selection, output = pa.to_configs()
+        ctx = PipelineContext(
+            paths=PathArgs(source_path=tmp, target_path=tmp),
+            dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+            identity=identity,
+            dicom=dicom,
+            file_selection=file_selection,
+            output=output,
+        )
+        assert PostprocessImages(ctx).transform(["x"]) == ["x"]
+        assert _read_tree(tmp) == before
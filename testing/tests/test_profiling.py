@@ -0,0 +1,78 @@
+"""Unit tests for the opt-in per-step profiling report using small synthetic PNGs (no external data)."""
+
+import json
+import os
+import tempfile
+
+import cv2
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from base.profiling import PROFILE_JSON_NAME, PROFILE_MD_NAME
+from config.dataset_config import DatasetArgs
+from src.steps.apply_clahe import ApplyClahe
+from src.steps.resize_images import ResizeImages
+
+
+def _make_ctx(tmp: str, export: ExportConfig) -> PipelineContext:
+    """Build a minimal PipelineContext rooted at ``tmp`` with CLAHE and resizing enabled."""
+    pa = PipelineArgs()
+    identity, dicom, file_selection, output = pa.to_configs()
+    ctx = PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=export,
+    )
+    ctx.preprocessing.clahe_enabled = True
+    ctx.preprocessing.target_size = (16, 16)
+    return ctx
+
+
+def _write_images(tmp: str, count: int) -> list[str]:
+    """Write ``count`` random 8-bit images into the UMIE folder layout; return their paths."""
+    image_dir = os.path.join(tmp, "99_synthetic", "CT", "Images")
+    os.makedirs(image_dir)
+    paths = []
+    for index in range(count):
+        path = os.path.join(image_dir, f"99_0_00{index}_x.png")
+        cv2.imwrite(path, np.random.default_rng(index).integers(0, 256, size=(32, 24), dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def test_profile_report_records_every_step():
+    """Each step gets a JSON / Markdown entry with its timings and file counts; cProfile dumps are written."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_images(tmp, 3)
+        ctx = _make_ctx(tmp, ExportConfig(profile_steps=True, profile_cprofile=True))
+        pipeline = Pipeline([("apply_clahe", ApplyClahe(ctx)), ("resize_images", ResizeImages(ctx))])
+
+        assert pipeline.transform(paths) == paths
+
+        reports_dir = os.path.join(tmp, "99_synthetic", "reports")
+        with open(os.path.join(reports_dir, PROFILE_JSON_NAME)) as handle:
+            report = json.load(handle)
+        assert report["dataset"] == "99_synthetic"
+        assert [step["step"] for step in report["steps"]] == ["ApplyClahe", "ResizeImages"]
+        for step in report["steps"]:
+            assert step["wall_s"] >= 0 and step["cpu_s"] >= 0
+            assert step["files_in"] == 3 and step["files_out"] == 3
+            assert os.path.exists(step["cprofile_path"])
+        with open(os.path.join(reports_dir, PROFILE_MD_NAME)) as handle:
+            markdown = handle.read()
+        assert "| 2 | ResizeImages |" in markdown and "Slowest step" in markdown
+
+
+def test_profiling_is_off_by_default():
+    """Without profile_steps no report is written and the steps behave as before."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_images(tmp, 2)
+        ctx = _make_ctx(tmp, ExportConfig())
+        assert ResizeImages(ctx).transform(paths) == paths
+        assert ctx.profiler is None
+        assert not os.path.exists(os.path.join(tmp, "99_synthetic", "reports"))
@@ -0,0 +1,76 @@
+"""Unit tests for the lookup-table RecolorMasks using synthetic masks (no external data)."""
+
+import os
+import tempfile
+from dataclasses import replace
+
+import cv2
+import nibabel as nib
+import numpy as np
+
+from base.pipeline import PathArgs
+from config.dataset_config import MaskColor
+from constants import OutputMode
+from src.pipelines.kits23 import KITS23Pipeline
+from src.steps.recolor_masks import RecolorMasks
+
+# Chained and colliding remaps: 1 -> 2 must not be remapped again by 2 -> 3, and 4 -> 0 hits the 255 edge.
+MASKS = {
+    "a": {"source_color": 1, "target_color": 2},
+    "b": {"source_color": 2, "target_color": 3},
+    "c": {"source_color": 4, "target_color": 0},
+    "d": {"source_color": 200, "target_color": 7},
+}
+
+
+def _step(tmp: str, output_mode: OutputMode) -> RecolorMasks:
+    """Build a RecolorMasks step on a KITS23 context (no source) with the test color table."""
+    step = RecolorMasks(
+        KITS23Pipeline(path_args=PathArgs(source_path="", target_path=tmp, output_mode=output_mode)).ctx
+    )
+    # Replace (not mutate) the dataset args: they are the shared module-level kits23 config.
+    step.ctx.dataset = replace(step.ctx.dataset, masks={name: MaskColor(**colors) for name, colors in MASKS.items()})
+    return step
+
+
+def _reference_2d(mask: np.ndarray) -> np.ndarray:
+    """The per-color np.place remapping the lookup table replaces."""
+    mask = mask.astype("uint16")
+    for colors in MASKS.values():
+        np.place(mask, mask == colors["source_color"], colors["target_color"] + 255)
+    mask[mask > 255] -= 255
+    return mask.astype("uint8")
+
+
+def test_2d_lookup_table_matches_per_color_remapping():
+    """Every 8-bit value is remapped exactly as by the per-color passes, in all three channels."""
+    with tempfile.TemporaryDirectory() as tmp:
+        mask_path = os.path.join(tmp, "00_kits23", "CT", "Masks", "00_0_001_01.png")
+        os.makedirs(os.path.dirname(mask_path))
+        mask = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        cv2.imwrite(mask_path, mask)
+
+        _step(tmp, OutputMode.SLICES_2D).transform(["dummy"])
+
+        expected = _reference_2d(cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR))
+        np.testing.assert_array_equal(cv2.imread(mask_path), expected)
+
+
+def test_3d_native_dtype_path_matches_float_path():
+    """Integer volumes remapped through the table equal the float64 per-color result."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = np.arange(256, dtype=np.int16).reshape(4, 8, 8)
+        paths = [os.path.join(tmp, "00_kits23", "CT", "Masks", name) for name in ("a.nii.gz", "b.nii.gz")]
+        os.makedirs(os.path.dirname(paths[0]))
+        nib.save(nib.Nifti1Image(data, np.eye(4)), paths[0])
+        nib.save(nib.Nifti1Image(data.astype(np.float32), np.eye(4)), paths[1])
+
+        _step(tmp, OutputMode.VOLUMES_3D).transform(["dummy"])
+
+        expected = data.astype(np.float64)
+        for colors in MASKS.values():
+            expected[data == colors["source_color"]] = colors["target_color"]
+        for path in paths:
+            out = nib.load(path)
+            assert out.get_data_dtype() == np.uint8
+            np.testing.assert_array_equal(np.asanyarray(out.dataobj), expected.astype(np.uint8))
@@ -0,0 +1,119 @@
+"""Unit tests for the shared JSONL record store (write-through, deferred and checkpoint modes)."""
+
+import os
+import tempfile
+
+import jsonlines
+
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from base.record_store import RecordStore
+from config.dataset_config import DatasetArgs
+from src.pipelines.kits23 import KITS23Pipeline
+from src.steps.add_provenance import AddProvenance
+from src.steps.create_splits import CreateSplits
+from src.steps.flush_records import FlushRecords
+
+
+def _make_ctx(tmp: str, **export: bool) -> PipelineContext:
+    """Build a minimal PipelineContext for the kits23 dataset name (known provenance)."""
+    identity, dicom, file_selection, output = PipelineArgs().to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=tmp, target_path=tmp),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="kits23", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(**export),
+    )
+
+
+def _write_jsonl(tmp: str, num_studies: int = 6) -> str:
+    """Write a JSONL with two image records per study and return its path."""
+    dataset_dir = os.path.join(tmp, "99_kits23")
+    os.makedirs(dataset_dir, exist_ok=True)
+    jsonl_path = os.path.join(dataset_dir, "99_kits23.jsonl")
+    with jsonlines.open(jsonl_path, mode="w") as writer:
+        for study in range(num_studies):
+            for slice_idx in range(2):
+                writer.write(
+                    {
+                        "umie_path": f"99_kits23/CT/Images/99_0_{study}_{slice_idx}.png",
+                        "study_id": str(study),
+                        "mask_path": "",
+                        "labels": [{"Neoplasm": 1}] if study % 2 else [],
+                    }
+                )
+    return jsonl_path
+
+
+def _read(jsonl_path: str) -> bytes:
+    """Read the raw JSONL bytes."""
+    with open(jsonl_path, "rb") as handle:
+        return handle.read()
+
+
+def _run_steps(tmp: str, **export: bool) -> PipelineContext:
+    """Run AddProvenance -> CreateSplits -> FlushRecords on one shared context."""
+    ctx = _make_ctx(tmp, **export)
+    for step in (AddProvenance(ctx), CreateSplits(ctx), FlushRecords(ctx)):
+        step.transform([])
+    return ctx
+
+
+def test_deferred_writes_once_with_byte_identical_output():
+    """Deferred steps leave the file untouched until the flush, which matches write-through output."""
+    with tempfile.TemporaryDirectory() as tmp:
+        eager_path = _write_jsonl(os.path.join(tmp, "eager"))
+        _run_steps(os.path.join(tmp, "eager"))
+
+        deferred_tmp = os.path.join(tmp, "deferred")
+        deferred_path = _write_jsonl(deferred_tmp)
+        original = _read(deferred_path)
+        ctx = _make_ctx(deferred_tmp, defer_jsonl_writes=True)
+        AddProvenance(ctx).transform([])
+        CreateSplits(ctx).transform([])
+        assert _read(deferred_path) == original
+        assert ctx.records.get("99_kits23/CT/Images/99_0_3_1.png")["split"] in ("train", "val", "test")
+
+        FlushRecords(ctx).transform([])
+        assert _read(deferred_path) == _read(eager_path) != original
+
+
+def test_get_reuses_its_index_until_the_next_write():
+    """Write-through lookups parse the JSONL once; write() replaces the index with the new records."""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = _write_jsonl(tmp)
+        store = RecordStore(jsonl_path)
+        assert store.get("99_kits23/CT/Images/99_0_1_0.png")["study_id"] == "1"
+
+        os.remove(jsonl_path)  # further lookups must not re-read the file
+        assert store.get("99_kits23/CT/Images/99_0_5_1.png")["study_id"] == "5"
+        assert store.get("missing.png") is None
+
+        store.write([{"umie_path": "99_kits23/CT/Images/99_0_1_0.png", "study_id": "7"}])
+        assert store.get("99_kits23/CT/Images/99_0_1_0.png")["study_id"] == "7"
+        assert store.get("99_kits23/CT/Images/99_0_5_1.png") is None
+
+
+def test_checkpoint_writes_atomic_snapshot_after_each_change():
+    """With jsonl_checkpoint every JSONL change is on disk immediately and no temp file is left."""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = _write_jsonl(tmp)
+        ctx = _make_ctx(tmp, defer_jsonl_writes=True, jsonl_checkpoint=True)
+        AddProvenance(ctx).transform([])
+
+        with jsonlines.open(jsonl_path, mode="r") as reader:
+            records = list(reader)
+        assert all(record["license"] for record in records)
+        assert "split" not in records[0]
+        assert os.listdir(os.path.dirname(jsonl_path)) == ["99_kits23.jsonl"]
+
+
+def test_flush_records_step_is_appended_only_when_deferred():
+    """BasePipeline appends flush_records as the very last step when defer_jsonl_writes is set."""
+    pipe = KITS23Pipeline(path_args=PathArgs(source_path="", target_path="/d"))
+    assert "flush_records" not in [name for name, _ in pipe.pipeline.steps]
+
+    pipe.ctx.export.defer_jsonl_writes = True
+    assert pipe.pipeline.steps[-1][0] == "flush_records"
@@ -0,0 +1,172 @@
+"""Unit tests for the opt-in streaming engine (synthetic DICOM data, no external dependencies)."""
+
+import glob
+import os
+import tempfile
+
+import numpy as np
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
+from sklearn.pipeline import Pipeline
+
+from base.extractors import BaseStudyIdExtractor
+from base.pipeline import ExportConfig, PathArgs, PipelineArgs, PipelineContext
+from base.step import BaseStep
+from base.streaming import StreamingPipeline
+from config.dataset_config import DatasetArgs
+from src.pipelines.kits23 import KITS23Pipeline
+from src.steps.add_umie_ids import AddUmieIds
+from src.steps.convert_dcm2png import ConvertDcm2Png
+from src.steps.create_file_tree import CreateFileTree
+
+
+class _StudyIdExtractor(BaseStudyIdExtractor):
+    """Study id is the name of the folder holding the slice."""
+
+    def _extract(self, img_path: str) -> str:
+        return os.path.basename(os.path.dirname(img_path))
+
+
+class _Recorder(BaseStep):
+    """Streaming step appending ``(name, item)`` events to a shared log."""
+
+    supports_streaming = True
+
+    def __init__(self, ctx: PipelineContext, name: str, log: list):
+        super().__init__(ctx)
+        self.name, self.log = name, log
+
+    def transform(self, X: list) -> list:
+        self.log.append((self.name, "stage"))
+        return X
+
+    def transform_stream(self, X):
+        for item in X:
+            self.log.append((self.name, item))
+            yield item
+
+    def finish_stream(self) -> None:
+        self.log.append((self.name, "finish"))
+
+
+class _Barrier(_Recorder):
+    """Stage-at-a-time step."""
+
+    supports_streaming = False
+
+
+def _make_ctx(source: str, target: str, streaming: bool = False) -> PipelineContext:
+    """Build a PipelineContext for a single-modality synthetic CT dataset."""
+    identity, dicom, file_selection, output = PipelineArgs(
+        study_id_extractor=_StudyIdExtractor(), window_center=40, window_width=400
+    ).to_configs()
+    return PipelineContext(
+        paths=PathArgs(source_path=source, target_path=target),
+        dataset=DatasetArgs(dataset_uid="99", dataset_name="synthetic", modalities={"0": "CT"}),
+        identity=identity,
+        dicom=dicom,
+        file_selection=file_selection,
+        output=output,
+        export=ExportConfig(streaming=streaming),
+    )
+
+
+def _write_slice(path: str, pixels: np.ndarray) -> None:
+    """Write one little-endian CT DICOM slice with an int16 pixel array."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = CTImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = FileDataset(path, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = CTImageStorage
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    pixels = pixels.astype(np.int16)
+    ds.Rows, ds.Columns = pixels.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit, ds.PixelRepresentation = 16, 16, 15, 1
+    ds.RescaleSlope, ds.RescaleIntercept = 1, -1024
+    ds.PixelData = pixels.tobytes()
+    ds.is_little_endian, ds.is_implicit_VR = True, False
+    ds.save_as(path)
+
+
+def _write_source(folder: str) -> list:
+    """Write two studies of three slices each and return the DICOM paths."""
+    paths = []
+    for study in ("S2", "S1"):
+        os.makedirs(os.path.join(folder, study))
+        for index in range(3):
+            path = os.path.join(folder, study, f"{index}.dcm")
+            _write_slice(path, np.full((8, 8), 1000 + 10 * index))
+            paths.append(path)
+    return paths
+
+
+def test_consecutive_streaming_steps_are_fused_and_interleaved():
+    """Each item passes through the whole streaming run before the next one is read."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx, log = _make_ctx(tmp, tmp), []
+        steps = [
+            ("a", _Recorder(ctx, "a", log)),
+            ("b", _Recorder(ctx, "b", log)),
+            ("barrier", _Barrier(ctx, "barrier", log)),
+            ("c", _Recorder(ctx, "c", log)),
+        ]
+        pipeline = StreamingPipeline(steps=steps)
+
+        assert [[name for name, _ in run] for run in pipeline.runs()] == [["a", "b"], ["barrier"], ["c"]]
+        assert pipeline.transform(["x", "y"]) == ["x", "y"]
+        assert log == [
+            ("a", "x"),
+            ("b", "x"),
+            ("a", "y"),
+            ("b", "y"),
+            ("a", "finish"),
+            ("b", "finish"),
+            ("barrier", "stage"),
+            ("c", "x"),
+            ("c", "y"),
+            ("c", "finish"),
+        ]
+
+
+def test_streaming_matches_stage_at_a_time_output_and_drops_scratch_pngs():
+    """Conversion -> UMIE ids gives the same tree and JSONL, without leaving source PNGs behind."""
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for mode in ("stage", "stream"):
+            source, target = os.path.join(tmp, mode, "source"), os.path.join(tmp, mode, "target")
+            paths = _write_source(source)
+            ctx = _make_ctx(source, target, streaming=mode == "stream")
+            steps = [
+                ("create_file_tree", CreateFileTree(ctx)),
+                ("convert_dcm2png", ConvertDcm2Png(ctx)),
+                ("add_umie_ids", AddUmieIds(ctx)),
+            ]
+            pipeline = StreamingPipeline(steps=steps) if mode == "stream" else Pipeline(steps=steps)
+            images = pipeline.transform(paths)
+
+            root = os.path.join(target, "99_synthetic")
+            with open(os.path.join(root, "99_synthetic.jsonl")) as handle:
+                jsonl = handle.read()
+            tree = sorted(os.path.relpath(path, target) for path in glob.glob(f"{root}/**/*.png", recursive=True))
+            outputs[mode] = (jsonl, tree, sorted(os.path.relpath(path, target) for path in images))
+            leftover = glob.glob(f"{source}/**/*.png", recursive=True)
+            assert len(leftover) == (6 if mode == "stage" else 0)
+
+        assert outputs["stream"] == outputs["stage"]
+        assert len(outputs["stream"][1]) == 6
+
+
+def test_base_pipeline_builds_streaming_engine_when_enabled():
+    """ExportConfig.streaming swaps the sklearn Pipeline for a StreamingPipeline with the same steps."""
+    pipe = KITS23Pipeline(path_args=PathArgs(source_path="", target_path="/d"))
+    assert isinstance(pipe.pipeline, Pipeline)
+
+    pipe.ctx.export.streaming = True
+    streaming = pipe.pipeline
+    assert isinstance(streaming, StreamingPipeline)
+    assert [name for name, _ in streaming.steps] == [name for name, _ in pipe.steps]
+    assert ["convert_nii2png"] in [[name for name, _ in run] for run in streaming.runs()]
+    assert ["add_umie_ids", "recolor_masks", "add_labels"] in [[name for name, _ in run] for run in streaming.runs()]
@@ -11,6 +11,7 @@ from config.dataset_config import all_datasets
 from config.labels import all_labels
 from config.masks import all_masks
 from src.constants import TARGET_PATH
+from utils.mask_stats import open_mask_stats_index
 
 
 def delete_blank_images() -> None:
@@ -40,8 +41,12 @@ def delete_blank_images() -> None:
                 writer.write(obj)
 
 
-def calculate_labels_and_mask_ratios() -> None:
-    """Calculate the number of labels and masks in the dataset."""
+def calculate_labels_and_mask_ratios(num_workers: int = 1) -> None:
+    """Calculate the number of labels and masks in the dataset.
+
+    Mask colours come from the shared mask-statistics index (``data/mask_stats.sqlite``), so only
+    masks added or changed since the previous run are decoded, across ``num_workers`` processes.
+    """
     label_counts = {}
     mask_counts = {}
     all_imgs_count = 0
@@ -49,6 +54,10 @@ def calculate_labels_and_mask_ratios() -> None:
         label_counts[label.radlex_name] = 0
     for mask_def in all_masks:
         mask_counts[mask_def.radlex_name] = 0
+    masks_by_color: dict[int, list[str]] = {}
+    for mask_def in all_masks:
+        masks_by_color.setdefault(mask_def.color, []).append(mask_def.radlex_name)
+    mask_index = open_mask_stats_index(os.path.join(os.getcwd(), "data"))
     for dataset in all_datasets:
         print(f"Checking {dataset.dataset_name}...")
         name_with_id = dataset.dataset_uid + "_" + dataset.dataset_name
@@ -57,6 +66,7 @@ def calculate_labels_and_mask_ratios() -> None:
         datasets_dir = os.path.join(data_dir, name_with_id)
         dataset_file = os.path.join(datasets_dir, f"{name_with_id}.jsonl")
 
+        mask_paths = []
         with jsonlines.open(dataset_file, mode="r") as reader:
             for obj in reader:
                 if len(obj["labels"]) >= 0:
@@ -64,15 +74,20 @@ def calculate_labels_and_mask_ratios() -> None:
                         label = list(label.keys())[0]  # type: ignore[attr-defined]
                         label_counts[label] += 1  # type: ignore[index]
                 if obj["mask_path"]:
-                    mask_path = os.path.join(TARGET_PATH, obj["mask_path"])
-                    mask_img = cv2.imread(mask_path)
-                    for color in list(np.unique(mask_img)):
-                        if color != 0:
-                            for mask_def in all_masks:
-                                if mask_def.color == color:
-                                    mask_counts[mask_def.radlex_name] += 1
+                    mask_paths.append(os.path.join(TARGET_PATH, obj["mask_path"]))
                 all_imgs_count += 1
 
+        mask_stats = mask_index.stats(mask_paths, num_workers)
+        for mask_path in mask_paths:
+            stats = mask_stats[mask_path]
+            if stats is None:
+                continue
+            for color in stats.color_counts:
+                if color != 0:
+                    for mask_name in masks_by_color.get(color, []):
+                        mask_counts[mask_name] += 1
+    mask_index.close()
+
     print(f"Total images: {all_imgs_count}")
     print("Labels:")
     for label in label_counts:  # type: ignore[assignment]
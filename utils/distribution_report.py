@@ -10,6 +10,11 @@ reads every dataset JSONL and computes:
 - a segmentation-mask size distribution (nonzero-pixel counts per mask) for masks that exist
   and are readable with OpenCV.
 
+Records are streamed line by line rather than loaded per dataset, and mask sizes come from the
+shared mask-statistics index (``utils/mask_stats.py``, by default ``data_dir/mask_stats.sqlite``):
+only masks that are new or changed since the last report are decoded, optionally across
+``num_workers`` processes.
+
 It writes a markdown report and a CSV next to ``output_path`` (defaulting to
 ``data_dir/distribution_report.md`` and ``.../distribution_report.csv``) and returns the
 computed stats dict so it is directly unit-testable without asserting on files on disk.
@@ -25,19 +30,28 @@ import glob
 import json
 import os
 from collections import Counter
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
-import cv2  # type: ignore[import-untyped]
 import numpy as np
 
+from utils.mask_stats import MaskStatsIndex, open_mask_stats_index
+
 
-def generate_distribution_report(data_dir: str, output_path: Optional[str] = None) -> dict:
+def generate_distribution_report(
+    data_dir: str,
+    output_path: Optional[str] = None,
+    num_workers: int = 1,
+    mask_stats_path: Optional[str] = None,
+) -> dict:
     """Compute label / modality / imbalance / mask-size distributions over a data dir.
 
     Args:
         data_dir (str): Directory containing ``{uid}_{name}/{uid}_{name}.jsonl`` datasets.
         output_path (Optional[str]): Base path for the markdown report; the CSV is written
             alongside with a ``.csv`` extension. Defaults to ``data_dir/distribution_report.md``.
+        num_workers (int): Worker processes decoding masks missing from the mask-statistics index.
+        mask_stats_path (Optional[str]): Mask-statistics index file. Defaults to
+            ``data_dir/mask_stats.sqlite``.
     Returns:
         dict: The computed statistics (per-dataset + global label counts, modality breakdown,
         class-imbalance ratios, and mask-size distribution).
@@ -47,27 +61,38 @@ def generate_distribution_report(data_dir: str, output_path: Optional[str] = Non
     global_modalities: Counter = Counter()
     global_mask_sizes: list[int] = []
     total_records = 0
+    mask_index = open_mask_stats_index(data_dir, mask_stats_path)
 
     for jsonl_path in _find_dataset_jsonls(data_dir):
         dataset_key = os.path.basename(os.path.dirname(jsonl_path))
-        records = _read_jsonl(jsonl_path)
-        total_records += len(records)
-
-        labels = _count_labels(records)
-        modalities = _count_modalities(records)
-        mask_sizes = _mask_sizes(records, data_dir)
+        labels: Counter = Counter()
+        modalities: Counter = Counter()
+        mask_paths: list[str] = []
+        num_records = 0
+        for record in _iter_jsonl(jsonl_path):
+            num_records += 1
+            labels.update(_label_names(record))
+            modality_name = record.get("modality_name")
+            if modality_name:
+                modalities[str(modality_name)] += 1
+            mask_path = record.get("mask_path")
+            if mask_path:
+                mask_paths.append(mask_path if os.path.isabs(mask_path) else os.path.join(data_dir, mask_path))
+        total_records += num_records
+        mask_sizes = _mask_sizes(mask_paths, mask_index, num_workers)
 
         global_labels.update(labels)
         global_modalities.update(modalities)
         global_mask_sizes.extend(mask_sizes)
 
         per_dataset[dataset_key] = {
-            "num_records": len(records),
+            "num_records": num_records,
             "label_counts": dict(labels),
             "modality_counts": dict(modalities),
             "class_imbalance_ratio": _imbalance_ratio(labels),
             "mask_size_distribution": _summarize_sizes(mask_sizes),
         }
+    mask_index.close()
 
     stats: dict[str, Any] = {
         "data_dir": data_dir,
@@ -110,15 +135,14 @@ def _find_dataset_jsonls(data_dir: str) -> list[str]:
     return found
 
 
-def _read_jsonl(path: str) -> list[dict]:
-    """Read a JSONL file into a list of records, skipping unreadable files / lines.
+def _iter_jsonl(path: str) -> Iterator[dict]:
+    """Stream the records of a JSONL file, skipping unreadable files / lines.
 
     Args:
         path (str): Path to the JSONL file.
-    Returns:
-        list[dict]: Parsed records (empty when the file is missing or unreadable).
+    Yields:
+        dict: Parsed records (none when the file is missing or unreadable).
     """
-    records: list[dict] = []
     try:
         with open(path, encoding="utf-8") as handle:
             for line in handle:
@@ -126,48 +150,27 @@ def _read_jsonl(path: str) -> list[dict]:
                 if not line:
                     continue
                 try:
-                    records.append(json.loads(line))
+                    yield json.loads(line)
                 except json.JSONDecodeError:
                     continue
     except OSError:
-        return []
-    return records
+        return
 
 
-def _count_labels(records: list[dict]) -> Counter:
-    """Count RadLex label occurrences across records.
+def _label_names(record: dict) -> list[str]:
+    """Return the RadLex label names on a record.
 
     ``labels`` is a list of ``{radlex_name: grade}`` dicts; each radlex name counts once per
-    record it appears on.
-
-    Args:
-        records (list[dict]): Dataset records.
-    Returns:
-        Counter: ``{radlex_name: count}``.
-    """
-    counter: Counter = Counter()
-    for record in records:
-        for label in record.get("labels", []) or []:
-            if isinstance(label, dict):
-                for radlex_name in label.keys():
-                    counter[str(radlex_name)] += 1
-    return counter
-
-
-def _count_modalities(records: list[dict]) -> Counter:
-    """Count modality occurrences by ``modality_name``.
+    dict it appears in.
 
     Args:
-        records (list[dict]): Dataset records.
+        record (dict): Dataset record.
     Returns:
-        Counter: ``{modality_name: count}``.
+        list[str]: The radlex names.
     """
-    counter: Counter = Counter()
-    for record in records:
-        modality_name = record.get("modality_name")
-        if modality_name:
-            counter[str(modality_name)] += 1
-    return counter
+    return [
+        str(radlex_name) for label in record.get("labels", []) or [] if isinstance(label, dict) for radlex_name in label
+    ]
 
 
 def _imbalance_ratio(counts: Counter) -> Optional[float]:
@@ -184,31 +187,18 @@ def _imbalance_ratio(counts: Counter) -> Optional[float]:
     return round(max(values) / min(values), 4)
 
 
-def _mask_sizes(records: list[dict], data_dir: str) -> list[int]:
-    """Read nonzero-pixel counts for each record's mask, when the mask exists and is readable.
+def _mask_sizes(mask_paths: list[str], mask_index: MaskStatsIndex, num_workers: int) -> list[int]:
+    """Look up nonzero-pixel counts for each record's mask, when the mask exists and is readable.
 
     Args:
-        records (list[dict]): Dataset records.
-        data_dir (str): Root data dir, used to resolve relative ``mask_path`` values.
+        mask_paths (list[str]): Resolved mask path of every record that has one.
+        mask_index (MaskStatsIndex): Index serving (and caching) the per-mask statistics.
+        num_workers (int): Worker processes decoding masks missing from the index.
     Returns:
-        list[int]: Nonzero-pixel counts (one per readable mask).
+        list[int]: Nonzero-pixel counts (one per record with a readable mask).
     """
-    sizes: list[int] = []
-    for record in records:
-        mask_path = record.get("mask_path")
-        if not mask_path:
-            continue
-        resolved = mask_path if os.path.isabs(mask_path) else os.path.join(data_dir, mask_path)
-        if not os.path.exists(resolved):
-            continue
-        try:
-            mask = cv2.imread(resolved, cv2.IMREAD_UNCHANGED)
-        except Exception:
-            continue
-        if mask is None:
-            continue
-        sizes.append(int(np.count_nonzero(mask)))
-    return sizes
+    stats = mask_index.stats(mask_paths, num_workers)
+    return [mask_stats.nonzero for mask_stats in (stats[path] for path in mask_paths) if mask_stats is not None]
 
 
 def _summarize_sizes(sizes: list[int]) -> dict[str, Any]:
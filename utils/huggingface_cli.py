@@ -2,14 +2,18 @@
 
 import json
 import os
+from typing import Any, Iterator
 
 import click
-import pandas as pd
 
 from config.dataset_config import all_datasets
-from datasets import Dataset, Image, Value  # type: ignore[attr-defined]
+from datasets import Dataset, Features, Image, Sequence, Value  # type: ignore[attr-defined]
 
 hf_repo_name = "lion-ai/umie_datasets"
+# JSONL fields renamed to the Hub's column names
+HUB_COLUMNS = {"umie_path": "image", "mask_path": "mask"}
+# Hub columns that are always strings, whatever the JSONL holds
+STRING_COLUMNS = ("labels", "dataset_uid", "study_id")
 
 
 def to_absolute_path(relative_path: str, data_dir: str) -> str:
@@ -55,6 +59,110 @@ def transform_labels(example: dict) -> dict:
     return {"labels": json.dumps(new_labels)}
 
 
+def _value_kind(value: Any) -> str:
+    """Return the kind of a JSON value used to pick its Hub feature ("list" only for lists of scalars)."""
+    if isinstance(value, list):
+        return "list" if not any(isinstance(item, (list, dict)) for item in value) else "json"
+    if isinstance(value, dict):
+        return "json"
+    return type(value).__name__
+
+
+def _kinds_to_feature(kinds: set[str]) -> Any:
+    """Return the feature holding every value of the given kinds (None values are ignored)."""
+    if kinds == {"list"}:
+        return Sequence(Value("string"))
+    if kinds == {"bool"}:
+        return Value("bool")
+    if kinds == {"int"}:
+        return Value("int64")
+    if kinds and kinds <= {"int", "float"}:
+        return Value("float64")
+    # Strings, all-null columns and anything mixed or nested are stored as (JSON) strings
+    return Value("string")
+
+
+def scan_hub_features(dataset_file: str, has_masks: bool) -> Features:
+    """
+    Scan the dataset JSONL once and build the ``Features`` of its Hub rows.
+
+    Every key of any record becomes a column, so keys only some records carry (e.g.
+    ``duplicate_group_id``) are typed too. ``image`` / ``mask`` are ``Image()`` (``mask`` is a string
+    for datasets without masks) and ``labels`` / ``dataset_uid`` / ``study_id`` are strings. Other
+    columns are typed from all their non-null values, not just the first rows: lists of scalars are
+    string sequences, numbers and booleans keep their type and anything else is a (JSON) string.
+
+    Args:
+        dataset_file (str): Path to the dataset JSONL.
+        has_masks (bool): Whether the dataset has masks.
+
+    Returns:
+        Features: The feature schema of the rows yielded by ``iter_hub_rows``.
+    """
+    kinds: dict[str, set[str]] = {"image": set(), "mask": set()}
+    with open(dataset_file, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            for key, value in json.loads(line).items():
+                column_kinds = kinds.setdefault(HUB_COLUMNS.get(key, key), set())
+                if value is not None:
+                    column_kinds.add(_value_kind(value))
+
+    feature_map: dict[str, Any] = {}
+    for column, column_kinds in kinds.items():
+        if column == "image" or (column == "mask" and has_masks):
+            feature_map[column] = Image()
+        elif column in STRING_COLUMNS:
+            feature_map[column] = Value("string")
+        else:
+            feature_map[column] = _kinds_to_feature(column_kinds)
+    return Features(feature_map)
+
+
+def _to_feature_value(value: Any, feature: Any) -> Any:
+    """Convert a JSONL value to the type of its Hub feature (None stays None)."""
+    if value is None:
+        return None
+    if isinstance(feature, Sequence):
+        return [str(item) for item in value]
+    if isinstance(feature, Value) and feature.dtype == "string" and not isinstance(value, str):
+        return json.dumps(value)
+    return value
+
+
+def iter_hub_rows(dataset_file: str, data_dir: str, has_masks: bool, features: Features) -> Iterator[dict[str, Any]]:
+    """
+    Stream the dataset JSONL as rows of the Hub schema, for ``Dataset.from_generator``.
+
+    ``umie_path`` / ``mask_path`` become the absolute ``image`` / ``mask`` paths (``mask`` is None
+    for datasets without masks), ``labels`` is the JSON-encoded output of ``transform_labels`` and
+    ``dataset_uid`` / ``study_id`` are strings. Every row carries every column of ``features``,
+    with keys missing from the record set to None.
+
+    Args:
+        dataset_file (str): Path to the dataset JSONL.
+        data_dir (str): The data directory the record paths are relative to.
+        has_masks (bool): Whether the dataset has masks.
+        features (Features): The schema from ``scan_hub_features``.
+
+    Yields:
+        dict[str, Any]: One row per record, in file order.
+    """
+    with open(dataset_file, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = {HUB_COLUMNS.get(key, key): value for key, value in json.loads(line).items()}
+            row = {column: _to_feature_value(record.get(column), feature) for column, feature in features.items()}
+            row["image"] = to_absolute_path(record["image"], data_dir)
+            row["mask"] = to_absolute_path(record["mask"], data_dir) if has_masks and record.get("mask") else None
+            row["labels"] = json.dumps(transform_labels({"labels": record["labels"]})["labels"])
+            row["dataset_uid"] = str(record["dataset_uid"])
+            row["study_id"] = str(record["study_id"])
+            yield row
+
+
 @click.command()
 @click.option(
     "--dataset-name",
@@ -87,37 +195,17 @@ def upload(dataset_name: str, commit_message: str) -> None:
     if not os.path.exists(dataset_file):
         raise FileNotFoundError(f"Dataset jsonl file {dataset_file} does not exist")
 
-    # Load dataset using pandas
-    df = pd.read_json(dataset_file, lines=True)
-
-    # Rename columns
-    df = df.rename(columns={"umie_path": "image", "mask_path": "mask"})
-
-    # Process image and mask paths
-    df["image"] = df["image"].apply(lambda x: to_absolute_path(x, data_dir))
-    if dataset_config.masks != {}:
-        df["mask"] = df["mask"].apply(lambda x: to_absolute_path(x, data_dir))
-    else:
-        df["mask"] = None
-
-    # Transform labels
-    df["labels"] = df["labels"].apply(lambda x: json.dumps(transform_labels({"labels": x})["labels"]))
-
-    # Convert int64 columns to string to match the Hub's schema
-    df["dataset_uid"] = df["dataset_uid"].astype(str)
-    df["study_id"] = df["study_id"].astype(str)
-
-    # Convert pandas DataFrame to Hugging Face Dataset
-    dataset = Dataset.from_pandas(df)
-
-    # Cast columns to appropriate types
-    dataset = dataset.cast_column("image", Image())
-    if dataset_config.masks != {}:
-        dataset = dataset.cast_column("mask", Image())
-    dataset = dataset.cast_column("labels", Value("string"))
-    dataset = dataset.cast_column("dataset_uid", Value("string"))
-    dataset = dataset.cast_column("study_id", Value("string"))
+    # Stream the JSONL into Arrow in writer batches instead of materializing it in pandas. The
+    # schema comes from a full scan, so a column is not typed from the first batch alone.
+    has_masks = dataset_config.masks != {}
+    features = scan_hub_features(dataset_file, has_masks)
+    dataset = Dataset.from_generator(
+        iter_hub_rows,
+        features=features,
+        gen_kwargs={"dataset_file": dataset_file, "data_dir": data_dir, "has_masks": has_masks, "features": features},
+    )
 
+    # push_to_hub embeds the image bytes shard by shard (max_shard_size), so memory stays bounded
     dataset.push_to_hub(
         hf_repo_name,
         dataset_name,
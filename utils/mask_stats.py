@@ -0,0 +1,161 @@
+"""Persistent per-mask statistics shared by the corpus reports (Task 22 and ``data_counter``).
+
+The distribution report needs each mask's nonzero-pixel count and ``data_counter`` needs the
+mask colours present; both used to decode every mask PNG on every run. ``MaskStatsIndex`` decodes
+each mask once and stores:
+
+- the nonzero-element count (as ``np.count_nonzero`` over the decoded array),
+- the pixel count of every value present (``{color: pixels}``),
+- the bounding box of the nonzero pixels (``(y_min, x_min, y_max, x_max)``, inclusive).
+
+Rows live in a small SQLite file keyed by mask path and are reused while the file's size and
+modification time are unchanged, so regenerating corpus statistics after adding a dataset only
+decodes that dataset's masks. Stale or new masks are decoded in worker processes
+(``utils.parallel``); the main process owns the index writes. Unreadable masks are recorded too,
+so they are not decoded again until they change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import cv2  # type: ignore[import-untyped]
+import numpy as np
+
+from utils.parallel import iter_in_parallel
+
+#: Default file name of the index inside a data directory.
+MASK_STATS_FILE = "mask_stats.sqlite"
+
+
+@dataclass
+class MaskStats:
+    """Statistics of one decoded mask."""
+
+    nonzero: int  # nonzero elements of the decoded array
+    color_counts: dict[int, int]  # pixel count per value present (including 0)
+    bbox: Optional[tuple[int, int, int, int]]  # (y_min, x_min, y_max, x_max) of nonzero pixels, None if empty
+
+
+def compute_mask_stats(path: str) -> Optional[MaskStats]:
+    """Decode the mask at ``path`` and compute its statistics (None when it cannot be read).
+
+    Args:
+        path (str): Path to the mask image.
+    Returns:
+        Optional[MaskStats]: The statistics, or None for a missing or unreadable mask.
+    """
+    try:
+        mask = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    except Exception:
+        return None
+    if mask is None:
+        return None
+    values, counts = np.unique(mask, return_counts=True)
+    present = mask != 0 if mask.ndim == 2 else np.any(mask != 0, axis=2)
+    rows = np.flatnonzero(present.any(axis=1))
+    columns = np.flatnonzero(present.any(axis=0))
+    bbox = (int(rows[0]), int(columns[0]), int(rows[-1]), int(columns[-1])) if rows.size else None
+    return MaskStats(
+        nonzero=int(np.count_nonzero(mask)),
+        color_counts={int(value): int(count) for value, count in zip(values, counts)},
+        bbox=bbox,
+    )
+
+
+def _mask_stats_task(path: str) -> tuple[str, Optional[MaskStats]]:
+    """Worker: compute one mask's statistics (runs in a separate process when parallel)."""
+    return path, compute_mask_stats(path)
+
+
+class MaskStatsIndex:
+    """Mask statistics cached on disk by path, invalidated by file size and modification time."""
+
+    def __init__(self, path: str):
+        """Open (creating if needed) the index at ``path``; ``":memory:"`` keeps it in memory only."""
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS masks ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, nonzero INTEGER, colors TEXT, bbox TEXT)"
+            )
+
+    def close(self) -> None:
+        """Close the index."""
+        self._conn.close()
+
+    def stats(self, paths: Iterable[str], num_workers: int = 1) -> dict[str, Optional[MaskStats]]:
+        """Return the statistics of every mask in ``paths``, decoding only new or changed masks.
+
+        Args:
+            paths (Iterable[str]): Mask paths (duplicates are looked up once).
+            num_workers (int): Worker processes decoding stale masks; ``<= 1`` runs sequentially.
+        Returns:
+            dict[str, Optional[MaskStats]]: ``{path: stats}``; None for missing or unreadable masks.
+        """
+        results: dict[str, Optional[MaskStats]] = {}
+        signatures: dict[str, tuple[int, int]] = {}
+        stale: list[str] = []
+        for path in dict.fromkeys(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                results[path] = None
+                continue
+            signatures[path] = (st.st_mtime_ns, st.st_size)
+            row = self._conn.execute(
+                "SELECT mtime_ns, size, nonzero, colors, bbox FROM masks WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+            if row is not None and (row[0], row[1]) == signatures[path]:
+                results[path] = self._from_row(row[2:])
+            else:
+                stale.append(path)
+
+        if not stale:
+            return results
+        with self._conn:
+            for path, mask_stats in iter_in_parallel(_mask_stats_task, stale, num_workers):
+                results[path] = mask_stats
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO masks VALUES (?, ?, ?, ?, ?, ?)",
+                    (os.path.abspath(path), *signatures[path], *self._to_row(mask_stats)),
+                )
+        return results
+
+    @staticmethod
+    def _to_row(mask_stats: Optional[MaskStats]) -> tuple[Optional[int], Optional[str], Optional[str]]:
+        if mask_stats is None:
+            return None, None, None
+        colors = json.dumps(sorted(mask_stats.color_counts.items()))
+        return mask_stats.nonzero, colors, json.dumps(mask_stats.bbox)
+
+    @staticmethod
+    def _from_row(row: tuple) -> Optional[MaskStats]:
+        nonzero, colors, bbox = row
+        if nonzero is None:
+            return None
+        loaded_bbox = json.loads(bbox)
+        return MaskStats(
+            nonzero=nonzero,
+            color_counts={int(value): int(count) for value, count in json.loads(colors)},
+            bbox=tuple(loaded_bbox) if loaded_bbox is not None else None,
+        )
+
+
+def open_mask_stats_index(data_dir: str, path: Optional[str] = None) -> MaskStatsIndex:
+    """Open the index at ``path`` (default ``{data_dir}/mask_stats.sqlite``).
+
+    Falls back to an in-memory index when the location is not writable, so reports still run
+    over read-only data (without persisting the statistics).
+    """
+    try:
+        return MaskStatsIndex(path or os.path.join(data_dir, MASK_STATS_FILE))
+    except (OSError, sqlite3.Error):
+        return MaskStatsIndex(":memory:")
@@ -18,13 +18,19 @@ Concurrency contract (read before using a worker count > 1):
     * Worker functions and their arguments must be picklable (define them at module top
       level, not as closures/lambdas), as required by :mod:`multiprocessing`.
 
+:func:`iter_in_parallel` is the streaming sibling used by the conversion steps: it yields the
+results lazily, in input order, while keeping only a bounded number of tasks in flight, so a
+step can write each result as soon as it arrives instead of holding the whole dataset's
+outputs in memory.
+
 A wall-clock benchmark on a large real dataset is a follow-up (it needs real data); this
 module only establishes the deterministic, order-preserving contract.
 """
 
+from collections import deque
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from multiprocessing import get_context
-from typing import Callable, List, Sequence, TypeVar
+from typing import Callable, Iterable, Iterator, List, Sequence, TypeVar
 
 T = TypeVar("T")
 R = TypeVar("R")
@@ -67,3 +73,42 @@ def process_in_parallel(
         # only use when the caller does not rely on positional correspondence with `items`).
         futures = [executor.submit(func, item) for item in item_list]
         return [future.result() for future in as_completed(futures)]
+
+
+def iter_in_parallel(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    num_workers: int = 1,
+    max_pending: int = 0,
+) -> Iterator[R]:
+    """Lazily map ``func`` over ``items``, optionally in parallel, yielding results in input order.
+
+    Same contract as :func:`process_in_parallel` (pure, picklable ``func``; the caller does
+    all writes), but results are yielded one by one instead of collected into a list. At most
+    ``max_pending`` tasks are submitted ahead of the result being consumed, which bounds the
+    memory held by finished-but-unconsumed results (e.g. encoded images) no matter how large
+    ``items`` is.
+
+    Args:
+        func (Callable[[T], R]): A pure, picklable function applied to each item.
+        items (Iterable[T]): The items to process; consumed lazily.
+        num_workers (int): Number of worker processes; ``<= 1`` runs sequentially.
+        max_pending (int): Maximum number of in-flight tasks; ``<= 0`` uses ``4 * num_workers``.
+
+    Yields:
+        R: The result of applying ``func`` to each item, in input order.
+    """
+    if num_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    max_pending = max_pending if max_pending > 0 else 4 * num_workers
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=get_context("spawn")) as executor:
+        pending: deque = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
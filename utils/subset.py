@@ -8,8 +8,15 @@ below it.
 
 The optional Flask wrapper in ``utils/subset_web.py`` exposes the same functions over HTTP.
 
+For the full corpus, ``SubsetIndex`` keeps the filter fields in a persistent SQLite file instead of
+scanning every record in memory on each query: records are indexed by modality and licence, labels
+live in an inverted ``term -> record`` table, and the ontology descendant expansion is precomputed.
+The index is refreshed incrementally - only JSONL files whose size or modification time changed
+are re-read - and a query loads just the matching records.
+
 Usage:
     python -m utils.subset data/00_kits23/00_kits23.jsonl --label Neoplasm --out subset_manifest.json
+    python -m utils.subset data/*/*.jsonl --index corpus_index.sqlite --label Neoplasm
 """
 
 from __future__ import annotations
@@ -17,7 +24,9 @@ from __future__ import annotations
 import argparse
 import json
 import os
-from typing import Optional
+import sqlite3
+from contextlib import closing
+from typing import Iterator, Optional
 
 import jsonlines
 
@@ -102,6 +111,143 @@ def query_subset(
     return out
 
 
+class SubsetIndex:
+    """Persistent SQLite index over the corpus JSONLs, answering ``query_subset`` filters without a scan.
+
+    Results come in corpus order - the order of the ``jsonl_paths`` given to the last ``update``,
+    then line order within each file - so they match ``query_subset(load_records(jsonl_paths))``
+    however the files were (re)indexed.
+    """
+
+    # Bumped whenever the tables change; older index files are rebuilt from scratch.
+    _SCHEMA_VERSION = 2
+    _TABLES = ("sources", "records", "record_labels", "label_descendants")
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, position INTEGER);
+        CREATE TABLE IF NOT EXISTS records (
+            id INTEGER PRIMARY KEY, source TEXT, line INTEGER, modality TEXT, license TEXT, record TEXT
+        );
+        CREATE TABLE IF NOT EXISTS record_labels (term TEXT, record_id INTEGER);
+        CREATE TABLE IF NOT EXISTS label_descendants (label TEXT, term TEXT);
+        CREATE INDEX IF NOT EXISTS records_source ON records (source);
+        CREATE INDEX IF NOT EXISTS records_modality ON records (modality);
+        CREATE INDEX IF NOT EXISTS records_license ON records (license);
+        CREATE INDEX IF NOT EXISTS record_labels_term ON record_labels (term, record_id);
+        CREATE INDEX IF NOT EXISTS record_labels_record ON record_labels (record_id);
+        CREATE INDEX IF NOT EXISTS label_descendants_label ON label_descendants (label);
+    """
+
+    def __init__(self, path: str):
+        """Open (creating if needed) the index file at ``path``.
+
+        Connections are opened per call, so one instance can serve several threads (e.g. Flask).
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != self._SCHEMA_VERSION:
+                for table in self._TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+            conn.executescript(self._SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def update(self, jsonl_paths: list[str]) -> int:
+        """Bring the index up to date with ``jsonl_paths``.
+
+        New or changed files (by size and modification time) are re-read, files no longer listed
+        are dropped, every file's position in ``jsonl_paths`` is recorded for result ordering, and
+        the label descendant table is rebuilt from the current ontology.
+
+        Args:
+            jsonl_paths: The dataset JSONL files making up the corpus.
+
+        Returns:
+            int: Number of JSONL files (re)indexed.
+        """
+        wanted = {os.path.abspath(path): os.stat(path) for path in jsonl_paths}
+        with closing(self._connect()) as conn, conn:
+            indexed = {
+                path: (mtime, size) for path, mtime, size in conn.execute("SELECT path, mtime_ns, size FROM sources")
+            }
+            stale = [path for path in indexed if path not in wanted]
+            changed = [path for path, st in wanted.items() if indexed.get(path) != (st.st_mtime_ns, st.st_size)]
+            for path in stale + changed:
+                self._drop_source(conn, path)
+            for path in changed:
+                self._add_source(conn, path)
+                st = wanted[path]
+                conn.execute("INSERT INTO sources VALUES (?, ?, ?, NULL)", (path, st.st_mtime_ns, st.st_size))
+            conn.executemany(
+                "UPDATE sources SET position = ? WHERE path = ?", ((i, path) for i, path in enumerate(wanted))
+            )
+            conn.execute("DELETE FROM label_descendants")
+            conn.executemany("INSERT INTO label_descendants VALUES (?, ?)", self._descendant_rows())
+        return len(changed)
+
+    @staticmethod
+    def _drop_source(conn: sqlite3.Connection, path: str) -> None:
+        conn.execute("DELETE FROM record_labels WHERE record_id IN (SELECT id FROM records WHERE source = ?)", (path,))
+        conn.execute("DELETE FROM records WHERE source = ?", (path,))
+        conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+
+    @staticmethod
+    def _add_source(conn: sqlite3.Connection, path: str) -> None:
+        """Stream one JSONL into the index, deriving the filter fields once per record."""
+        with jsonlines.open(path) as reader:
+            for line, record in enumerate(reader):
+                cursor = conn.execute(
+                    "INSERT INTO records (source, line, modality, license, record) VALUES (?, ?, ?, ?, ?)",
+                    (path, line, _record_modality(record), _record_license(record), json.dumps(record)),
+                )
+                conn.executemany(
+                    "INSERT INTO record_labels VALUES (?, ?)",
+                    ((term, cursor.lastrowid) for term in _record_labels(record)),
+                )
+
+    @staticmethod
+    def _descendant_rows() -> Iterator[tuple[str, str]]:
+        """Yield (label, term) for every label and each of its hierarchy descendants."""
+        for label in labels_config.all_labels:
+            for descendant in labels_config.label_descendants_of(label.radlex_name):
+                yield label.radlex_name, descendant.radlex_name
+
+    def query(
+        self,
+        *,
+        modality: Optional[str] = None,
+        label: Optional[str] = None,
+        license: Optional[str] = None,
+        include_label_descendants: bool = True,
+    ) -> list[dict]:
+        """Return the indexed records matching the filters, with the semantics of :func:`query_subset`."""
+        clauses = []
+        params: list[str] = []
+        if modality:
+            clauses.append("modality = ?")
+            params.append(modality)
+        if license:
+            clauses.append("license = ?")
+            params.append(license)
+        if label:
+            terms = "SELECT ?"
+            params.append(label)
+            if include_label_descendants:
+                terms += " UNION SELECT term FROM label_descendants WHERE label = ?"
+                params.append(label)
+            clauses.append(f"id IN (SELECT record_id FROM record_labels WHERE term IN ({terms}))")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT record FROM records JOIN sources ON records.source = sources.path {where} "
+                "ORDER BY sources.position, records.line",
+                params,
+            )
+            return [json.loads(record) for (record,) in rows]
+
+
 def build_manifest(subset: list[dict]) -> dict:
     """Build a downloadable manifest (file list + JSONL slice) from a queried subset."""
     files = [r.get("umie_path") for r in subset if r.get("umie_path")]
@@ -126,15 +272,23 @@ def main() -> None:
     parser.add_argument("--license", default=None)
     parser.add_argument("--no-descendants", action="store_true", help="Do not expand the label hierarchy")
     parser.add_argument("--out", default=None, help="Write the manifest JSON here")
+    parser.add_argument("--index", default=None, help="Query through (and refresh) this SQLite index file")
     args = parser.parse_args()
-    records = load_records(args.jsonl)
-    subset = query_subset(
-        records,
-        modality=args.modality,
-        label=args.label,
-        license=args.license,
-        include_label_descendants=not args.no_descendants,
-    )
+    descendants = not args.no_descendants
+    if args.index:
+        index = SubsetIndex(args.index)
+        index.update(args.jsonl)
+        subset = index.query(
+            modality=args.modality, label=args.label, license=args.license, include_label_descendants=descendants
+        )
+    else:
+        subset = query_subset(
+            load_records(args.jsonl),
+            modality=args.modality,
+            label=args.label,
+            license=args.license,
+            include_label_descendants=descendants,
+        )
     if args.out:
         write_manifest(subset, args.out)
         print(f"Wrote manifest with {len(subset)} records to {args.out}")
@@ -7,14 +7,16 @@ not affect the rest of the package when Flask is not installed.
 Run:
     pip install flask
     python -m utils.subset_web data/**/*.jsonl    # then open http://127.0.0.1:5000
+    python -m utils.subset_web --index corpus_index.sqlite data/**/*.jsonl    # query a persistent index
 """
 
 from __future__ import annotations
 
 import glob
 import sys
+from typing import Optional
 
-from utils.subset import build_manifest, load_records, query_subset
+from utils.subset import SubsetIndex, build_manifest, load_records, query_subset
 
 _FORM = """
 <!doctype html><title>UMIE subset query</title>
@@ -28,12 +30,19 @@ _FORM = """
 """
 
 
-def create_app(jsonl_globs: list[str]):  # type: ignore[no-untyped-def]  # Flask app, imported lazily
-    """Build the Flask app serving the query form and the manifest endpoint."""
+def create_app(jsonl_globs: list[str], index_path: Optional[str] = None):  # type: ignore[no-untyped-def]
+    """Build the Flask app serving the query form and the manifest endpoint.
+
+    With ``index_path`` the corpus is served from a persistent ``SubsetIndex`` (refreshed from the
+    JSONLs at startup) instead of being held in memory.
+    """
     from flask import Flask, jsonify, request  # lazy: Flask is an optional extra
 
     paths = [p for pattern in jsonl_globs for p in glob.glob(pattern, recursive=True)]
-    records = load_records(paths)
+    corpus_index = SubsetIndex(index_path) if index_path else None
+    if corpus_index is not None:
+        corpus_index.update(paths)
+    records = load_records(paths) if corpus_index is None else []
     app = Flask(__name__)
 
     @app.route("/")
@@ -42,23 +51,28 @@ def create_app(jsonl_globs: list[str]):  # type: ignore[no-untyped-def]  # Flask
 
     @app.route("/manifest")
     def manifest():  # type: ignore[no-untyped-def]
-        subset = query_subset(
-            records,
-            modality=request.args.get("modality") or None,
-            label=request.args.get("label") or None,
-            license=request.args.get("license") or None,
-        )
+        modality = request.args.get("modality") or None
+        label = request.args.get("label") or None
+        license = request.args.get("license") or None
+        if corpus_index is not None:
+            subset = corpus_index.query(modality=modality, label=label, license=license)
+        else:
+            subset = query_subset(records, modality=modality, label=label, license=license)
         return jsonify(build_manifest(subset))
 
     return app
 
 
 def main() -> None:
-    """CLI entry point: ``python -m utils.subset_web <jsonl globs>``."""
-    if len(sys.argv) < 2:
-        print("usage: python -m utils.subset_web <jsonl globs...>")
+    """CLI entry point: ``python -m utils.subset_web [--index <sqlite file>] <jsonl globs>``."""
+    args = sys.argv[1:]
+    index_path = None
+    if args[:1] == ["--index"] and len(args) >= 2:
+        index_path, args = args[1], args[2:]
+    if not args:
+        print("usage: python -m utils.subset_web [--index <sqlite file>] <jsonl globs...>")
         raise SystemExit(1)
-    create_app(sys.argv[1:]).run()
+    create_app(args, index_path).run()
 
 
 if __name__ == "__main__":